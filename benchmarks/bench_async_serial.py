@@ -0,0 +1,104 @@
+"""
+Drives AsyncSerialHub with pseudo-terminal pairs standing in for BLE stations and the radar (Linux/macOS).
+
+Writer threads push +UUDF lines and synthetic radar packets into the master side of each pty, the hub reads all
+slave devices on one event loop. Prints items/s and CPU use, then closes one station to show the reconnect
+backoff.
+
+Run from the repository root:
+    python -m benchmarks.bench_async_serial
+"""
+import asyncio
+import logging
+import os
+import pty
+import threading
+import time
+import tty as tty_module
+
+from benchmarks.synth import build_packet
+from implementation.async_serial import AsyncSerialHub
+
+NUM_STATIONS = 4
+LINES_PER_SECOND = 500
+RADAR_FRAMES_PER_SECOND = 20
+POINTS_PER_FRAME = 100
+DURATION = 3.0
+
+BLE_LINE = b'+UUDF:CCF9578E0D8A,-42,20,0,0,37,"CCF9578E0D89","",15273,5\r\n'
+
+
+def open_pty():
+    master, slave = pty.openpty()
+    tty = os.ttyname(slave)
+    # raw mode, so radar bytes pass through unchanged
+    tty_module.setraw(slave)
+    return master, slave, tty
+
+
+def write_lines(master, stop):
+    period = 1.0 / LINES_PER_SECOND
+    while not stop.is_set():
+        try:
+            os.write(master, BLE_LINE)
+        except OSError:
+            return
+        time.sleep(period)
+
+
+def write_radar(master, stop):
+    frame_number = 0
+    while not stop.is_set():
+        try:
+            os.write(master, build_packet(frame_number, POINTS_PER_FRAME))
+        except OSError:
+            return
+        frame_number += 1
+        time.sleep(1.0 / RADAR_FRAMES_PER_SECOND)
+
+
+async def run(hub, ports, stop):
+    await hub.start()
+    counts = {"BLE": 0, "Radar": 0}
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    while time.perf_counter() - start < DURATION:
+        try:
+            kind, _ = await asyncio.wait_for(hub.queue.get(), 0.1)
+        except asyncio.TimeoutError:
+            continue
+        counts[kind] += 1
+    elapsed = time.perf_counter() - start
+    cpu = (time.process_time() - cpu_start) / elapsed
+    print(f"{NUM_STATIONS} stations + radar on one loop: {counts['BLE'] / elapsed:.0f} lines/s, "
+          f"{counts['Radar'] / elapsed:.1f} frames/s, CPU {100 * cpu:.0f}% (incl. writer threads)")
+
+    # unplug station 1: the hub logs the disconnect and retries with growing delays
+    master, slave, _ = ports[0]
+    os.close(master)
+    os.close(slave)
+    await asyncio.sleep(2.0)
+    stop.set()
+    await hub.stop()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    stop = threading.Event()
+    ports = [open_pty() for _ in range(NUM_STATIONS + 1)]
+    hub = AsyncSerialHub(initial_backoff=0.2, max_backoff=1.0)
+    writers = []
+    for master, _, tty in ports[:NUM_STATIONS]:
+        hub.add_line_port(tty, 115200, lambda line, timestamp: ("BLE", line))
+        writers.append(threading.Thread(target=write_lines, args=(master, stop), daemon=True))
+    master, _, tty = ports[-1]
+    hub.add_radar_port(tty, 921600, lambda frame, timestamp: ("Radar", frame.numDetObj))
+    writers.append(threading.Thread(target=write_radar, args=(master, stop), daemon=True))
+    for writer in writers:
+        writer.start()
+    asyncio.run(run(hub, ports, stop))
+    print(f"reconnects: {dict(hub.reconnects)}")
+
+
+if __name__ == "__main__":
+    main()
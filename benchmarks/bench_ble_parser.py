@@ -0,0 +1,81 @@
+"""
+Compares the regex path formerly used by final.py and ble/ble.py (decode, strip, AZIMUTH_PATTERN.match) with the
+byte-level UudfParser, per line and per buffered chunk.
+
+Run from the repository root:
+    python -m benchmarks.bench_ble_parser
+"""
+import random
+import re
+import time
+
+from implementation.ble_parser import UudfParser
+
+AZIMUTH_PATTERN = re.compile(
+    r'\+UUDF:([0-9A-Fa-f]{12}),'
+    r'(-?\d+),(-?\d+),(-?\d+),'
+    r'(\d+),(\d+),'
+    r'"([0-9A-Fa-f]{12})","",(\d+),(\d+)'
+)
+NUM_LINES = 200000
+NUM_TAGS = 50
+CHUNK_SIZE = 4096
+
+
+def regex_path(lines):
+    parsed = []
+    for raw in lines:
+        line = raw.decode('utf-8', errors='ignore').strip()
+        if line:
+            match = AZIMUTH_PATTERN.match(line)
+            if match:
+                parsed.append((match.group(1), int(match.group(3))))
+    return parsed
+
+
+def make_lines(rng):
+    tags = ['%012X' % rng.getrandbits(48) for _ in range(NUM_TAGS)]
+    lines = []
+    for i in range(NUM_LINES):
+        if i % 100 == 0:
+            lines.append(b'OK\r\n')
+            continue
+        line = '+UUDF:%s,%d,%d,%d,0,37,"CCF9578E0D89","",%d,%d\r\n' % (
+            rng.choice(tags), rng.randint(-90, -30), rng.randint(-90, 90), rng.randint(-90, 90), i * 20, i % 256)
+        if i % 100 == 50:
+            # truncated and corrupted reports, which both paths must reject
+            line = line[:rng.randint(20, len(line) - 8)] + '\r\n' if i % 200 == 50 else 'garbage' + line
+        lines.append(line.encode('ascii'))
+    return lines
+
+
+def main():
+    rng = random.Random(0)
+    lines = make_lines(rng)
+    stream = b''.join(lines)
+
+    start = time.perf_counter()
+    expected = regex_path(lines)
+    t_regex = time.perf_counter() - start
+
+    parser = UudfParser()
+    start = time.perf_counter()
+    per_line = [parsed for parsed in map(parser.parse_line, lines) if parsed is not None]
+    t_line = time.perf_counter() - start
+
+    parser = UudfParser()
+    start = time.perf_counter()
+    per_chunk = []
+    for offset in range(0, len(stream), CHUNK_SIZE):
+        per_chunk.extend(parser.parse_chunk(stream[offset:offset + CHUNK_SIZE]))
+    t_chunk = time.perf_counter() - start
+
+    assert per_line == expected and per_chunk == expected, "byte parser disagrees with the regex path"
+    print(f"{'path':>22} {'lines/s':>12} {'speedup':>8}")
+    for name, elapsed in (("regex (str)", t_regex), ("bytes, per line", t_line),
+                          (f"bytes, {CHUNK_SIZE} B chunks", t_chunk)):
+        print(f"{name:>22} {NUM_LINES / elapsed:>12,.0f} {t_regex / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
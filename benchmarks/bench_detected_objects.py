@@ -0,0 +1,48 @@
+"""
+Compares one DetectedObject per point with the columnar DetectedObjectSet when filtering parsed frames for moving
+objects inside a region.
+
+Run from the repository root:
+    python -m benchmarks.bench_detected_objects
+"""
+import math
+import timeit
+
+from radar.detected_object import DetectedObject, DetectedObjectSet
+from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet
+from benchmarks.synth import build_packet
+
+REGION = (-5, 5, 10, 40)  # (xmin, xmax, ymin, ymax) in sensor coordinates
+REPEAT = 200
+
+
+def per_object(frame):
+    objects = []
+    for i, (x, y, v) in enumerate(zip(frame.x.tolist(), frame.y.tolist(), frame.v.tolist())):
+        distance = math.hypot(x, y)
+        velocity = (x * v / distance, y * v / distance) if distance > 0 else (0.0, 0.0)
+        objects.append(DetectedObject(i, (x, y), velocity))
+    xmin, xmax, ymin, ymax = REGION
+    return [obj for obj in objects
+            if obj.is_moving and xmin <= obj.position[0] <= xmax and ymin <= obj.position[1] <= ymax]
+
+
+def columnar(frame):
+    objects = DetectedObjectSet.from_frame(frame)
+    return objects[objects.is_moving() & objects.in_region(REGION)]
+
+
+def main():
+    print(f"{'points':>8} {'objects (us)':>14} {'columnar (us)':>14} {'speedup':>9} {'objects/s':>12}")
+    for num_points in (10, 100, 1000, 5000):
+        packet = build_packet(1, num_points)
+        frame = parser_one_mmw_demo_output_packet(packet, len(packet))
+        assert [obj.id for obj in per_object(frame)] == columnar(frame).ids.tolist()
+        t_objects = min(timeit.repeat(lambda: per_object(frame), number=REPEAT, repeat=3)) / REPEAT
+        t_columnar = min(timeit.repeat(lambda: columnar(frame), number=REPEAT, repeat=3)) / REPEAT
+        print(f"{num_points:>8} {t_objects * 1e6:>14.1f} {t_columnar * 1e6:>14.1f} {t_objects / t_columnar:>8.1f}x "
+              f"{num_points / t_columnar:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
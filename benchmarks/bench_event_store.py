@@ -0,0 +1,97 @@
+"""
+Cost of storing fusion engine events on the fusion thread: EventStore.write (queue, batched by the writer thread)
+against inserting and committing every event in the subscriber. Then range queries by time and zone on the result.
+
+Run from the repository root:
+    python -m benchmarks.bench_event_store
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from implementation.event_store import EventStore, INSERT, SCHEMA, event_rows
+from implementation.fusion_engine import IntruderFlagged, TagPosition, TrackUpdate
+from radar.detected_object import DetectedObjectSet
+
+FRAMES = 2000
+TRACKS_PER_FRAME = 8
+ZONES = [f"A{i}" for i in range(20)]
+
+
+def synthetic_events(start):
+    rng = np.random.default_rng(0)
+    events = []
+    for frame in range(FRAMES):
+        now = start + frame * 0.05
+        objects = DetectedObjectSet(np.arange(TRACKS_PER_FRAME), rng.uniform(0, 10, (TRACKS_PER_FRAME, 2)),
+                                    rng.normal(0, 1, (TRACKS_PER_FRAME, 2)))
+        zones = [ZONES[i] if i < len(ZONES) else None for i in rng.integers(0, 2 * len(ZONES), TRACKS_PER_FRAME)]
+        events.append(TrackUpdate(now, now - 0.01, objects, rng.random(TRACKS_PER_FRAME) < 0.5, zones))
+        events.append(TagPosition(now, now - 0.01, "tag1", 5.0, -15.0, np.eye(2), 0.1))
+        if frame % 100 == 99:
+            events.append(IntruderFlagged(now, now - 0.01, 21, 3.0, -15.0, ZONES[frame // 100 % len(ZONES)]))
+    return events
+
+
+def per_event_commit(path, events):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        connection.execute(statement)
+    start = time.perf_counter()
+    worst = 0.0
+    for event in events:
+        call_start = time.perf_counter()
+        with connection:
+            connection.executemany(INSERT, event_rows(event))
+        worst = max(worst, time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed, worst
+
+
+def batched(path, events):
+    store = EventStore(path)
+    start = time.perf_counter()
+    worst = 0.0
+    for event in events:
+        call_start = time.perf_counter()
+        store.write(event)
+        worst = max(worst, time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    store.flush()
+    drained = time.perf_counter() - start
+    store.close()
+    return elapsed, worst, drained, store
+
+
+def main():
+    events = synthetic_events(time.time())
+    rows = sum(len(event_rows(event)) for event in events)
+    print(f"{len(events)} events, {rows} rows")
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, worst = per_event_commit(os.path.join(directory, "commit.db"), events)
+        print(f"commit per event: {1e6 * elapsed / len(events):8.1f} us/event on the fusion thread, "
+              f"worst {1e3 * worst:.2f} ms")
+
+        path = os.path.join(directory, "store.db")
+        elapsed, worst, drained, store = batched(path, events)
+        print(f"EventStore.write: {1e6 * elapsed / len(events):8.1f} us/event on the fusion thread, "
+              f"worst {1e3 * worst:.2f} ms, all {store.written} rows written after {1e3 * drained:.0f} ms, "
+              f"{store.dropped} dropped")
+
+        middle = events[len(events) // 2].time
+        for label, kwargs in (("10 s window", dict(start=middle, end=middle + 10)),
+                              ("zone, all time", dict(zone=ZONES[3])),
+                              ("intruder events", dict(kinds=("intruder", "cleared")))):
+            start = time.perf_counter()
+            result = store.query(**kwargs)
+            print(f"query {label:>16}: {len(result):6d} events in {1e3 * (time.perf_counter() - start):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
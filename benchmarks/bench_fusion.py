@@ -0,0 +1,58 @@
+"""
+Runs FusionEngine headless on a synthetic scene: one tag parked outside the parking place and an untagged
+vehicle moving into it. Reports engine time per radar frame and the detection latency of the intruder flag.
+
+Run from the repository root:
+    python -m benchmarks.bench_fusion
+"""
+import random
+import time
+
+from implementation.fusion_engine import FusionEngine, IntruderFlagged
+
+POINTS_PER_FRAME = 100
+FRAME_PERIOD = 0.1
+PARKING_PLACE = (2, 4, -20, -10)
+
+
+def synthetic_frame(rng, frame_index):
+    # background clutter plus a vehicle that reaches the parking place at frame 20
+    points = [(rng.uniform(5, 10), rng.uniform(-90, 0)) for _ in range(POINTS_PER_FRAME)]
+    if frame_index >= 20:
+        points += [(rng.gauss(3, 0.2), rng.gauss(-15, 0.5)) for _ in range(10)]
+    return points
+
+
+def main():
+    rng = random.Random(0)
+    engine = FusionEngine({"1": (0, 0), "2": (10, 0)}, PARKING_PLACE, (1.0, 10))
+    flagged = []
+    engine.subscribe(lambda event: flagged.append(event) if isinstance(event, IntruderFlagged) else None)
+
+    start = 1000.0
+    engine.submit_bearing("CCF9578E0D8A", "1", 45.0, start)
+    engine.submit_bearing("CCF9578E0D8A", "2", 135.0, start)
+
+    frames = 200
+    step_time = 0.0
+    flagged_frame = flagged_latency = None
+    for i in range(frames):
+        # scene time advances by one frame period per frame, processing time is measured separately
+        timestamp = start + i * FRAME_PERIOD
+        engine.submit_radar_frame(synthetic_frame(rng, i), timestamp)
+        t0 = time.perf_counter()
+        engine.step(timestamp)
+        elapsed = time.perf_counter() - t0
+        step_time += elapsed
+        if flagged and flagged_frame is None:
+            flagged_frame, flagged_latency = i, elapsed
+
+    print(f"engine step: {1e3 * step_time / frames:.3f} ms/frame ({POINTS_PER_FRAME}+ points)")
+    if flagged:
+        print(f"intruder flagged {flagged_frame - 20 + 1} frames after entering the parking place, "
+              f"{1e3 * flagged_latency:.2f} ms after its frame was submitted")
+    else:
+        print("intruder not flagged")
+
+if __name__ == "__main__":
+    main()
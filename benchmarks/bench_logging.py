@@ -0,0 +1,44 @@
+"""
+Measures parser throughput with per-frame debug output enabled (what every frame used to print) and
+with the default quiet logging.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging
+"""
+import io
+import logging
+import time
+
+from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet, logger as parser_logger
+from benchmarks.synth import build_packet
+
+NUM_FRAMES = 300
+
+
+def frames_per_second(packets):
+    start = time.perf_counter()
+    for packet in packets:
+        parser_one_mmw_demo_output_packet(packet, len(packet))
+    return len(packets) / (time.perf_counter() - start)
+
+
+def main():
+    handler = logging.StreamHandler(io.StringIO())
+    parser_logger.addHandler(handler)
+    parser_logger.propagate = False
+    try:
+        print(f"{'points':>8} {'debug (fps)':>12} {'quiet (fps)':>12}")
+        for num_points in (10, 100, 500):
+            packets = [build_packet(i, num_points) for i in range(NUM_FRAMES)]
+            parser_logger.setLevel(logging.DEBUG)
+            verbose = frames_per_second(packets)
+            parser_logger.setLevel(logging.WARNING)
+            quiet = frames_per_second(packets)
+            print(f"{num_points:>8} {verbose:>12.0f} {quiet:>12.0f}")
+    finally:
+        parser_logger.removeHandler(handler)
+        parser_logger.propagate = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the per-object struct.unpack decode of the detected points TLV with the vectorized NumPy decode.
+
+Run from the repository root:
+    python -m benchmarks.bench_parser
+"""
+import binascii
+import codecs
+import math
+import struct
+import timeit
+
+import numpy as np
+
+from radar.parser_mmw_demo import PI, parse_detected_points
+from benchmarks.synth import build_packet
+
+HEADER_NUM_BYTES = 40
+POINTS_START = HEADER_NUM_BYTES + 8
+
+
+def parse_detected_points_scalar(data, pointsStart, numDetObj):
+    """
+    The original per-object decode loop of parser_one_mmw_demo_output_packet.
+    """
+    x_arr, y_arr, z_arr, v_arr, rng_arr, az_arr, el_arr = [], [], [], [], [], [], []
+    offset = pointsStart
+    for obj in range(numDetObj):
+        x = struct.unpack('<f', codecs.decode(binascii.hexlify(data[offset:offset+4:1]), 'hex'))[0]
+        y = struct.unpack('<f', codecs.decode(binascii.hexlify(data[offset+4:offset+8:1]), 'hex'))[0]
+        z = struct.unpack('<f', codecs.decode(binascii.hexlify(data[offset+8:offset+12:1]), 'hex'))[0]
+        v = struct.unpack('<f', codecs.decode(binascii.hexlify(data[offset+12:offset+16:1]), 'hex'))[0]
+        rng = math.sqrt((x * x)+(y * y)+(z * z))
+        if y == 0:
+            az = 90 if x >= 0 else -90
+        else:
+            az = math.atan(x/y) * 180 / PI
+        if x == 0 and y == 0:
+            el = 90 if z >= 0 else -90
+        else:
+            el = math.atan(z/math.sqrt((x * x)+(y * y))) * 180 / PI
+        x_arr.append(x)
+        y_arr.append(y)
+        z_arr.append(z)
+        v_arr.append(v)
+        rng_arr.append(rng)
+        az_arr.append(az)
+        el_arr.append(el)
+        offset += 16
+    return (x_arr, y_arr, z_arr, v_arr, rng_arr, az_arr, el_arr)
+
+
+def main():
+    print(f"{'points':>8} {'scalar (us)':>14} {'numpy (us)':>14} {'speedup':>10}")
+    for num_points in (10, 100, 1000):
+        packet = build_packet(1, num_points)
+
+        scalar = parse_detected_points_scalar(packet, POINTS_START, num_points)
+        vectorized = parse_detected_points(packet, POINTS_START, num_points)
+        for expected, actual in zip(scalar, vectorized):
+            assert np.allclose(expected, actual, rtol=0, atol=1e-9), "decode mismatch"
+
+        number = max(10, 10000 // num_points)
+        t_scalar = min(timeit.repeat(lambda: parse_detected_points_scalar(packet, POINTS_START, num_points),
+                                     number=number, repeat=5)) / number
+        t_numpy = min(timeit.repeat(lambda: parse_detected_points(packet, POINTS_START, num_points),
+                                    number=number, repeat=5)) / number
+        print(f"{num_points:>8} {t_scalar * 1e6:>14.1f} {t_numpy * 1e6:>14.1f} {t_scalar / t_numpy:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Uploads a radar profile to a simulated mmw demo CLI on a pseudo-terminal (Linux/macOS), once with the former
+readlines()-and-sleep loop of rad.py and once with RadarConfigurator, and prints the time per upload. Then switches
+profiles with ProfileSwitcher while a RadarInterface keeps reading the simulated data port, and prints the gap in
+the frame stream.
+
+The simulated device answers every command with its echo, "Done" and the prompt after COMMAND_DELAY, and takes
+SENSOR_DELAY for sensorStop/sensorStart. Between sensorStart and sensorStop it sends a frame every FRAME_PERIOD.
+
+Run from the repository root:
+    python -m benchmarks.bench_radar_config [path/to/profile.cfg]
+"""
+import os
+import pty
+import sys
+import threading
+import time
+import tty as tty_module
+
+import serial
+
+from benchmarks.synth import build_packet
+from radar.radar_config import ProfileSwitcher, RadarConfigurator, load_cfg
+from radar.parser_mmw_demo import TC_PASS
+from radar.radar_interface import RadarInterface
+
+CFG_PATH = "radar/tdm/profile_advanced_subframe.cfg"
+COMMAND_DELAY = 0.001
+SENSOR_DELAY = 0.02
+FRAME_PERIOD = 0.05
+POINTS_PER_FRAME = 100
+SWITCH_PROFILE = "radar/ddm/profile_3d_3Azim_1ElevTx_DDMA_awr2944_highRange.cfg"
+
+
+def simulate_device(master, stop, running=None):
+    buffer = b''
+    while not stop.is_set():
+        try:
+            data = os.read(master, 4096)
+        except OSError:
+            return
+        buffer += data
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            command = line.strip()
+            time.sleep(SENSOR_DELAY if command in (b'sensorStop', b'sensorStart') else COMMAND_DELAY)
+            if running is not None and command == b'sensorStop':
+                running.clear()
+            if running is not None and command == b'sensorStart':
+                running.set()
+            os.write(master, command + b'\r\nDone\r\nmmwDemo:/>')
+
+
+def stream_frames(master, stop, running):
+    frame_number = 0
+    while not stop.is_set():
+        if running.wait(0.1):
+            packet = build_packet(frame_number, POINTS_PER_FRAME)
+            # in two writes, so a stop can fall between the halves of a packet
+            os.write(master, packet[:len(packet) // 2])
+            time.sleep(FRAME_PERIOD / 2)
+            os.write(master, packet[len(packet) // 2:])
+            frame_number += 1
+            time.sleep(FRAME_PERIOD / 2)
+
+
+def read_frames(radar, stop, received):
+    while not stop.is_set():
+        for frame in radar.iter_frames():
+            received.append((time.perf_counter(), frame.epoch, frame.result))
+
+
+def hot_switch(cfg_path):
+    control_master, control_slave = pty.openpty()
+    data_master, data_slave = pty.openpty()
+    tty_module.setraw(control_slave)
+    tty_module.setraw(data_slave)
+    stop = threading.Event()
+    running = threading.Event()
+    running.set()
+    received = []
+
+    with serial.Serial(os.ttyname(control_slave), 115200) as control, \
+            serial.Serial(os.ttyname(data_slave), 921600, timeout=1) as data:
+        radar = RadarInterface(os.ttyname(data_slave), 921600, serial_port=data)
+        threads = [threading.Thread(target=simulate_device, args=(control_master, stop, running)),
+                   threading.Thread(target=stream_frames, args=(data_master, stop, running)),
+                   threading.Thread(target=read_frames, args=(radar, stop, received))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        time.sleep(1.0)
+        switcher = ProfileSwitcher(RadarConfigurator(control), radar)
+        switch_start = time.perf_counter()
+        config_epoch = switcher.switch(load_cfg(cfg_path), cfg_path)
+        time.sleep(1.0)
+        stop.set()
+        data.cancel_read()
+        threads[2].join(2)
+
+    before = [t for t, epoch, _ in received if epoch == 0]
+    after = [t for t, epoch, _ in received if epoch == config_epoch.epoch]
+    failed = sum(1 for _, _, result in received if result != TC_PASS)
+    print(f"hot switch to {cfg_path}: {1e3 * config_epoch.duration:.1f} ms to reconfigure, "
+          f"{len(before)} frames before, {len(after)} after, {failed} corrupt")
+    if before and after:
+        print(f"frame gap: {1e3 * (after[0] - before[-1]):.1f} ms "
+              f"(last old frame {1e3 * (before[-1] - switch_start):+.1f} ms from the switch)")
+
+
+def readlines_upload(ser, commands):
+    """
+    The former configure() loop of rad.py.
+    """
+    ser.reset_input_buffer()
+    for cmd in commands:
+        ser.write((cmd + "\n").encode())
+        if cmd == "sensorStop" or cmd == "sensorStart":
+            time.sleep(0.1)
+        response = [line.decode().strip() for line in ser.readlines()]
+        if not (len(response) >= 2 and response[-2] == "Done"):
+            raise Exception(f"Failed to execute {cmd}\nresponse: {response}")
+
+
+def main():
+    cfg_path = sys.argv[1] if len(sys.argv) > 1 else CFG_PATH
+    commands = load_cfg(cfg_path)
+
+    master, slave = pty.openpty()
+    tty_module.setraw(slave)
+    stop = threading.Event()
+    threading.Thread(target=simulate_device, args=(master, stop), daemon=True).start()
+
+    print(f"{len(commands)} commands from {cfg_path}")
+    with serial.Serial(os.ttyname(slave), 115200, timeout=0.01) as ser:
+        start = time.perf_counter()
+        readlines_upload(ser, commands)
+        t_readlines = time.perf_counter() - start
+
+        start = time.perf_counter()
+        RadarConfigurator(ser).configure(commands)
+        t_driver = time.perf_counter() - start
+    stop.set()
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        load_cfg(cfg_path)
+    t_cached = (time.perf_counter() - start) / 1000
+
+    print(f"readlines loop:     {1e3 * t_readlines:8.1f} ms")
+    print(f"RadarConfigurator:  {1e3 * t_driver:8.1f} ms ({t_readlines / t_driver:.1f}x)")
+    print(f"cached load_cfg:    {1e6 * t_cached:8.1f} us")
+
+    hot_switch(SWITCH_PROFILE)
+
+
+if __name__ == "__main__":
+    main()
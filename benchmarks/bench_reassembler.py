@@ -0,0 +1,68 @@
+"""
+Replays a synthetic capture through the radar reader in serial-sized chunks and reports frames parsed
+against frames sent, for the old read-and-parse-one-chunk approach and for the frame reassembler.
+
+Run from the repository root:
+    python -m benchmarks.bench_reassembler
+"""
+import random
+import time
+
+from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet, TC_PASS
+from radar.radar_interface import FrameReassembler
+from benchmarks.synth import build_stream
+
+NUM_FRAMES = 500
+NUM_POINTS = 100
+READ_SIZE = 4096
+
+
+def chunks(stream, seed=0):
+    """
+    Split the stream like serial reads: mostly full reads, sometimes short ones.
+    """
+    rng = random.Random(seed)
+    pos = 0
+    while pos < len(stream):
+        size = READ_SIZE if rng.random() < 0.7 else rng.randint(1, READ_SIZE)
+        yield stream[pos:pos + size]
+        pos += size
+
+
+def run_chunked(stream):
+    parsed = 0
+    for chunk in chunks(stream):
+        try:
+            frame = parser_one_mmw_demo_output_packet(chunk, len(chunk))
+        except Exception:
+            # RadarInterface.parse_frame swallows these too
+            continue
+        if frame.result == TC_PASS:
+            parsed += 1
+    return parsed
+
+
+def run_reassembler(stream):
+    parsed = 0
+    reassembler = FrameReassembler()
+    for chunk in chunks(stream):
+        reassembler.feed(chunk)
+        for packet in reassembler.frames():
+            frame = parser_one_mmw_demo_output_packet(packet, len(packet))
+            if frame.result == TC_PASS:
+                parsed += 1
+    return parsed
+
+
+def main():
+    stream = b'\x00' * 123 + build_stream(NUM_FRAMES, NUM_POINTS)
+    print(f"replaying {NUM_FRAMES} frames x {NUM_POINTS} points ({len(stream)} bytes) in reads of up to {READ_SIZE} bytes")
+    for name, run in (("chunk parse", run_chunked), ("reassembler", run_reassembler)):
+        start = time.perf_counter()
+        parsed = run(stream)
+        elapsed = time.perf_counter() - start
+        print(f"{name:>12}: {parsed}/{NUM_FRAMES} frames parsed, {parsed / elapsed:8.0f} frames/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Replays the radar source of a capture through RadarInterface as fast as possible and reports throughput.
+Without a capture file, a synthetic one is written to a temporary file first.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay [capture file]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from radar.parser_mmw_demo import TC_PASS
+from radar.radar_interface import RadarInterface
+from implementation.capture import CaptureWriter, CaptureReader, ReplaySerial, SOURCE_RADAR
+from benchmarks.synth import build_stream
+
+READ_SIZE = 4096
+
+
+def write_synthetic_capture(path, num_frames=1000, num_points=100):
+    stream = build_stream(num_frames, num_points)
+    with CaptureWriter(path) as writer:
+        for pos in range(0, len(stream), READ_SIZE):
+            writer.write(SOURCE_RADAR, stream[pos:pos + READ_SIZE])
+
+
+def main(path=None):
+    temporary = path is None
+    if temporary:
+        fd, path = tempfile.mkstemp(suffix=".rbcap")
+        os.close(fd)
+        write_synthetic_capture(path)
+    try:
+        reader = CaptureReader(path)
+        port = ReplaySerial(reader, SOURCE_RADAR, timeout=0, realtime=False)
+        radar = RadarInterface(port=path, baudrate=0, serial_port=port)
+        frames = 0
+        start = time.perf_counter()
+        while not port.eof:
+            for frame in radar.iter_frames(READ_SIZE):
+                if frame.result == TC_PASS:
+                    frames += 1
+        elapsed = time.perf_counter() - start
+        num_bytes = os.path.getsize(path)
+        print(f"{frames} frames in {elapsed:.2f} s: {frames / elapsed:.0f} frames/s, {num_bytes / elapsed / 1e6:.1f} MB/s")
+        radar.close()
+        reader.close()
+    finally:
+        if temporary:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,62 @@
+"""
+Compares the linear is_unique_point() scan formerly used by final.py with PointGridIndex when thousands of
+unique points have accumulated.
+
+Run from the repository root:
+    python -m benchmarks.bench_spatial_index
+"""
+import math
+import random
+import time
+
+from implementation.spatial_index import PointGridIndex
+
+PROXIMITY_THRESHOLD = 0.5
+POINTS_PER_FRAME = 200
+
+
+def is_unique_point(px, py, unique_points, threshold=PROXIMITY_THRESHOLD):
+    for (ux, uy) in unique_points:
+        distance = math.hypot(px - ux, py - uy)
+        if distance < threshold:
+            return False
+    return True
+
+
+def random_points(rng, count, extent):
+    return [(rng.uniform(0, extent), rng.uniform(0, extent)) for _ in range(count)]
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'stored':>8} {'scan (ms/frame)':>16} {'grid (ms/frame)':>16} {'speedup':>10}")
+    for stored in (1000, 5000, 20000):
+        extent = math.sqrt(stored) * PROXIMITY_THRESHOLD * 2
+        base = random_points(rng, stored, extent)
+        frames = [random_points(rng, POINTS_PER_FRAME, extent) for _ in range(5)]
+
+        unique_points = list(base)
+        start = time.perf_counter()
+        scan_added = []
+        for frame in frames:
+            for px, py in frame:
+                if is_unique_point(px, py, unique_points):
+                    unique_points.append((px, py))
+                    scan_added.append((px, py))
+        t_scan = (time.perf_counter() - start) / len(frames)
+
+        index = PointGridIndex(PROXIMITY_THRESHOLD)
+        for x, y in base:
+            index.add(x, y)
+        start = time.perf_counter()
+        grid_added = []
+        for frame in frames:
+            grid_added.extend(index.add_unique_batch(frame))
+        t_grid = (time.perf_counter() - start) / len(frames)
+
+        assert scan_added == grid_added, "grid index disagrees with the linear scan"
+        print(f"{stored:>8} {t_scan * 1e3:>16.2f} {t_grid * 1e3:>16.3f} {t_scan / t_grid:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
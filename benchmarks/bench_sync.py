@@ -0,0 +1,47 @@
+"""
+Compares the per-index checkMagicPattern() scan with findMagicPattern() on garbage-prefixed buffers.
+
+Run from the repository root:
+    python -m benchmarks.bench_sync
+"""
+import random
+import timeit
+
+from radar.parser_mmw_demo import checkMagicPattern, findMagicPattern, MAGIC_WORD
+from benchmarks.synth import build_packet
+
+
+def find_magic_loop(data, readNumBytes):
+    """
+    The original sync search of parser_helper.
+    """
+    for index in range(readNumBytes - 7):
+        if checkMagicPattern(data[index:index+8:1]) == 1:
+            return index
+    return -1
+
+
+def garbage(num_bytes, seed=0):
+    rng = random.Random(seed)
+    data = bytearray(rng.getrandbits(8) for _ in range(num_bytes))
+    # a corrupted copy of the magic word every 1 KB keeps the search honest
+    for pos in range(0, num_bytes - 8, 1024):
+        data[pos:pos + 8] = MAGIC_WORD[:7] + b'\x00'
+    return bytes(data)
+
+
+def main():
+    packet = build_packet(1, 10)
+    print(f"{'prefix':>10} {'loop (ms)':>12} {'find (ms)':>12} {'speedup':>10}")
+    for prefix in (4 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024):
+        data = garbage(prefix) + packet
+        assert find_magic_loop(data, len(data)) == findMagicPattern(data) == prefix
+
+        number = 1 if prefix > 64 * 1024 else 5
+        t_loop = min(timeit.repeat(lambda: find_magic_loop(data, len(data)), number=number, repeat=3)) / number
+        t_find = min(timeit.repeat(lambda: findMagicPattern(data), number=number * 100, repeat=3)) / (number * 100)
+        print(f"{prefix // 1024:>8}KB {t_loop * 1e3:>12.3f} {t_find * 1e3:>12.4f} {t_loop / t_find:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Radar tracker cost per frame as point clouds get denser. Compares the former DBSCAN over a dense N x N distance
+matrix with cluster_points (neighbours through an eps-sized grid), then times a full MultiTargetTracker.update.
+
+Run from the repository root:
+    python -m benchmarks.bench_tracker
+"""
+import time
+
+import numpy as np
+
+from implementation.tracker import MultiTargetTracker, cluster_points
+
+EPS = 1.0
+FRAMES = 20
+POINTS_PER_OBJECT = 10
+
+
+def dense_cluster_points(points, eps, min_samples=1):
+    n = len(points)
+    labels = np.full(n, -1, dtype=np.intp)
+    d = points[:, None, :] - points[None, :, :]
+    neighbours = np.einsum('ijk,ijk->ij', d, d) <= eps * eps
+    core = neighbours.sum(axis=1) >= min_samples
+    cluster = 0
+    for i in np.flatnonzero(core).tolist():
+        if labels[i] != -1:
+            continue
+        labels[i] = cluster
+        stack = [i]
+        while stack:
+            j = stack.pop()
+            if not core[j]:
+                continue
+            new = np.flatnonzero(neighbours[j] & (labels == -1))
+            labels[new] = cluster
+            stack.extend(new.tolist())
+        cluster += 1
+    return labels
+
+
+def scene(rng, num_points):
+    # objects of POINTS_PER_OBJECT points each, drifting over the plot area, plus as many clutter points
+    centers = rng.uniform((0, -90), (10, 0), (num_points // (2 * POINTS_PER_OBJECT), 2))
+    velocities = rng.normal(0, 1.0, centers.shape)
+    frames = []
+    for frame in range(FRAMES):
+        objects = rng.normal((centers + 0.1 * frame * velocities)[:, None, :], 0.3,
+                             (len(centers), POINTS_PER_OBJECT, 2)).reshape(-1, 2)
+        clutter = rng.uniform((0, -90), (10, 0), (num_points - len(objects), 2))
+        points = np.concatenate([objects, clutter])
+        frames.append((points, rng.normal(0, 1, len(points))))
+    return frames
+
+
+def timeit_once(function, points):
+    start = time.perf_counter()
+    function(points, EPS)
+    return time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'points':>7} {'dense (ms)':>11} {'grid (ms)':>10} {'speedup':>9} {'update (ms/frame)':>18} {'tracks':>7}")
+    for num_points in (100, 500, 1000, 2000, 5000):
+        frames = scene(rng, num_points)
+        points = frames[0][0]
+        t_grid = min(timeit_once(cluster_points, points) for _ in range(3))
+        if num_points <= 2000:
+            t_dense = min(timeit_once(dense_cluster_points, points) for _ in range(3))
+            assert np.array_equal(dense_cluster_points(points, EPS), cluster_points(points, EPS))
+            dense = f"{1e3 * t_dense:>11.2f} {1e3 * t_grid:>10.2f} {t_dense / t_grid:>8.1f}x"
+        else:
+            dense = f"{'-':>11} {1e3 * t_grid:>10.2f} {'-':>9}"
+
+        tracker = MultiTargetTracker(sensor_position=(5, 0), eps=EPS)
+        start = time.perf_counter()
+        for frame, (points, doppler) in enumerate(frames):
+            tracker.update(points, doppler, 0.1 * frame)
+        t_update = (time.perf_counter() - start) / len(frames)
+        print(f"{num_points:>7} {dense} {1e3 * t_update:>18.2f} {len(tracker.tracks):>7}")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compares the per-tag 2x2 Cramer solve formerly used by final.py with the batched least-squares
+Triangulator, for two anchors and for a lot covered by eight anchors.
+
+With two anchors, Triangulator solves batches of up to TWO_ANCHOR_SCALAR_TAGS tags one tag at a time in closed form;
+the "numpy 2" column forces the NumPy batch instead. Its fixed cost of ~0.15 ms per call is ~10x the per-tag
+closed form at a few tags, the two cross over near 40 tags, and the batch only catches up with per-tag Cramer (no
+weights, no covariance) at ~1000 tags.
+
+Run from the repository root:
+    python -m benchmarks.bench_triangulation
+"""
+import math
+import timeit
+
+import numpy as np
+
+from implementation import triangulation
+from implementation.triangulation import Triangulator
+
+TWO_ANCHORS = [(0, 0), (10, 0)]
+EIGHT_ANCHORS = [(0, 0), (10, 0), (0, -30), (10, -30), (0, -60), (10, -60), (0, -90), (10, -90)]
+BEARING_STD = 2.0
+REPEAT = 20
+
+
+def best_time(function):
+    return min(timeit.repeat(function, number=REPEAT, repeat=3)) / REPEAT
+
+
+def numpy_batch(triangulator, bearings):
+    scalar_tags = triangulation.TWO_ANCHOR_SCALAR_TAGS
+    triangulation.TWO_ANCHOR_SCALAR_TAGS = -1
+    try:
+        return triangulator.solve(bearings)
+    finally:
+        triangulation.TWO_ANCHOR_SCALAR_TAGS = scalar_tags
+
+
+def cramer(theta1, theta2, anchors=TWO_ANCHORS):
+    theta1 = math.radians(theta1)
+    theta2 = math.radians(theta2)
+    (X1, Y1), (X2, Y2) = anchors
+    A = [
+        [math.cos(theta1), -math.cos(theta2)],
+        [math.sin(theta1), -math.sin(theta2)]
+    ]
+    B = [X2 - X1, Y2 - Y1]
+    det = A[0][0]*A[1][1] - A[0][1]*A[1][0]
+    if abs(det) < 1e-6:
+        return None
+    t1 = (A[1][1]*B[0] - A[0][1]*B[1]) / det
+    return (X1 + t1*math.cos(theta1), Y1 + t1*math.sin(theta1))
+
+
+def bearings_to(tags, anchors, rng):
+    anchors = np.asarray(anchors, dtype=np.float64)
+    d = tags[:, None, :] - anchors[None, :, :]
+    return np.degrees(np.arctan2(d[..., 1], d[..., 0])) + rng.normal(0, BEARING_STD, d.shape[:2])
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'tags':>6} {'cramer (ms)':>12} {'solve 2 (ms)':>13} {'numpy 2 (ms)':>13} {'solve 8 (ms)':>13} "
+          f"{'rms err 2 (m)':>14} {'rms err 8 (m)':>14}")
+    triangulator2 = Triangulator(TWO_ANCHORS, bearing_std=BEARING_STD)
+    triangulator8 = Triangulator(EIGHT_ANCHORS, bearing_std=BEARING_STD)
+    for num_tags in (1, 10, 30, 100, 1000):
+        tags = np.column_stack((rng.uniform(1, 9, num_tags), rng.uniform(-85, -5, num_tags)))
+        two = bearings_to(tags, TWO_ANCHORS, rng)
+        eight = bearings_to(tags, EIGHT_ANCHORS, rng)
+
+        result2 = triangulator2.solve(two)
+        batch2 = numpy_batch(triangulator2, two)
+        assert np.allclose(result2.positions, batch2.positions, equal_nan=True)
+        assert np.allclose(result2.covariance, batch2.covariance, equal_nan=True)
+        result8 = triangulator8.solve(eight)
+
+        t_cramer = best_time(lambda: [cramer(theta1, theta2) for theta1, theta2 in two.tolist()])
+        t_two = best_time(lambda: triangulator2.solve(two))
+        t_numpy = best_time(lambda: numpy_batch(triangulator2, two))
+        t_eight = best_time(lambda: triangulator8.solve(eight))
+
+        err2 = np.sqrt(np.nanmean(np.sum((result2.positions - tags) ** 2, axis=1)))
+        err8 = np.sqrt(np.nanmean(np.sum((result8.positions - tags) ** 2, axis=1)))
+        print(f"{num_tags:>6} {1e3 * t_cramer:>12.3f} {1e3 * t_two:>13.3f} {1e3 * t_numpy:>13.3f} "
+              f"{1e3 * t_eight:>13.3f} {err2:>14.2f} {err8:>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares testing every point against every parking zone with matplotlib paths with the ZoneIndex grid, for lots of
+up to a few thousand bays.
+
+Run from the repository root:
+    python -m benchmarks.bench_zones
+"""
+import timeit
+
+import numpy as np
+from matplotlib.path import Path
+
+from implementation.zones import Zone, ZoneIndex
+
+BAY_WIDTH = 2.5
+BAY_LENGTH = 5.0
+POINTS_PER_FRAME = 1000
+REPEAT = 20
+
+
+def parking_lot(rows, columns):
+    """
+    Rows of slanted bays, like a lot with angled parking.
+    """
+    zones = []
+    for row in range(rows):
+        y = row * (BAY_LENGTH + 6.0)  # bays plus an aisle
+        for column in range(columns):
+            x = column * BAY_WIDTH
+            polygon = np.array([(x, y), (x + BAY_WIDTH, y), (x + BAY_WIDTH + 1.0, y + BAY_LENGTH),
+                                (x + 1.0, y + BAY_LENGTH)])
+            zones.append(Zone(f"{row}-{column}", polygon))
+    return zones
+
+
+def per_zone(paths, points):
+    result = np.full(len(points), -1)
+    # reversed so that the first zone wins where bays overlap, as in ZoneIndex
+    for zone in reversed(range(len(paths))):
+        result[paths[zone].contains_points(points)] = zone
+    return result
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'zones':>7} {'per zone (ms)':>14} {'grid (ms)':>10} {'speedup':>9}")
+    for rows, columns in ((1, 10), (4, 50), (10, 100), (20, 200)):
+        zones = parking_lot(rows, columns)
+        index = ZoneIndex(zones)
+        paths = [Path(zone.polygon) for zone in zones]
+        upper = np.array([columns * BAY_WIDTH + 1.0, rows * (BAY_LENGTH + 6.0)])
+        points = rng.uniform(0, 1, (POINTS_PER_FRAME, 2)) * upper
+
+        assert np.array_equal(per_zone(paths, points), index.assign(points))
+        t_zones = min(timeit.repeat(lambda: per_zone(paths, points), number=REPEAT, repeat=3)) / REPEAT
+        t_grid = min(timeit.repeat(lambda: index.assign(points), number=REPEAT, repeat=3)) / REPEAT
+        print(f"{len(zones):>7} {t_zones * 1e3:>14.2f} {t_grid * 1e3:>10.2f} {t_zones / t_grid:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
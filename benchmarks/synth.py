@@ -0,0 +1,53 @@
+"""
+Synthetic mmw demo output packets for benchmarking the radar parser without hardware.
+"""
+import struct
+import random
+
+MAGIC_WORD = b'\x02\x01\x04\x03\x06\x05\x08\x07'
+HEADER_FORMAT = '<8s8I'
+PLATFORM = 0xA2944
+VERSION = 0x03060000
+
+
+def build_packet(frame_number, num_points, sub_frame=0, seed=None, extra_tlvs=()):
+    """
+    Build one mmw demo output packet with a detected points TLV (type 1) and a side info TLV (type 7).
+
+    :param frame_number: Frame number written into the header.
+    :param num_points: Number of detected objects.
+    :param sub_frame: Subframe index written into the header.
+    :param seed: Optional seed for the random point cloud.
+    :param extra_tlvs: Additional (type, payload bytes) TLVs appended after the side info.
+    :return: Packet bytes, padded to a multiple of 32 bytes like the device output.
+    """
+    rng = random.Random(seed if seed is not None else frame_number)
+    points = b''.join(
+        struct.pack('<4f', rng.uniform(-10, 10), rng.uniform(0, 50), rng.uniform(-2, 2), rng.uniform(-5, 5))
+        for _ in range(num_points)
+    )
+    side_info = b''.join(
+        struct.pack('<2H', rng.randint(0, 500), rng.randint(0, 500))
+        for _ in range(num_points)
+    )
+    tlvs = (struct.pack('<2I', 1, len(points)) + points +
+            struct.pack('<2I', 7, len(side_info)) + side_info)
+    for tlv_type, payload in extra_tlvs:
+        tlvs += struct.pack('<2I', tlv_type, len(payload)) + payload
+
+    header_len = struct.calcsize(HEADER_FORMAT)
+    total_len = header_len + len(tlvs)
+    total_len += (-total_len) % 32
+    header = struct.pack(HEADER_FORMAT, MAGIC_WORD, VERSION, total_len, PLATFORM,
+                         frame_number, 0, num_points, 2 + len(extra_tlvs), sub_frame)
+    packet = header + tlvs
+    return packet + b'\x0f' * (total_len - len(packet))
+
+
+def build_stream(num_frames, num_points, first_frame=1):
+    """
+    Build a byte stream of consecutive packets.
+
+    :return: Stream bytes.
+    """
+    return b''.join(build_packet(first_frame + i, num_points) for i in range(num_frames))
@@ -1,13 +1,21 @@
 import serial
-import re
+import logging
 import threading
 import time
 import queue
+import asyncio
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 import math
 from collections import defaultdict
 
+from implementation.async_serial import AsyncSerialHub
+from implementation.renderer import BlitRenderer
+from implementation.trail import Trails
+from implementation.triangulation import Triangulator
+from implementation.ble_parser import UudfParser
+from implementation.capture import (CaptureWriter, CaptureReader, open_port,
+                                    SOURCE_BLE_STATION1, SOURCE_BLE_STATION2)
+
 # Configuration
 BAUD_RATE = 115200
 PORT1 = "COM12"  # Station 1 now on COM30
@@ -16,18 +24,30 @@ STATION1_POSITION = (0, 0)    # Station 1 position (X1, Y1)
 STATION2_POSITION = (10, 0)   # Station 2 position (X2, Y2)
 TRAIL_DURATION = 3            # Trail duration in seconds
 TIME_THRESHOLD = 1            # seconds
+LOG_LEVEL = logging.INFO      # logging.DEBUG prints every received line and triangulation
+CAPTURE_RECORD_PATH = None    # record both stations to this capture file
+CAPTURE_REPLAY_PATH = None    # replay this capture file instead of opening the ports
+CAPTURE_REPLAY_REALTIME = True
+SERIAL_BACKEND = "threads"    # "asyncio" reads both stations on one event loop
+PLOT_INTERVAL = 0.1           # seconds between plot refreshes at the fastest
+
+logger = logging.getLogger(__name__)
 
-# Regex patterns for parsing BLE messages
-AZIMUTH_PATTERN = re.compile(
-    r'\+UUDF:([0-9A-Fa-f]{12}),(-?\d+),(-?\d+),(-?\d+),(\d+),(\d+),"([0-9A-Fa-f]{12})","",(\d+),(\d+)'
-)
+# Byte-level +UUDF parser per station, keeps a partial line between reads
+PARSERS = {"1": UudfParser(), "2": UudfParser()}
 
 # Shared queue for real-time visualization
 data_queue = queue.Queue()
 
 # Store recent data for each tag and station
 station_data = defaultdict(lambda: {"station1": None, "station2": None})
-tag_positions = defaultdict(list)
+tag_positions = Trails(TRAIL_DURATION)
+
+TRIANGULATOR = Triangulator([STATION1_POSITION, STATION2_POSITION])
+
+capture_writer = None
+capture_reader = None
+BLE_SOURCES = {"1": SOURCE_BLE_STATION1, "2": SOURCE_BLE_STATION2}
 
 
 def convert_azimuth_to_math_angle(azimuth):
@@ -38,29 +58,24 @@ def convert_azimuth_to_math_angle(azimuth):
     return math_angle
 
 
-def parse_message(message, station):
+def parse_message(data, station):
     """
-    Parse a BLE message and store azimuth data for triangulation.
+    Parse raw BLE bytes and store azimuth data for triangulation.
+    :param data: Bytes read from the station, a trailing partial line is completed by the next call.
     """
-    match = AZIMUTH_PATTERN.match(message)
-    if match:
-        # Extract values from the message
-        ed_instance_id = match.group(1)
-        azimuth = int(match.group(3))
+    timestamp = time.time()  # Current time for synchronization
+    key = "station1" if station == "1" else "station2"
+    for ed_instance_id, azimuth in PARSERS[station].parse_chunk(data):
         math_angle = convert_azimuth_to_math_angle(azimuth)  # Convert azimuth
-        timestamp = time.time()  # Current time for synchronization
 
         # Store azimuth data for the corresponding station
-        if station == "1":
-            station_data[ed_instance_id]["station1"] = {"azimuth": math_angle, "timestamp": timestamp}
-        elif station == "2":
-            station_data[ed_instance_id]["station2"] = {"azimuth": math_angle, "timestamp": timestamp}
+        station_data[ed_instance_id][key] = {"azimuth": math_angle, "timestamp": timestamp}
 
         # Push the tag ID to the queue for visualization
         data_queue.put(ed_instance_id)
 
         # Output the received azimuth
-        print(f"Station: {station} | Tag: {ed_instance_id} | Azimuth: {azimuth}° | Math Angle: {math_angle}°")
+        logger.debug("Station: %s | Tag: %s | Azimuth: %d° | Math Angle: %d°", station, ed_instance_id, azimuth, math_angle)
 
 
 def read_from_port(port, station):
@@ -69,22 +84,40 @@ def read_from_port(port, station):
     """
     while True:
         try:
-            with serial.Serial(port, BAUD_RATE, timeout=1) as ser:
+            with open_port(port, BAUD_RATE, BLE_SOURCES[station], timeout=1, recorder=capture_writer,
+                           replay=capture_reader, realtime=CAPTURE_REPLAY_REALTIME) as ser:
                 ser.reset_input_buffer()  # Flush input buffer
-                print(f"Listening on {port} (Station {station})...")
+                PARSERS[station].reset()
+                logger.info("Listening on %s (Station %s)...", port, station)
                 while True:
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        print(f"Received: {line}")  # Received message
-                        parse_message(line, station)
+                    # Wait for one line, then parse everything already buffered in one go
+                    data = ser.readline()
+                    waiting = ser.in_waiting
+                    if waiting:
+                        data += ser.read(waiting)
+                    if data:
+                        parse_message(data, station)
         except serial.SerialException as e:
-            print(f"Error opening serial port {port}: {e}. Retrying in 5 seconds...")
+            logger.warning("Error opening serial port %s: %s. Retrying in 5 seconds...", port, e)
             time.sleep(5)
         except KeyboardInterrupt:
-            print(f"Stopping listening on {port}.")
+            logger.info("Stopping listening on %s.", port)
             break
 
 
+def read_ports_async():
+    """
+    Read both stations on one asyncio event loop, reconnecting with backoff.
+    """
+    hub = AsyncSerialHub(recorder=capture_writer)
+    for port, station in ((PORT1, "1"), (PORT2, "2")):
+        def on_line(line, timestamp, station=station):
+            parse_message(line, station)
+        hub.add_line_port(port, BAUD_RATE, on_line, BLE_SOURCES[station])
+
+    asyncio.run(hub.run())
+
+
 def triangulate_position(tag_id):
     """
     Calculate the position of the tag using triangulation based on AoA (azimuth angles).
@@ -96,71 +129,33 @@ def triangulate_position(tag_id):
     data2 = station_data[tag_id]["station2"]
 
     if not data1 or not data2:
-        print(f"Not enough data for triangulation for Tag {tag_id}.")
+        logger.debug("Not enough data for triangulation for Tag %s.", tag_id)
         return None
 
     # Check if the data timestamps are within the threshold
     if abs(data1["timestamp"] - data2["timestamp"]) > TIME_THRESHOLD:
-        print(f"Data for Tag {tag_id} is not synchronized (difference > {TIME_THRESHOLD} seconds).")
+        logger.debug("Data for Tag %s is not synchronized (difference > %s seconds).", tag_id, TIME_THRESHOLD)
         return None
 
-    # Extract azimuth angles and station positions
-    theta1 = math.radians(data1["azimuth"])  # Convert to radians
-    theta2 = math.radians(data2["azimuth"])  # Convert to radians
-    X1, Y1 = STATION1_POSITION  # Station 1 position
-    X2, Y2 = STATION2_POSITION  # Station 2 position
-
-    try:
-        # Define the coefficients matrix A and the constants vector B
-        A = [
-            [math.cos(theta1), -math.cos(theta2)],
-            [math.sin(theta1), -math.sin(theta2)]
-        ]
-        B = [
-            X2 - X1,
-            Y2 - Y1
-        ]
-
-        # Calculate the determinant of A
-        det = A[0][0] * A[1][1] - A[0][1] * A[1][0]
-        EPSILON = 1e-6  # Define a small threshold
-        if abs(det) < EPSILON:
-            print(f"Azimuth angles result in parallel lines for Tag {tag_id}. Cannot triangulate.")
-            return None
-
-        # Compute the inverse of the determinant
-        inv_det = 1 / det
-
-        # Calculate t1 using Cramer's Rule
-        t1 = (A[1][1] * B[0] - A[0][1] * B[1]) * inv_det
-        # t2 = (-A[1][0] * B[0] + A[0][0] * B[1]) * inv_det  # Not used here
-
-        # Calculate the intersection point (X, Y) using t1
-        X = X1 + t1 * math.cos(theta1)
-        Y = Y1 + t1 * math.sin(theta1)
-
-        # Round the results for readability
-        X = round(X, 2)
-        Y = round(Y, 2)
-
-        print(f"Triangulation for Tag {tag_id}: X = {X}, Y = {Y}")
-        return (X, Y)
-
-    except Exception as e:
-        print(f"Error in triangulation for Tag {tag_id}: {e}")
+    # Least-squares intersection of the bearing lines (exact for two stations)
+    result = TRIANGULATOR.solve([[data1["azimuth"], data2["azimuth"]]])
+    if not result.valid[0]:
+        logger.debug("Azimuth angles result in parallel lines for Tag %s. Cannot triangulate.", tag_id)
         return None
 
+    # Round the results for readability
+    X, Y = (round(v, 2) for v in result.positions[0].tolist())
+    error = math.sqrt(result.covariance[0].trace())
+
+    logger.debug("Triangulation for Tag %s: X = %s, Y = %s (±%.2f m)", tag_id, X, Y, error)
+    return (X, Y)
 
 
 def update_trail(tag_id, position):
     """
     Add new position for a tag and remove outdated positions based on TRAIL_DURATION.
     """
-    current_time = time.time()
-    tag_positions[tag_id].append((current_time, position))
-    tag_positions[tag_id] = [
-        (t, pos) for t, pos in tag_positions[tag_id] if current_time - t <= TRAIL_DURATION
-    ]
+    tag_positions.append(tag_id, time.time(), position)
 
 
 def create_plot():
@@ -184,7 +179,19 @@ def create_plot():
     tag_trails = {}
     azimuth_lines = {}  # To hold azimuth lines for each tag
 
-    def update_plot(frame):
+    def add_tag(tag_id):
+        # Assign a unique color to each tag
+        color = plt.cm.tab10(len(tag_scatter) % 10)
+        tag_trails[tag_id], = ax.plot([], [], label=f"Tag {tag_id} Trail", alpha=0.7)
+        tag_scatter[tag_id] = ax.scatter([], [], color=color, label=f"Tag {tag_id} Current",
+                                         alpha=1.0, edgecolors='k', s=50)
+        renderer.add(tag_trails[tag_id])
+        renderer.add(tag_scatter[tag_id])
+        # Redraw legend, it is part of the cached background
+        ax.legend(loc="upper right")
+        renderer.invalidate()
+
+    def update_plot():
         """
         Update the scatter plot with new triangulated positions and azimuth lines.
         """
@@ -196,21 +203,14 @@ def create_plot():
 
         # Update tag plots
         for tag_id, positions in tag_positions.items():
-            if positions:
-                timestamps, coords = zip(*positions)
-                x_vals, y_vals = zip(*coords)
+            if len(positions):
+                # zero-copy views into the trail buffer
+                x_vals, y_vals = positions.x, positions.y
 
-                # Update trail
                 if tag_id not in tag_trails:
-                    tag_trails[tag_id], = ax.plot([], [], label=f"Tag {tag_id} Trail", alpha=0.7)
+                    add_tag(tag_id)
+                # Update trail and current position
                 tag_trails[tag_id].set_data(x_vals, y_vals)
-
-                # Update current position
-                if tag_id not in tag_scatter:
-                    # Assign a unique color to each tag
-                    color = plt.cm.tab10(len(tag_scatter) % 10)
-                    tag_scatter[tag_id] = ax.scatter([], [], color=color, label=f"Tag {tag_id} Current",
-                                                    alpha=1.0, edgecolors='k', s=50)
                 tag_scatter[tag_id].set_offsets([x_vals[-1], y_vals[-1]])
 
                 # Plot azimuth lines from Station 1 and Station 2
@@ -235,37 +235,53 @@ def create_plot():
 
                     if tag_id not in azimuth_lines:
                         azimuth_lines[tag_id] = {
-                            "station1": ax.plot([], [], color="red", linestyle='--', linewidth=1)[0],
-                            "station2": ax.plot([], [], color="blue", linestyle='--', linewidth=1)[0]
+                            "station1": renderer.add(ax.plot([], [], color="red", linestyle='--', linewidth=1)[0]),
+                            "station2": renderer.add(ax.plot([], [], color="blue", linestyle='--', linewidth=1)[0])
                         }
 
                     # Update azimuth lines
                     azimuth_lines[tag_id]["station1"].set_data(az1_x, az1_y)
                     azimuth_lines[tag_id]["station2"].set_data(az2_x, az2_y)
 
-        # Redraw legend
-        ax.legend(loc="upper right")
-
-    ani = FuncAnimation(fig, update_plot, interval=100)  # Update every 100 ms
-    plt.show()
+    # Anchors and axes are drawn once; tags and azimuth lines are blitted over them
+    renderer = BlitRenderer(fig, update_plot, interval=PLOT_INTERVAL, name="BLE plot")
+    ax.legend(loc="upper right")
+    renderer.start()
+    try:
+        plt.show()
+    finally:
+        renderer.stop()
 
 
 def main():
     """
     Main function to read BLE data and visualize triangulated positions.
     """
-    # Start the BLE readers in separate threads
-    thread1 = threading.Thread(target=read_from_port, args=(PORT1, "1"), daemon=True)
-    thread2 = threading.Thread(target=read_from_port, args=(PORT2, "2"), daemon=True)
-    thread1.start()
-    thread2.start()
+    global capture_writer, capture_reader
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if CAPTURE_REPLAY_PATH:
+        capture_reader = CaptureReader(CAPTURE_REPLAY_PATH)
+    elif CAPTURE_RECORD_PATH:
+        capture_writer = CaptureWriter(CAPTURE_RECORD_PATH)
+
+    # Start the BLE readers in separate threads, or one event loop thread for both
+    if SERIAL_BACKEND == "asyncio" and not capture_reader:
+        threads = [threading.Thread(target=read_ports_async, daemon=True)]
+    else:
+        threads = [threading.Thread(target=read_from_port, args=(PORT1, "1"), daemon=True),
+                   threading.Thread(target=read_from_port, args=(PORT2, "2"), daemon=True)]
+    for thread in threads:
+        thread.start()
 
     # Start the visualization
     create_plot()
+    if capture_writer:
+        capture_writer.close()
 
     # Wait for the BLE readers to finish (if ever)
-    thread1.join()
-    thread2.join()
+    for thread in threads:
+        thread.join()
 
 
 if __name__ == "__main__":
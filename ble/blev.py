@@ -1,8 +1,9 @@
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from collections import defaultdict
 import time
 
+from implementation.renderer import BlitRenderer
+from implementation.trail import Trails
+
 # Configuration
 TRAIL_DURATION = 3  # Trail duration in seconds
 ANCHORS = {
@@ -11,20 +12,15 @@ ANCHORS = {
 }
 
 # Store recent triangulated positions for each tag
-tag_positions = defaultdict(list)  # tag_id -> [(timestamp, x, y)]
+tag_positions = Trails(TRAIL_DURATION)  # tag_id -> ring buffer of (timestamp, x, y)
 
 
 def add_tag_position(tag_id, x, y, timestamp):
     """
     Add a new triangulated position for a tag and remove outdated points.
     """
-    # Add the new position
-    tag_positions[tag_id].append((timestamp, x, y))
-
-    # Remove points older than TRAIL_DURATION
-    tag_positions[tag_id] = [
-        (t, px, py) for t, px, py in tag_positions[tag_id] if timestamp - t <= TRAIL_DURATION
-    ]
+    # Add the new position; points older than TRAIL_DURATION drop off the front
+    tag_positions.append(tag_id, timestamp, (x, y))
 
 
 def simulate_data():
@@ -45,7 +41,7 @@ def create_plot():
     """
     Create and update a Matplotlib plot for visualizing triangulated tag positions in real time.
     """
-    # Initialize Matplotlib figure
+    # Initialize Matplotlib figure; axes and anchors are drawn once and cached by the renderer
     fig, ax = plt.subplots()
     ax.set_xlim(-10, 20)  # Adjust as needed for the station layout
     ax.set_ylim(-10, 10)
@@ -53,35 +49,38 @@ def create_plot():
     ax.set_ylabel("Y Position (m)")
     ax.set_title("Real-Time Tag Position Visualization with Anchors")
 
-    def update_plot(frame):
+    # Plot anchor positions
+    for anchor_name, (x, y) in ANCHORS.items():
+        ax.scatter(x, y, c="red", marker="^", s=100, label=anchor_name)  # Anchors as red triangles
+        ax.text(x, y + 0.5, anchor_name, color="red", fontsize=10, ha="center")  # Anchor labels
+
+    tag_trails = {}
+    tag_scatter = {}
+
+    def update_plot():
         """
-        Update the scatter plot with triangulated positions.
+        Update the trails and current positions with triangulated positions.
         """
         simulate_data()  # Simulate data (replace with real data fetching)
-        ax.clear()
-        ax.set_xlim(-10, 20)
-        ax.set_ylim(-10, 10)
-        ax.set_xlabel("X Position (m)")
-        ax.set_ylabel("Y Position (m)")
-        ax.set_title("Real-Time Tag Position Visualization with Anchors")
-
-        # Plot anchor positions
-        for anchor_name, (x, y) in ANCHORS.items():
-            ax.scatter(x, y, c="red", marker="^", s=100, label=anchor_name)  # Anchors as red triangles
-            ax.text(x, y + 0.5, anchor_name, color="red", fontsize=10, ha="center")  # Anchor labels
 
         # Plot data for each tag
         for tag_id, positions in tag_positions.items():
-            if positions:
-                _, x_vals, y_vals = zip(*positions)
-                ax.plot(x_vals, y_vals, label=f"{tag_id} Trail", alpha=0.7)  # Trail
-                ax.scatter(x_vals[-1], y_vals[-1], label=f"{tag_id} Current", alpha=1.0)  # Current position
-
-        ax.legend(loc="upper right")
+            if len(positions):
+                if tag_id not in tag_trails:
+                    tag_trails[tag_id] = renderer.add(ax.plot([], [], label=f"{tag_id} Trail", alpha=0.7)[0])
+                    tag_scatter[tag_id] = renderer.add(ax.scatter([], [], label=f"{tag_id} Current", alpha=1.0))
+                    ax.legend(loc="upper right")
+                    renderer.invalidate()
+                x_vals, y_vals = positions.x, positions.y
+                tag_trails[tag_id].set_data(x_vals, y_vals)  # Trail
+                tag_scatter[tag_id].set_offsets([x_vals[-1], y_vals[-1]])  # Current position
 
     # Animate the plot
-    ani = FuncAnimation(fig, update_plot, interval=500)  # Update every 500 ms
+    renderer = BlitRenderer(fig, update_plot, interval=0.5, name="tag plot")  # Update every 500 ms
+    ax.legend(loc="upper right")
+    renderer.start()
     plt.show()
+    renderer.stop()
 
 
 def main():
@@ -0,0 +1,231 @@
+"""
+Asyncio transport for the BLE stations and the radar: all ports are read on one event loop instead of one
+blocking thread per port.
+
+Uses pyserial-asyncio when it is installed. Otherwise ports are opened non-blocking with pyserial and
+watched with loop.add_reader(), which needs a selector event loop on a platform with pollable serial file
+descriptors (Linux, macOS).
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+
+import serial
+
+from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet
+from radar.radar_interface import FrameReassembler
+
+try:
+    import serial_asyncio
+except ImportError:
+    serial_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+
+class Backoff:
+    def __init__(self, initial=0.5, maximum=30.0, factor=2.0, jitter=0.1):
+        """
+        Exponential reconnect delay with jitter.
+
+        :param initial: First delay in seconds.
+        :param maximum: Largest delay in seconds.
+        :param factor: Growth factor per failed attempt.
+        :param jitter: Random fraction added to every delay, so ports do not retry in lockstep.
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.reset()
+
+    def reset(self):
+        self._delay = self.initial
+
+    def next(self):
+        """
+        :return: Delay before the next attempt, and grow the delay after that.
+        """
+        delay = self._delay
+        self._delay = min(self._delay * self.factor, self.maximum)
+        return delay * (1 + self.jitter * random.random())
+
+
+async def open_serial_stream(port, baudrate):
+    """
+    Open a serial port as an asyncio stream.
+    :param port: Serial port name.
+    :param baudrate: Baud rate.
+    :return: (asyncio.StreamReader, close) with close() releasing the port.
+    """
+    if serial_asyncio is not None:
+        reader, writer = await serial_asyncio.open_serial_connection(url=port, baudrate=baudrate)
+        return reader, writer.close
+
+    loop = asyncio.get_running_loop()
+    ser = serial.Serial(port, baudrate, timeout=0)
+    fd = ser.fileno()
+    reader = asyncio.StreamReader()
+
+    def on_readable():
+        try:
+            data = ser.read(ser.in_waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            loop.remove_reader(fd)
+            reader.set_exception(serial.SerialException(str(e)))
+            return
+        if data:
+            reader.feed_data(data)
+
+    def close():
+        loop.remove_reader(fd)
+        ser.close()
+
+    try:
+        loop.add_reader(fd, on_readable)
+    except NotImplementedError:
+        ser.close()
+        raise RuntimeError("This event loop cannot watch serial ports, install pyserial-asyncio") from None
+    return reader, close
+
+
+class AsyncSerialHub:
+    def __init__(self, queue_size=256, recorder=None, initial_backoff=0.5, max_backoff=30.0):
+        """
+        Read any number of BLE and radar ports on one event loop and feed decoded items into one asyncio.Queue.
+
+        Ports that fail to open or disconnect are reopened with exponential backoff. When the queue is full the
+        oldest item is dropped and counted, so a slow consumer never stalls the ports.
+
+        :param queue_size: Maximum number of queued items.
+        :param recorder: Optional CaptureWriter, everything read is recorded.
+        :param initial_backoff: First reconnect delay in seconds.
+        :param max_backoff: Largest reconnect delay in seconds.
+        """
+        self.queue_size = queue_size
+        self.recorder = recorder
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.queue = None
+        self.dropped = Counter()
+        self.reconnects = Counter()
+        self._ports = []
+        self._tasks = []
+
+    def add_line_port(self, port, baudrate, on_line, source_id=None):
+        """
+        :param port: Serial port name, e.g. a BLE station.
+        :param baudrate: Baud rate.
+        :param on_line: on_line(line, timestamp) called for every line (bytes), returns a queue item or None.
+        :param source_id: Capture source id, used when recording.
+        """
+        self._ports.append((port, baudrate, source_id, self._read_lines, on_line))
+
+    def add_radar_port(self, port, baudrate, on_frame, source_id=None, enabled_tlvs=None):
+        """
+        :param port: Radar data port name.
+        :param baudrate: Baud rate.
+        :param on_frame: on_frame(frame, timestamp) called for every parsed Frame, returns a queue item or None.
+        :param source_id: Capture source id, used when recording.
+        :param enabled_tlvs: Optional collection of TLV types to keep, None keeps all.
+        """
+        def read_frames(port, reader, source_id, on_frame):
+            return self._read_frames(port, reader, source_id, on_frame, enabled_tlvs)
+        self._ports.append((port, baudrate, source_id, read_frames, on_frame))
+
+    def publish(self, item):
+        """
+        Queue an item, dropping the oldest one if the queue is full.
+        """
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except asyncio.QueueFull:
+                dropped = self.queue.get_nowait()
+                self.dropped[dropped[0]] += 1
+
+    async def start(self):
+        """
+        Start one reader task per port. Must be awaited on the loop that consumes self.queue.
+        """
+        self.queue = asyncio.Queue(self.queue_size)
+        for port, baudrate, source_id, read, callback in self._ports:
+            self._tasks.append(asyncio.ensure_future(self._run_port(port, baudrate, source_id, read, callback)))
+
+    async def run(self):
+        """
+        Start the port readers and keep reading until cancelled, for callers that only use the callbacks.
+        """
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self.dropped or self.reconnects:
+            logger.info("Serial hub: dropped %s, reconnects %s", dict(self.dropped), dict(self.reconnects))
+
+    async def _run_port(self, port, baudrate, source_id, read, callback):
+        backoff = Backoff(self.initial_backoff, self.max_backoff)
+        while True:
+            try:
+                reader, close = await open_serial_stream(port, baudrate)
+            except (serial.SerialException, OSError) as e:
+                delay = backoff.next()
+                logger.warning("Error opening serial port %s: %s. Retrying in %.1f seconds...", port, e, delay)
+                await asyncio.sleep(delay)
+                continue
+            logger.info("Listening on %s at %d baud.", port, baudrate)
+            backoff.reset()
+            try:
+                await read(port, reader, source_id, callback)
+            except (serial.SerialException, OSError) as e:
+                logger.warning("Serial port %s disconnected: %s", port, e)
+            finally:
+                close()
+            self.reconnects[port] += 1
+            await asyncio.sleep(backoff.next())
+
+    async def _read_lines(self, port, reader, source_id, on_line):
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # no newline within the stream buffer limit, garbage on the line
+                logger.warning("Discarding overlong line on %s", port)
+                continue
+            if not line:
+                raise serial.SerialException("end of stream")
+            if self.recorder is not None:
+                self.recorder.write(source_id, line)
+            item = on_line(line, time.time())
+            if item is not None:
+                self.publish(item)
+
+    async def _read_frames(self, port, reader, source_id, on_frame, enabled_tlvs):
+        reassembler = FrameReassembler()
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                raise serial.SerialException("end of stream")
+            timestamp = time.time()
+            if self.recorder is not None:
+                self.recorder.write(source_id, data)
+            reassembler.feed(data)
+            for packet in reassembler.frames():
+                try:
+                    frame = parser_one_mmw_demo_output_packet(packet, len(packet), enabled_tlvs)
+                except Exception as e:
+                    logger.warning("Error parsing frame: %s", e)
+                    continue
+                item = on_frame(frame, timestamp)
+                if item is not None:
+                    self.publish(item)
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+def inside_any_aura(points, centers, semi_axes):
+    """
+    Test all points against all tag auras (axis-aligned ellipses) in one broadcasted computation.
+
+    :param points: (N, 2) array-like of point coordinates.
+    :param centers: (T, 2) array-like of aura centers.
+    :param semi_axes: (T, 2) array-like of per-aura (x, y) semi-axes, or a single (x, y) pair for all auras.
+    :return: Boolean array of length N, True where the point lies inside (or on) at least one aura.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0 or len(centers) == 0:
+        return np.zeros(len(points), dtype=bool)
+    semi_axes = np.broadcast_to(np.asarray(semi_axes, dtype=np.float64), centers.shape)
+
+    # (N, T, 2) normalised offsets of every point from every aura center
+    d = (points[:, None, :] - centers[None, :, :]) / semi_axes[None, :, :]
+    return np.any(np.einsum('ntk,ntk->nt', d, d) <= 1.0, axis=1)
+
+
+class TagAuras:
+    def __init__(self, semi_axes):
+        """
+        Aura of every BLE tag as plain arrays, independent of any plotting objects.
+
+        :param semi_axes: Default (x, y) semi-axes of an aura.
+        """
+        self.semi_axes = tuple(semi_axes)
+        self._index = {}
+        self._centers = np.empty((0, 2), dtype=np.float64)
+        self._axes = np.empty((0, 2), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, tag_id):
+        return tag_id in self._index
+
+    @property
+    def tag_ids(self):
+        return list(self._index)
+
+    @property
+    def centers(self):
+        """
+        (T, 2) view of the aura centers, in tag_ids order.
+        """
+        return self._centers
+
+    @property
+    def axes(self):
+        """
+        (T, 2) view of the aura semi-axes, in tag_ids order.
+        """
+        return self._axes
+
+    def set(self, tag_id, center, semi_axes=None):
+        """
+        Place (or move) the aura of a tag.
+        """
+        axes = self.semi_axes if semi_axes is None else semi_axes
+        row = self._index.get(tag_id)
+        if row is None:
+            row = len(self._index)
+            self._index[tag_id] = row
+            self._centers = np.vstack((self._centers, [center]))
+            self._axes = np.vstack((self._axes, [axes]))
+        else:
+            self._centers[row] = center
+            self._axes[row] = axes
+
+    def remove(self, tag_id):
+        row = self._index.pop(tag_id, None)
+        if row is None:
+            return
+        self._centers = np.delete(self._centers, row, axis=0)
+        self._axes = np.delete(self._axes, row, axis=0)
+        for other, other_row in self._index.items():
+            if other_row > row:
+                self._index[other] = other_row - 1
+
+    def clear(self):
+        self._index.clear()
+        self._centers = np.empty((0, 2), dtype=np.float64)
+        self._axes = np.empty((0, 2), dtype=np.float64)
+
+    def classify(self, points):
+        """
+        :param points: (N, 2) array-like of point coordinates.
+        :return: Boolean array of length N, True for points inside any tag's aura (tagged, green).
+        """
+        return inside_any_aura(points, self._centers, self._axes)
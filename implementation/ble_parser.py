@@ -0,0 +1,90 @@
+"""
+Byte-level parser for u-blox AoA "+UUDF" angle reports:
+
+    +UUDF:<instance id>,<rssi>,<azimuth>,<elevation>,<reserved>,<channel>,"<anchor id>","<user defined>",<timestamp>,<periodic event counter>
+
+Works directly on the bytes returned by readline()/read(), without decoding, and only captures and converts the
+fields that are used. A whole buffer of lines is scanned by one compiled pattern per call.
+"""
+import re
+import sys
+
+# All fields of a report are matched, as by the former AZIMUTH_PATTERN, so truncated or corrupted reports are
+# rejected; only the fields that are used are captured
+_UUDF_TAIL = rb'\d+,\d+,"[0-9A-Fa-f]{12}","",\d+,\d+'
+# Instance id and azimuth
+UUDF_PATTERN = re.compile(rb'\+UUDF:([0-9A-Fa-f]{12}),(?:-?\d+),(-?\d+),(?:-?\d+),' + _UUDF_TAIL)
+# Instance id, RSSI, azimuth and elevation
+UUDF_EXTENDED_PATTERN = re.compile(rb'\+UUDF:([0-9A-Fa-f]{12}),(-?\d+),(-?\d+),(-?\d+),' + _UUDF_TAIL)
+# Chunks are scanned with the same patterns anchored at the start of a line and extended to its end, so a chunk
+# accepts exactly the lines parse_line() accepts
+UUDF_LINES_PATTERN = re.compile(rb'(?m)^' + UUDF_PATTERN.pattern + rb'[^\n]*\n')
+UUDF_EXTENDED_LINES_PATTERN = re.compile(rb'(?m)^' + UUDF_EXTENDED_PATTERN.pattern + rb'[^\n]*\n')
+
+# A partial line longer than this is garbage, not the start of a report
+MAX_LINE_LEN = 1024
+
+
+class UudfParser:
+    def __init__(self, extended=False):
+        """
+        :param extended: False yields (tag_id, azimuth), True yields (tag_id, azimuth, elevation, rssi).
+        """
+        self.extended = extended
+        self._pattern = UUDF_EXTENDED_PATTERN if extended else UUDF_PATTERN
+        self._lines_pattern = UUDF_EXTENDED_LINES_PATTERN if extended else UUDF_LINES_PATTERN
+        self._tag_ids = {}
+        self._remainder = b''
+
+    def tag_id(self, raw):
+        """
+        :return: Interned str for a raw instance id, decoded once per tag.
+        """
+        tag_id = self._tag_ids.get(raw)
+        if tag_id is None:
+            tag_id = sys.intern(raw.decode('ascii'))
+            self._tag_ids[raw] = tag_id
+        return tag_id
+
+    def _convert(self, matches):
+        tag_id = self.tag_id
+        if self.extended:
+            return [(tag_id(raw), int(azimuth), int(elevation), int(rssi))
+                    for raw, rssi, azimuth, elevation in matches]
+        return [(tag_id(raw), int(azimuth)) for raw, azimuth in matches]
+
+    def parse_line(self, line):
+        """
+        :param line: One line as bytes, with or without the line ending.
+        :return: Parsed tuple (see extended), or None if the line is not an angle report.
+        """
+        match = self._pattern.match(line)
+        if match is None:
+            return None
+        if self.extended:
+            raw, rssi, azimuth, elevation = match.groups()
+            return (self.tag_id(raw), int(azimuth), int(elevation), int(rssi))
+        raw, azimuth = match.groups()
+        return (self.tag_id(raw), int(azimuth))
+
+    def parse_chunk(self, data):
+        """
+        Parse every complete line of a chunk. A trailing partial line is kept and completed by the next chunk.
+        :param data: Bytes as read from the port.
+        :return: List of parsed tuples, in line order.
+        """
+        if self._remainder:
+            data = self._remainder + data
+        end = data.rfind(b'\n') + 1
+        self._remainder = data[end:]
+        if len(self._remainder) > MAX_LINE_LEN:
+            self._remainder = b''
+        if not end:
+            return []
+        return self._convert(self._lines_pattern.findall(data, 0, end))
+
+    def reset(self):
+        """
+        Drop a buffered partial line, e.g. after a reconnect.
+        """
+        self._remainder = b''
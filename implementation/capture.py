@@ -0,0 +1,302 @@
+"""
+Record-and-replay of raw radar bytes and BLE lines.
+
+A capture file starts with a 24-byte header (magic, version, wall-clock start time) followed by records:
+
+    timestamp  float64  seconds since the start of the capture (time.monotonic based)
+    source     uint8    source id, see SOURCE_* below
+    length     uint32   payload length in bytes
+    payload    bytes    exactly what read()/readline() returned on that port
+
+ReplaySerial reads a capture through mmap and behaves like the serial.Serial objects it stands in for,
+either in real time or as fast as possible.
+
+Summary of a capture:
+    python -m implementation.capture <file>
+"""
+import logging
+import mmap
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+
+import serial
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b'RBCAP\x00\x00\x00'
+CAPTURE_VERSION = 1
+FILE_HEADER = struct.Struct('<8sI4xd')
+RECORD_HEADER = struct.Struct('<dBI')
+
+# Source ids
+SOURCE_RADAR = 0
+SOURCE_BLE_STATION1 = 1
+SOURCE_BLE_STATION2 = 2
+
+
+class CaptureWriter:
+    def __init__(self, path):
+        """
+        Open a new capture file. Safe to share between reader threads.
+        :param path: Output file path, overwritten if it exists.
+        """
+        self.path = path
+        self._file = open(path, 'wb')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._file.write(FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, time.time()))
+
+    def write(self, source_id, payload):
+        """
+        Append one record.
+        :param source_id: Source id of the port the payload came from.
+        :param payload: Raw bytes as returned by the port.
+        """
+        if not payload:
+            return
+        timestamp = time.monotonic() - self._start
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(RECORD_HEADER.pack(timestamp, source_id, len(payload)))
+            self._file.write(payload)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    def __init__(self, path):
+        """
+        Memory-map a capture file. Records are read lazily, so multi-hour captures are not loaded into RAM.
+        :param path: Capture file path.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.wall_start = FILE_HEADER.unpack_from(self._mmap, 0)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {CAPTURE_VERSION} capture file")
+        self._lock = threading.Lock()
+        self._replay_start = None
+
+    def records(self, source_id=None):
+        """
+        Iterate over records in file order.
+        :param source_id: Only yield records of this source, None yields all.
+        :return: Generator of (timestamp, source_id, payload) with payload a memoryview into the mapped file.
+        """
+        view = memoryview(self._mmap)
+        offset = FILE_HEADER.size
+        end = len(self._mmap)
+        try:
+            while offset + RECORD_HEADER.size <= end:
+                timestamp, source, length = RECORD_HEADER.unpack_from(self._mmap, offset)
+                offset += RECORD_HEADER.size
+                if offset + length > end:
+                    logger.warning("Truncated record at the end of %s", self.path)
+                    return
+                if source_id is None or source == source_id:
+                    yield (timestamp, source, view[offset:offset + length])
+                offset += length
+        finally:
+            view.release()
+
+    def replay_start(self):
+        """
+        Wall time (time.monotonic) at which real-time replay started. Shared by all ReplaySerial objects of
+        this reader so that sources stay in sync.
+        """
+        with self._lock:
+            if self._replay_start is None:
+                self._replay_start = time.monotonic()
+            return self._replay_start
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # a record payload is still referenced, the mapping goes away with the last reference
+            pass
+        self._file.close()
+
+
+class RecordingSerial:
+    def __init__(self, ser, writer, source_id):
+        """
+        Wrap an open serial port and record everything read from it.
+        :param ser: serial.Serial object.
+        :param writer: CaptureWriter.
+        :param source_id: Source id written with every record.
+        """
+        self._ser = ser
+        self._writer = writer
+        self._source_id = source_id
+
+    def read(self, size=1):
+        data = self._ser.read(size)
+        self._writer.write(self._source_id, data)
+        return data
+
+    def readline(self):
+        line = self._ser.readline()
+        self._writer.write(self._source_id, line)
+        return line
+
+    def __getattr__(self, name):
+        return getattr(self._ser, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._ser.close()
+
+
+class ReplaySerial:
+    def __init__(self, reader, source_id, timeout=1, realtime=True):
+        """
+        Serial-port stand-in that plays back one source of a capture.
+
+        :param reader: CaptureReader.
+        :param source_id: Source to play back.
+        :param timeout: Like serial.Serial's timeout: how long read() waits before returning what it has.
+        :param realtime: True replays with the recorded timing, False as fast as possible.
+        """
+        self._reader = reader
+        self._records = reader.records(source_id)
+        self.timeout = timeout
+        self.realtime = realtime
+        self.is_open = True
+        self.eof = False
+        self._pending = b''
+        self._pending_due = 0.0
+
+    def _next_payload(self, deadline):
+        """
+        :return: Next payload once it is due, or None if the deadline passes first or the capture has ended.
+        """
+        if not self._pending:
+            try:
+                timestamp, _, self._pending = next(self._records)
+            except StopIteration:
+                self.eof = True
+                return None
+            self._pending_due = self._reader.replay_start() + timestamp if self.realtime else 0.0
+        if self.realtime:
+            now = time.monotonic()
+            if self._pending_due > now:
+                if deadline is not None and self._pending_due > deadline:
+                    time.sleep(max(0.0, deadline - now))
+                    return None
+                time.sleep(self._pending_due - now)
+        payload, self._pending = self._pending, b''
+        return payload
+
+    def _deadline(self):
+        return time.monotonic() + self.timeout if self.timeout is not None else None
+
+    def _idle(self):
+        # behave like an idle port at the end of the capture
+        if self.eof and self.timeout:
+            time.sleep(self.timeout)
+
+    def read(self, size=1):
+        deadline = self._deadline()
+        chunks = []
+        num_bytes = 0
+        while num_bytes < size:
+            payload = self._next_payload(deadline)
+            if payload is None:
+                break
+            take = size - num_bytes
+            if len(payload) > take:
+                self._pending = payload[take:]
+                payload = payload[:take]
+            chunks.append(payload)
+            num_bytes += len(payload)
+            if self.realtime:
+                # like a serial port, return what has arrived instead of waiting for later records
+                deadline = time.monotonic()
+        if not chunks:
+            self._idle()
+        return b''.join(chunks)
+
+    def readline(self):
+        payload = self._next_payload(self._deadline())
+        if payload is None:
+            self._idle()
+            return b''
+        return bytes(payload)
+
+    @property
+    def in_waiting(self):
+        # records are handed out one read at a time, nothing is buffered ahead
+        return 0
+
+    def reset_input_buffer(self):
+        pass
+
+    def write(self, data):
+        return len(data)
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_port(port, baudrate, source_id, timeout=1, recorder=None, replay=None, realtime=True):
+    """
+    Open a serial port, a recording wrapper around it, or a replay of it.
+
+    :param port: Serial port name, unused when replaying.
+    :param baudrate: Baud rate, unused when replaying.
+    :param source_id: Source id of this port in the capture.
+    :param timeout: Read timeout in seconds.
+    :param recorder: Optional CaptureWriter, everything read from the port is recorded.
+    :param replay: Optional CaptureReader, the port is replaced by a replay of source_id.
+    :param realtime: Replay with the recorded timing (True) or as fast as possible (False).
+    :return: serial.Serial-like object.
+    """
+    if replay is not None:
+        return ReplaySerial(replay, source_id, timeout=timeout, realtime=realtime)
+    ser = serial.Serial(port, baudrate, timeout=timeout)
+    if recorder is not None:
+        return RecordingSerial(ser, recorder, source_id)
+    return ser
+
+
+def main(path):
+    reader = CaptureReader(path)
+    counts = Counter()
+    sizes = Counter()
+    duration = 0.0
+    for timestamp, source, payload in reader.records():
+        counts[source] += 1
+        sizes[source] += len(payload)
+        duration = timestamp
+    print(f"{path}: {duration:.1f} s, started {time.ctime(reader.wall_start)}")
+    for source in sorted(counts):
+        print(f"  source {source}: {counts[source]} records, {sizes[source]} bytes")
+    reader.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,115 @@
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueue:
+    def __init__(self, maxsize=256, name="data_queue", report_interval=5.0):
+        """
+        Bounded queue between the reader threads and the fusion consumer that measures itself.
+
+        Every item is stamped when it is put, so the consumer knows how long it waited. When the queue is full
+        the oldest item is dropped, a stale radar frame is worth less than the newest one, and counted.
+
+        :param maxsize: Maximum number of queued items.
+        :param name: Label used in the log line.
+        :param report_interval: Seconds between reports.
+        """
+        self.name = name
+        self.report_interval = report_interval
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self.dropped = Counter()
+        self.frames_missed = 0
+        self._last_frame_number = None
+        self._reset(time.perf_counter())
+
+    def _reset(self, now):
+        self.items = Counter()
+        self.wait_sum = Counter()
+        self.wait_max = Counter()
+        self.depth_max = 0
+        self.window_start = now
+
+    def put(self, kind, value):
+        """
+        Queue one item without blocking the reader.
+        :param kind: Item type, e.g. "BLE" or "Radar".
+        :param value: Item payload.
+        """
+        item = (kind, value, time.perf_counter())
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+            try:
+                dropped_kind, _, _ = self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            with self._lock:
+                self.dropped[dropped_kind] += 1
+
+    def get(self, timeout=None):
+        """
+        Block until an item arrives.
+        :param timeout: Seconds to wait, None waits forever.
+        :return: (kind, value).
+        :raises queue.Empty: If nothing arrived within timeout.
+        """
+        try:
+            kind, value, put_time = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            self._maybe_report(time.perf_counter())
+            raise
+        now = time.perf_counter()
+        wait = now - put_time
+        depth = self._queue.qsize()
+        self.items[kind] += 1
+        self.wait_sum[kind] += wait
+        if wait > self.wait_max[kind]:
+            self.wait_max[kind] = wait
+        if depth > self.depth_max:
+            self.depth_max = depth
+        self._maybe_report(now)
+        return kind, value
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def note_frame_number(self, frame_number):
+        """
+        Count radar frames that never reached the queue (serial loss, skipped by the acquisition process).
+        :param frame_number: Frame number of a frame about to be queued.
+        """
+        with self._lock:
+            last = self._last_frame_number
+            if last is not None and frame_number > last + 1:
+                self.frames_missed += frame_number - last - 1
+            self._last_frame_number = frame_number
+
+    def _maybe_report(self, now):
+        if now - self.window_start >= self.report_interval:
+            self.report(now)
+
+    def report(self, now=None):
+        if now is None:
+            now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed > 0:
+            waits = ", ".join(
+                f"{kind} {self.items[kind] / elapsed:.1f}/s wait mean {1e3 * self.wait_sum[kind] / self.items[kind]:.2f} ms "
+                f"max {1e3 * self.wait_max[kind]:.2f} ms"
+                for kind in sorted(self.items)
+            )
+            with self._lock:
+                dropped = dict(self.dropped)
+                missed = self.frames_missed
+            logger.info("%s: %s; depth now %d max %d; dropped %s; radar frames missed %d",
+                        self.name, waits or "idle", self.qsize(), self.depth_max, dropped, missed)
+        self._reset(now)
@@ -0,0 +1,262 @@
+"""
+Append-only store of the fusion engine events (tag fixes, radar tracks, intruder flags and resets) in SQLite.
+
+The engine's subscriber only queues the event; a writer thread converts queued events to rows and inserts them in
+batches, one transaction per batch, in WAL mode. The fusion thread never waits for the disk, and readers can query
+the file while it is being written.
+
+Every row has the engine time of its event (time.time()) and, where it applies, a zone id:
+
+    kind      "tag" (TagPosition), "track" (one row per track of a TrackUpdate), "intruder" (IntruderFlagged)
+              or "cleared" (IntruderCleared)
+    zone      zone of the track or of the intruder event, NULL elsewhere
+    tag_id    BLE tag of a fix
+    track_id  radar track
+    x, y, vx, vy, tagged, count, residual
+
+Summary and intruder history of a store:
+    python -m implementation.event_store <file> [zone]
+"""
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from implementation.fusion_engine import IntruderCleared, IntruderFlagged, TagPosition, TrackUpdate
+
+logger = logging.getLogger(__name__)
+
+StoredEvent = namedtuple('StoredEvent', 'time source_time kind zone tag_id track_id x y vx vy tagged count residual')
+
+COLUMNS = StoredEvent._fields
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events (time REAL NOT NULL, source_time REAL, kind TEXT NOT NULL, zone TEXT, "
+    "tag_id TEXT, track_id INTEGER, x REAL, y REAL, vx REAL, vy REAL, tagged INTEGER, count INTEGER, "
+    "residual REAL)",
+    "CREATE INDEX IF NOT EXISTS events_time ON events (time)",
+    "CREATE INDEX IF NOT EXISTS events_zone_time ON events (zone, time)",
+    "CREATE INDEX IF NOT EXISTS events_kind_time ON events (kind, time)",
+)
+INSERT = f"INSERT INTO events ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+_STOP = object()
+
+
+def event_rows(event):
+    """
+    :return: List of row tuples (in COLUMNS order) of one engine event, empty for events that are not stored.
+    """
+    if isinstance(event, TrackUpdate):
+        objects = event.objects
+        return [(event.time, event.source_time, "track", zone, None, track_id, x, y, vx, vy, tagged, None, None)
+                for track_id, (x, y), (vx, vy), tagged, zone in zip(
+                    objects.ids.tolist(), objects.positions.tolist(), objects.velocities.tolist(),
+                    event.tagged.tolist(), event.zones)]
+    if isinstance(event, TagPosition):
+        return [(event.time, event.source_time, "tag", None, str(event.tag_id), None, float(event.x), float(event.y),
+                 None, None, None, None, float(event.residual))]
+    if isinstance(event, IntruderFlagged):
+        return [(event.time, event.source_time, "intruder", event.zone, None, None, event.x, event.y, None, None,
+                 None, event.count, None)]
+    if isinstance(event, IntruderCleared):
+        return [(event.time, event.source_time, "cleared", event.zone, None, None, None, None, None, None, None,
+                 None, None)]
+    return []
+
+
+def query_events(path, start=None, end=None, zone=None, kinds=None, limit=None):
+    """
+    Events of a store in time order, from any thread or process, also while the store is being written.
+
+    :param path: Store file.
+    :param start: Earliest event time (time.time()), None from the beginning.
+    :param end: Latest event time, None up to the end.
+    :param zone: Only events of this zone.
+    :param kinds: Only these kinds, e.g. ("intruder", "cleared").
+    :param limit: Maximum number of events.
+    :return: List of StoredEvent.
+    """
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("time >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("time <= ?")
+        params.append(end)
+    if zone is not None:
+        conditions.append("zone = ?")
+        params.append(zone)
+    if kinds:
+        conditions.append(f"kind IN ({', '.join('?' * len(kinds))})")
+        params.extend(kinds)
+    sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY time"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    connection = sqlite3.connect(path)
+    try:
+        return [StoredEvent(*row) for row in connection.execute(sql, params)]
+    finally:
+        connection.close()
+
+
+class EventStore:
+    def __init__(self, path, batch_size=512, flush_interval=0.5, queue_size=65536):
+        """
+        Open (or create) a store and start its writer thread. Pass write as a FusionEngine subscriber.
+
+        :param path: SQLite file, appended to if it exists.
+        :param batch_size: Most events written in one transaction.
+        :param flush_interval: Longest time in seconds a queued event waits before its batch is written.
+        :param queue_size: Events queued for the writer; when full, new events are dropped and counted.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(queue_size)
+        # the schema is created here so that a bad path fails at startup and not on the writer thread
+        connection = self._connect()
+        connection.close()
+        self._thread = threading.Thread(target=self._run, name="event-store", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent with NORMAL; a power cut can lose the last batches, not corrupt the file
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+        return connection
+
+    def write(self, event):
+        """
+        Queue an engine event without blocking.
+        """
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything queued so far has been written.
+        :return: False if the timeout passed first.
+        """
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def query(self, start=None, end=None, zone=None, kinds=None, limit=None):
+        """
+        See query_events(). Only sees events already written, call flush() first to include the queued ones.
+        """
+        return query_events(self.path, start, end, zone, kinds, limit)
+
+    def close(self, timeout=5.0):
+        """
+        Write the queued events and stop the writer thread.
+        """
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self.dropped:
+            logger.warning("Event store %s dropped %d events, the writer could not keep up.", self.path,
+                           self.dropped)
+        logger.info("Event store %s: %d events written.", self.path, self.written)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        connection = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                rows = []
+                waiters = []
+                try:
+                    item = self._queue.get()
+                    deadline = time.monotonic() + self.flush_interval
+                    # collect a batch: up to batch_size events or flush_interval after the first one
+                    while True:
+                        if item is _STOP:
+                            stopping = True
+                            break
+                        if isinstance(item, threading.Event):
+                            waiters.append(item)
+                            break
+                        rows.extend(event_rows(item))
+                        if len(rows) >= self.batch_size:
+                            break
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    pass
+                if stopping:
+                    # everything put before the stop request is still written
+                    while True:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if isinstance(item, threading.Event):
+                            waiters.append(item)
+                        elif item is not _STOP:
+                            rows.extend(event_rows(item))
+                if rows:
+                    self._insert(connection, rows)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            connection.close()
+
+    def _insert(self, connection, rows):
+        try:
+            with connection:
+                connection.executemany(INSERT, rows)
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            logger.error("Event store %s: %d events lost: %s", self.path, len(rows), e)
+
+
+def main(path, zone=None):
+    connection = sqlite3.connect(path)
+    try:
+        where, params = ("WHERE zone = ?", (zone,)) if zone is not None else ("", ())
+        counts = connection.execute(f"SELECT kind, COUNT(*), MIN(time), MAX(time) FROM events {where} "
+                                    f"GROUP BY kind ORDER BY kind", params).fetchall()
+    finally:
+        connection.close()
+    if not counts:
+        print(f"{path}: no events")
+        return
+    start = min(row[2] for row in counts)
+    end = max(row[3] for row in counts)
+    print(f"{path}: {sum(row[1] for row in counts)} events from {time.ctime(start)} to {time.ctime(end)}")
+    for kind, count, _, _ in counts:
+        print(f"  {kind}: {count}")
+    for event in query_events(path, zone=zone, kinds=("intruder", "cleared")):
+        if event.kind == "intruder":
+            print(f"  {time.ctime(event.time)} intruder in zone {event.zone} after {event.count} detections")
+        else:
+            print(f"  {time.ctime(event.time)} zone {event.zone} cleared by a tagged vehicle")
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
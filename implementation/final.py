@@ -1,16 +1,35 @@
 import serial
-import re
+import logging
 import threading
 import time
 import queue
+import asyncio
+import functools
+from pathlib import Path
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import math
 import numpy as np
-from collections import defaultdict
+from matplotlib.collections import PolyCollection
 from matplotlib.patches import Ellipse
 
-from radar.radar_interface import RadarInterface
+from radar.radar_interface import RadarInterface, read_timeout
+from radar.parser_mmw_demo import TC_PASS
+from radar.radar_process import RadarProcess, ReaderStats
+from radar.radar_profile import describe, load_profile
+from implementation.async_serial import AsyncSerialHub
+from implementation.ble_parser import UudfParser
+from implementation.event_queue import EventQueue
+from implementation.event_store import EventStore
+from implementation.renderer import BlitRenderer
+from implementation.fusion_engine import FusionEngine, IntruderFlagged, IntruderCleared
+from implementation.tracker import MultiTargetTracker
+from implementation.zones import Zone, ZoneIndex, load_zones, rectangle
+from implementation.capture import (CaptureWriter, CaptureReader, open_port,
+                                    SOURCE_RADAR, SOURCE_BLE_STATION1, SOURCE_BLE_STATION2)
+
+logger = logging.getLogger(__name__)
+
+# Logging: set to logging.DEBUG to see per-frame parser output
+LOG_LEVEL = logging.INFO
 
 # BLE Configuration
 BLE_BAUD_RATE = 115200
@@ -18,162 +37,253 @@ BLE_PORT1 = "COM27"
 BLE_PORT2 = "COM30"
 STATION1_POSITION = (0, 0)
 STATION2_POSITION = (10, 0)
+# Station id -> position of every AoA anchor used for triangulation
+BLE_ANCHORS = {"1": STATION1_POSITION, "2": STATION2_POSITION}
+BEARING_STD = 5.0  # degrees, weights the least-squares fixes
 
 # Time and Threshold Parameters
 TRAIL_DURATION = 3
 TIME_THRESHOLD = 1
 PERSISTENCE_DURATION = 2.0
-MOVEMENT_THRESHOLD = 0.5
-# Removed ILLEGAL_WAIT_DURATION and STABILITY_DURATION as per new requirements
-ILLEGAL_PERSISTENCE_DURATION = 10.0  # Keep showing intruder after disappearance
 
 # Parking Place Coordinates
 PARKING_PLACE = (2, 4, -20, -10)  # (xmin, xmax, ymin, ymax)
+# JSON file of parking bay polygons (see implementation/zones.py), each bay with its own intruder state;
+# None monitors PARKING_PLACE only
+ZONES_PATH = None
 
 # Radar Configuration
 RADAR_PORT = "COM18"
 RADAR_BAUD_RATE = 921600
+RADAR_USE_PROCESS = False  # read and parse radar frames in a separate process (shared-memory ring)
+# configuration the radar runs (see radar/rad.py), relative to the repository so any working directory works
+RADAR_CONFIG = Path(__file__).resolve().parents[1] / "radar" / "tdm" / "profile_2d_3AzimTx.cfg"
+# Resolutions, limits and frame period derived from RADAR_CONFIG, loaded by main()
+RADAR_PROFILE = None
+
+# "threads": one blocking reader thread per port; "asyncio": all ports on one event loop
+SERIAL_BACKEND = "threads"
+
+# Capture: record all ports to a file, or replay a recorded file instead of opening the ports
+CAPTURE_RECORD_PATH = None  # e.g. "capture.rbcap"
+CAPTURE_REPLAY_PATH = None
+CAPTURE_REPLAY_REALTIME = True  # False replays as fast as possible
+
+# Tag aura (ellipse around each BLE tag) used to tell tagged (green) from untagged (red) points
+AURA_WIDTH = 2
+AURA_HEIGHT = 10
+# The membership test has always used the full height as the y semi-axis
+AURA_SEMI_AXES = (AURA_WIDTH / 2.0, AURA_HEIGHT)
 
 # Intruder Detection Parameters
-INTRUDER_THRESHOLD = 20  # Number of unique red points to declare intruder
-PROXIMITY_THRESHOLD = 0.5  # Distance to consider points as unique
+# Frames in which one untagged radar track is detected inside a zone before an intruder is declared there.
+# Before radar tracking this counted unique untagged points in the parking place; a track yields one smoothed
+# position per frame, so detections of the track are counted instead and the value may need retuning: at 20 it
+# flags an untagged object after about 20 radar frames inside the zone.
+INTRUDER_THRESHOLD = 20
+
+# Radar tracking (plot units): cluster radius, points per cluster, frames before a track is shown
+CLUSTER_EPS = 1.0
+CLUSTER_MIN_POINTS = 1
+TRACK_CONFIRM_HITS = 3
+
+# Radar points are drawn mirrored and scaled around the radar center
+RADAR_PLOT_CENTER = (5, 0)
+RADAR_PLOT_SCALE = 10
+
+# Run fusion and intruder detection without the plot window
+HEADLESS = False
+# Seconds between plot refreshes at the fastest, None for the radar frame period (no faster than frames arrive);
+# slow frames stretch it so the plot never takes most of the CPU
+PLOT_INTERVAL = None
+
+# SQLite file that keeps tag fixes, radar tracks and intruder events for later review
+# (python -m implementation.event_store <file>), e.g. "parking_events.db"; None keeps no history
+EVENT_STORE_PATH = None
+
+# Items queued between the reader threads and the fusion thread; when full the oldest item is dropped
+DATA_QUEUE_SIZE = 256
 
 # Data Structures
-data_queue = queue.Queue()
-station_data = defaultdict(lambda: {"station1": None, "station2": None})
-tag_positions = defaultdict(list)
-radar_positions = []
-
-# Tracking Structures
-point_history = {}
-point_annotations = {}
-parked_points = {}
-
-# Intruder Detection Tracking
-intruder_annotation = None
-unique_parking_points = []  # List to store unique red points inside parking
-intruder_flagged = False  # Flag to indicate if intruder has been flagged
-
-# Regex Pattern for BLE Messages
-AZIMUTH_PATTERN = re.compile(
-    r'\+UUDF:([0-9A-Fa-f]{12}),'
-    r'(-?\d+),(-?\d+),(-?\d+),'
-    r'(\d+),(\d+),'
-    r'"([0-9A-Fa-f]{12})","",(\d+),(\d+)'
-)
+data_queue = EventQueue(DATA_QUEUE_SIZE)
+tracker = MultiTargetTracker(sensor_position=RADAR_PLOT_CENTER, eps=CLUSTER_EPS, min_samples=CLUSTER_MIN_POINTS,
+                             confirm_hits=TRACK_CONFIRM_HITS, max_coast=PERSISTENCE_DURATION)
+zones = ZoneIndex(load_zones(ZONES_PATH) if ZONES_PATH else [Zone("parking", rectangle(PARKING_PLACE))])
+engine = FusionEngine(BLE_ANCHORS, zones, AURA_SEMI_AXES, bearing_std=BEARING_STD,
+                      trail_duration=TRAIL_DURATION, time_threshold=TIME_THRESHOLD,
+                      persistence_duration=PERSISTENCE_DURATION, intruder_threshold=INTRUDER_THRESHOLD,
+                      tracker=tracker)
+
+capture_writer = None
+capture_reader = None
+BLE_SOURCES = {"1": SOURCE_BLE_STATION1, "2": SOURCE_BLE_STATION2}
 
 def convert_azimuth_to_math_angle(azimuth):
     return (90 - azimuth) % 360
 
-def parse_ble_message(message, station):
-    match = AZIMUTH_PATTERN.match(message)
-    if match:
-        tag_id = match.group(1)
-        azimuth = int(match.group(3))
-        math_angle = convert_azimuth_to_math_angle(azimuth)
-        timestamp = time.time()
-
-        if station == "1":
-            station_data[tag_id]["station1"] = {"azimuth": math_angle, "timestamp": timestamp}
-        elif station == "2":
-            station_data[tag_id]["station2"] = {"azimuth": math_angle, "timestamp": timestamp}
-
-        data_queue.put(("BLE", tag_id))
+def parse_ble_chunk(data, station, parser, timestamp):
+    """
+    :param data: Raw bytes read from a BLE station, may end in a partial line kept by the parser.
+    :param parser: UudfParser of that station.
+    :return: List of (tag_id, station, math_angle, timestamp) bearings of every angle report in data.
+    """
+    return [(tag_id, station, convert_azimuth_to_math_angle(azimuth), timestamp)
+            for tag_id, azimuth in parser.parse_chunk(data)]
 
 def read_ble_port(port, station, stop_event):
+    parser = UudfParser()
     while not stop_event.is_set():
         try:
-            with serial.Serial(port, BLE_BAUD_RATE, timeout=1) as ser:
+            with open_port(port, BLE_BAUD_RATE, BLE_SOURCES[station], timeout=1, recorder=capture_writer,
+                           replay=capture_reader, realtime=CAPTURE_REPLAY_REALTIME) as ser:
                 ser.reset_input_buffer()
-                print(f"Listening on {port} (Station {station})...")
+                parser.reset()
+                logger.info("Listening on %s (Station %s)...", port, station)
                 while not stop_event.is_set():
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
-                    if line:
-                        parse_ble_message(line, station)
+                    # wait for one line, then take everything else already buffered in one go
+                    data = ser.readline()
+                    waiting = ser.in_waiting
+                    if waiting:
+                        data += ser.read(waiting)
+                    if data:
+                        for bearing in parse_ble_chunk(data, station, parser, time.time()):
+                            data_queue.put("BLE", bearing)
         except serial.SerialException as e:
-            print(f"Error opening serial port {port}: {e}. Retrying in 5 seconds...")
+            logger.warning("Error opening serial port %s: %s. Retrying in 5 seconds...", port, e)
             time.sleep(5)
         except KeyboardInterrupt:
-            print(f"Stopping listening on {port}.")
+            logger.info("Stopping listening on %s.", port)
             break
 
-def triangulate_position(tag_id):
-    data1 = station_data[tag_id]["station1"]
-    data2 = station_data[tag_id]["station2"]
+def to_plot_points(x, y):
+    """
+    :return: (N, 2) array of radar points in plot coordinates.
+    """
+    points = np.empty((len(x), 2))
+    points[:, 0] = RADAR_PLOT_CENTER[0] - x*RADAR_PLOT_SCALE
+    points[:, 1] = RADAR_PLOT_CENTER[1] - y*RADAR_PLOT_SCALE
+    return points
 
-    if not data1 or not data2:
-        return None
+def to_plot_doppler(v):
+    # mirroring keeps the sign of the radial velocity, scaling multiplies it
+    return np.asarray(v, dtype=np.float64) * RADAR_PLOT_SCALE
 
-    if abs(data1["timestamp"] - data2["timestamp"]) > TIME_THRESHOLD:
-        return None
+def publish_radar_points(detected_points, timestamp, frame_number, doppler=None):
+    data_queue.note_frame_number(frame_number)
+    data_queue.put("Radar", (detected_points, timestamp, doppler))
 
-    theta1 = math.radians(data1["azimuth"])
-    theta2 = math.radians(data2["azimuth"])
-    X1, Y1 = STATION1_POSITION
-    X2, Y2 = STATION2_POSITION
+def read_radar_data(stop_event):
+    serial_port = open_port(RADAR_PORT, RADAR_BAUD_RATE, SOURCE_RADAR, timeout=read_timeout(RADAR_PROFILE),
+                            recorder=capture_writer, replay=capture_reader, realtime=CAPTURE_REPLAY_REALTIME)
+    radar = RadarInterface(port=RADAR_PORT, baudrate=RADAR_BAUD_RATE, serial_port=serial_port, profile=RADAR_PROFILE)
+    stats = ReaderStats("radar reader (thread)")
+    try:
+        while not stop_event.is_set():
+            read_done = None
+            for frame in radar.iter_frames():
+                if read_done is None:
+                    read_done = time.perf_counter()
+                    read_time = time.time()
+                if frame.result != TC_PASS:
+                    continue
+                publish_radar_points(to_plot_points(frame.x, frame.y), read_time, frame.frameNumber,
+                                     to_plot_doppler(frame.v))
+                stats.record(time.perf_counter() - read_done)
+    except KeyboardInterrupt:
+        logger.info("Stopping radar data collection.")
+    finally:
+        radar.close()
 
+def read_radar_process(stop_event):
+    """
+    Pick up frames published by the acquisition process. Only the newest frame is taken, so a slow
+    consumer skips frames instead of falling behind.
+    """
+    radar = RadarProcess(port=RADAR_PORT, baudrate=RADAR_BAUD_RATE, log_level=LOG_LEVEL, profile=RADAR_PROFILE)
+    radar.start()
     try:
-        A = [
-            [math.cos(theta1), -math.cos(theta2)],
-            [math.sin(theta1), -math.sin(theta2)]
-        ]
-        B = [X2 - X1, Y2 - Y1]
-        det = A[0][0]*A[1][1] - A[0][1]*A[1][0]
-
-        if abs(det) < 1e-6:
+        while not stop_event.is_set():
+            latest = radar.latest_frame()
+            if latest is None:
+                # a few polls per frame period
+                time.sleep(RADAR_PROFILE.frame_period / 20)
+                continue
+            frame_number, timestamp, points = latest
+            publish_radar_points(to_plot_points(points[:, 0], points[:, 1]), timestamp, frame_number,
+                                 to_plot_doppler(points[:, 3]))
+    finally:
+        radar.close()
+
+def run_fusion(stop_event):
+    """
+    Feed everything the reader threads publish into the fusion engine, independent of any plot window.
+    """
+    stats = ReaderStats("fusion engine")
+    while not stop_event.is_set():
+        # Wake up for every item as soon as it is queued; the timeout only lets old points expire
+        try:
+            data_type, data_value = data_queue.get(timeout=0.1)
+        except queue.Empty:
+            engine.step(time.time())
+            continue
+        fuse(data_type, data_value, stats)
+
+def fuse(data_type, data_value, stats):
+    if data_type == "BLE":
+        engine.submit_bearing(*data_value)
+    else:
+        engine.submit_radar_frame(*data_value)
+    engine.step(time.time())
+    if engine.last_detection_latency is not None:
+        # serial read of the radar frame to the end of its intruder check
+        stats.record(engine.last_detection_latency)
+        engine.last_detection_latency = None
+
+def run_async_io(stop_event):
+    """
+    Read both BLE stations and the radar on one asyncio event loop and fuse on the same loop.
+    """
+    asyncio.run(async_io_main(stop_event))
+
+async def async_io_main(stop_event):
+    hub = AsyncSerialHub(DATA_QUEUE_SIZE, recorder=capture_writer)
+
+    def on_ble_line(line, timestamp, station, parser):
+        parsed = parser.parse_line(line)
+        if parsed is None:
+            return None
+        tag_id, azimuth = parsed
+        return ("BLE", (tag_id, station, convert_azimuth_to_math_angle(azimuth), timestamp))
+
+    def on_radar_frame(frame, timestamp):
+        if frame.result != TC_PASS or not RADAR_PROFILE.validate_frame(frame):
             return None
+        return ("Radar", (to_plot_points(frame.x, frame.y), timestamp, to_plot_doppler(frame.v)))
 
-        inv_det = 1/det
-        t1 = (A[1][1]*B[0] - A[0][1]*B[1])*inv_det
-        X = X1 + t1*math.cos(theta1)
-        Y = Y1 + t1*math.sin(theta1)
-        return (X, Y)
-    except Exception as e:
-        print(f"Error in triangulation for Tag {tag_id}: {e}")
-        return None
-
-def update_trail(tag_id, position):
-    current_time = time.time()
-    tag_positions[tag_id].append((current_time, position))
-    tag_positions[tag_id] = [
-        (t, pos) for t, pos in tag_positions[tag_id] if current_time - t <= TRAIL_DURATION
-    ]
+    for port, station in ((BLE_PORT1, "1"), (BLE_PORT2, "2")):
+        on_line = functools.partial(on_ble_line, station=station, parser=UudfParser())
+        hub.add_line_port(port, BLE_BAUD_RATE, on_line, BLE_SOURCES[station])
+    hub.add_radar_port(RADAR_PORT, RADAR_BAUD_RATE, on_radar_frame, SOURCE_RADAR)
+    await hub.start()
 
-def read_radar_data(stop_event):
-    global radar_positions
-    radar_center = (5, 0)
-    radar = RadarInterface(port=RADAR_PORT, baudrate=RADAR_BAUD_RATE)
+    stats = ReaderStats("fusion engine (asyncio)")
     try:
         while not stop_event.is_set():
-            raw_data = radar.read_data()
-            parsed_results = radar.parse_frame(raw_data)
-            if parsed_results and parsed_results[0] == 0:
-                detectedX_array = parsed_results[7]
-                detectedY_array = parsed_results[8]
-                detected_points = [
-                    (radar_center[0] - x*10, radar_center[1] - y*10)
-                    for x, y in zip(detectedX_array, detectedY_array)
-                ]
-                radar_positions = detected_points
-                data_queue.put(("Radar", detected_points))
-    except KeyboardInterrupt:
-        print("Stopping radar data collection.")
+            try:
+                data_type, data_value = await asyncio.wait_for(hub.queue.get(), 0.1)
+            except asyncio.TimeoutError:
+                engine.step(time.time())
+                continue
+            fuse(data_type, data_value, stats)
     finally:
-        radar.close()
+        await hub.stop()
 
-def point_in_parking(px, py, region):
-    xmin, xmax, ymin, ymax = region
-    return xmin <= px <= xmax and ymin <= py <= ymax
-
-def is_unique_point(px, py, unique_points, threshold=PROXIMITY_THRESHOLD):
-    for (ux, uy) in unique_points:
-        distance = math.hypot(px - ux, py - uy)
-        if distance < threshold:
-            return False
-    return True
+def log_event(event):
+    if isinstance(event, IntruderFlagged):
+        logger.info("Intruder flagged in zone %s %.1f ms after the radar frame was read.", event.zone,
+                    1e3 * (event.time - event.source_time))
 
 def create_plot(stop_event):
-    global intruder_annotation, unique_parking_points, intruder_flagged
     fig, ax = plt.subplots()
     ax.set_xlim(0, 10)
     ax.set_ylim(-90, 0)
@@ -188,204 +298,146 @@ def create_plot(stop_event):
     radar_center = (5, 2)
     ax.plot(radar_center[0], radar_center[1], 's', label="Radar", color="red", markersize=8)
 
-    # Draw parking place for visualization
-    rect = plt.Rectangle((PARKING_PLACE[0], PARKING_PLACE[2]),
-                         PARKING_PLACE[1]-PARKING_PLACE[0],
-                         PARKING_PLACE[3]-PARKING_PLACE[2],
-                         fill=False, edgecolor='blue', linestyle='--', label="Parking Place")
-    ax.add_patch(rect)
-
-    radar_scatter = ax.scatter([], [], s=20, label="Radar Detections", alpha=0.7)
+    # Draw the parking zones for visualization, all bays as one collection
+    ax.add_collection(PolyCollection([zone.polygon for zone in zones.zones], facecolors='none', edgecolors='blue',
+                                     linestyles='--', label="Parking Place"))
 
     ble_trails = {}
     ble_scatters = {}
     aura_ellipses = {}
-
-    ax.legend(loc="upper right")
-
-    # Initialize intruder tracking
-    unique_parking_points = []
-    intruder_annotation = None
-    intruder_flagged = False
-
-    def update(frame):
-        global intruder_annotation, unique_parking_points, intruder_flagged
-        current_time = time.time()
-
-        # Process incoming data
-        while not data_queue.empty():
-            data_type, data_value = data_queue.get()
-            if data_type == "BLE":
-                position = triangulate_position(data_value)
-                if position:
-                    update_trail(data_value, position)
-
-        # Remove old aura ellipses
-        for tag_id, ellipse in aura_ellipses.items():
-            ellipse.remove()
-        aura_ellipses.clear()
-
-        # Update BLE tags and their auras
-        for tag_id, trail in tag_positions.items():
-            if not trail:
-                continue
-            _, coords = zip(*trail)
+    intruder_annotations = {}
+
+    # Engine events arrive on the fusion thread; hand them over to the GUI thread
+    events = queue.Queue()
+    engine.subscribe(events.put)
+
+    def add_tag(tag_id):
+        ble_trails[tag_id], = ax.plot([], [], label=f"Tag {tag_id} Trail", alpha=0.7)
+        ble_scatters[tag_id] = ax.scatter([], [], label=f"Tag {tag_id} Current", edgecolor='k', s=50)
+        aura_ellipses[tag_id] = ax.add_patch(Ellipse((0, 0), width=AURA_WIDTH, height=AURA_HEIGHT,
+                                                     color="green", alpha=0.3))
+        for artist in (ble_trails[tag_id], ble_scatters[tag_id], aura_ellipses[tag_id]):
+            renderer.add(artist)
+        # new legend entries are part of the background
+        ax.legend(loc="upper right")
+        renderer.invalidate()
+
+    def update():
+        snapshot = engine.snapshot()
+
+        # Update BLE tags and move their auras; tags without a recent fix are hidden
+        for tag_id in ble_trails.keys() - snapshot.trails.keys():
+            for artists in (ble_trails, ble_scatters, aura_ellipses):
+                artists[tag_id].set_visible(False)
+        for tag_id, coords in snapshot.trails.items():
             if tag_id not in ble_trails:
-                ble_trails[tag_id], = ax.plot([], [], label=f"Tag {tag_id} Trail", alpha=0.7)
-            ble_trails[tag_id].set_data(*zip(*coords))
-
-            if tag_id not in ble_scatters:
-                ble_scatters[tag_id] = ax.scatter([], [], label=f"Tag {tag_id} Current", edgecolor='k', s=50)
-            ble_scatters[tag_id].set_offsets([coords[-1]])
-
-            aura_ellipse = Ellipse(
-                coords[-1],
-                width=2,
-                height=10,
-                color="green",
-                alpha=0.3
-            )
-            ax.add_patch(aura_ellipse)
-            aura_ellipses[tag_id] = aura_ellipse
-
-        new_points = radar_positions if radar_positions else []
-        updated_keys = set()
-
-        # Update detected points and track unique objects
-        for (px, py) in new_points:
-            inside_aura = False
-            for ellipse in aura_ellipses.values():
-                x0, y0 = ellipse.center
-                aura_radius_x = ellipse.width / 2.0
-                aura_radius_y = ellipse.height
-                dx = (px - x0)/aura_radius_x
-                dy = (py - y0)/aura_radius_y
-                if dx**2 + dy**2 <= 1:
-                    inside_aura = True
-                    break
-            color = "green" if inside_aura else "red"
-
-            prev_info = point_history.get((px, py))
-            if prev_info is None:
-                # New point
-                point_history[(px, py)] = {
-                    'last_seen': current_time,
-                    'color': color,
-                    'prev_pos': (px, py),
-                    'parking_enter_count': 0  # Initialize count
-                }
-            else:
-                # Update existing point
-                point_history[(px, py)]['last_seen'] = current_time
-                point_history[(px, py)]['color'] = color
-
-            updated_keys.add((px, py))
-
-        # Build final list of points and handle expired points
-        filtered_points = []
-        filtered_colors = []
-        expired_keys = []
-
-        for (key_px, key_py), info in point_history.items():
-            if (key_px, key_py) not in updated_keys:
-                # Not updated this frame
-                if current_time - info['last_seen'] <= PERSISTENCE_DURATION:
-                    filtered_points.append((key_px, key_py))
-                    filtered_colors.append(info['color'])
-                else:
-                    expired_keys.append((key_px, key_py))
-            else:
-                filtered_points.append((key_px, key_py))
-                filtered_colors.append(info['color'])
-
-        # Remove expired points from point_history and normal annotations
-        for k in expired_keys:
-            if k in point_annotations:
-                point_annotations[k].remove()
-                del point_annotations[k]
-            if k in point_history:
-                del point_history[k]
-
-        current_set = set(filtered_points)
-
-        # Intruder Detection Logic
-        for (px, py), c in zip(filtered_points, filtered_colors):
-            inside_parking = point_in_parking(px, py, PARKING_PLACE)
-            untagged = (c == "red")
-
-            if untagged and inside_parking:
-                # Check if this point is unique
-                if is_unique_point(px, py, unique_parking_points, PROXIMITY_THRESHOLD):
-                    unique_parking_points.append((px, py))
-                    intruder_count = len(unique_parking_points)
-                    print(f"Unique red point detected at ({px:.1f}, {py:.1f}). Total unique red points: {intruder_count}")
-
-                    if intruder_count > INTRUDER_THRESHOLD and not intruder_flagged:
-                        print(f"Intruder detected! {intruder_count} unique red points inside parking.")
-                        # Place annotation at the center of parking place
-                        mid_x = (PARKING_PLACE[0] + PARKING_PLACE[1]) / 2
-                        mid_y = (PARKING_PLACE[2] + PARKING_PLACE[3]) / 2
-                        intruder_annotation = ax.text(mid_x, mid_y, "Intruder Detected", fontsize=12, color="red",
-                                                     ha='center', va='center',
-                                                     bbox=dict(facecolor='yellow', alpha=0.5))
-                        intruder_flagged = True
-            elif c == "green" and inside_parking:
-                # Reset intruder detection
-                if intruder_annotation:
-                    intruder_annotation.remove()
-                    intruder_annotation = None
-                    print("Tagged vehicle detected inside parking. Intruder annotation removed.")
-                unique_parking_points.clear()
-                intruder_flagged = False
-
-        # Handle parked_points that disappeared (optional, can be kept for other logic)
-        for pt in list(parked_points.keys()):
-            if pt not in current_set:
-                info = parked_points[pt]
-                # If absent too long, consider left
-                if current_time - info['last_seen'] > ILLEGAL_PERSISTENCE_DURATION:
-                    print(f"Intruder left the parking lot (previously at {pt})")
-                    info['annot'].remove()
-                    del parked_points[pt]
+                add_tag(tag_id)
+            ble_trails[tag_id].set_data(coords[:, 0], coords[:, 1])
+            ble_scatters[tag_id].set_offsets(coords[-1:])
+            aura_ellipses[tag_id].set_center(snapshot.tag_positions[tag_id])
+            for artists in (ble_trails, ble_scatters, aura_ellipses):
+                artists[tag_id].set_visible(True)
+
+        # Intruder annotation at the center of each flagged zone
+        while not events.empty():
+            event = events.get()
+            if isinstance(event, IntruderFlagged):
+                if event.zone not in intruder_annotations:
+                    intruder_annotations[event.zone] = renderer.add(
+                        ax.text(event.x, event.y, "Intruder Detected", fontsize=12, color="red", ha='center',
+                                va='center', bbox=dict(facecolor='yellow', alpha=0.5)))
+                intruder_annotations[event.zone].set_visible(True)
+            elif isinstance(event, IntruderCleared) and event.zone in intruder_annotations:
+                intruder_annotations[event.zone].set_visible(False)
 
         # Update scatter plot
-        if filtered_points:
-            radar_scatter.set_offsets(filtered_points)
-            radar_scatter.set_facecolors(filtered_colors)
+        if len(snapshot.points):
+            radar_scatter.set_offsets(snapshot.points)
+            radar_scatter.set_facecolors(snapshot.colors)
         else:
             radar_scatter.set_offsets(np.empty((0, 2)))
             radar_scatter.set_facecolors([])
 
-    ani = FuncAnimation(fig, update, interval=100, cache_frame_data=False)
+    # The artists below change between frames and are blitted over the static background drawn above
+    interval = PLOT_INTERVAL if PLOT_INTERVAL is not None else RADAR_PROFILE.frame_period
+    renderer = BlitRenderer(fig, update, interval=interval, name="parking lot plot")
+    radar_scatter = renderer.add(ax.scatter([], [], s=20, label="Radar Detections", alpha=0.7))
+    ax.legend(loc="upper right")
+    renderer.start()
 
     try:
         plt.show()
     except KeyboardInterrupt:
-        print("Plot closed by user")
+        logger.info("Plot closed by user")
+    finally:
+        renderer.stop()
+
+def wait_headless(stop_event):
+    logger.info("Running headless, press Ctrl+C to stop.")
+    try:
+        while not stop_event.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        logger.info("Stopping.")
 
 def main():
+    global capture_writer, capture_reader, RADAR_PROFILE
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    RADAR_PROFILE = load_profile(RADAR_CONFIG)
+    logger.info("Radar profile %s: %s", RADAR_CONFIG, describe(RADAR_PROFILE))
     stop_event = threading.Event()
 
-    # Start BLE listening threads
-    ble_thread1 = threading.Thread(target=read_ble_port, args=(BLE_PORT1, "1", stop_event), daemon=True)
-    ble_thread2 = threading.Thread(target=read_ble_port, args=(BLE_PORT2, "2", stop_event), daemon=True)
-
-    ble_thread1.start()
-    ble_thread2.start()
-
-    # Start Radar reading thread
-    radar_thread = threading.Thread(target=read_radar_data, args=(stop_event,), daemon=True)
-    radar_thread.start()
-
-    # Start plotting and intruder detection
-    create_plot(stop_event)
+    if CAPTURE_REPLAY_PATH:
+        capture_reader = CaptureReader(CAPTURE_REPLAY_PATH)
+        logger.info("Replaying capture %s", CAPTURE_REPLAY_PATH)
+    elif CAPTURE_RECORD_PATH:
+        capture_writer = CaptureWriter(CAPTURE_RECORD_PATH)
+        logger.info("Recording capture to %s", CAPTURE_RECORD_PATH)
+
+    engine.subscribe(log_event)
+    event_store = EventStore(EVENT_STORE_PATH) if EVENT_STORE_PATH else None
+    if event_store:
+        engine.subscribe(event_store.write)
+        logger.info("Storing events in %s", EVENT_STORE_PATH)
+    use_asyncio = SERIAL_BACKEND == "asyncio" and not capture_reader
+    if SERIAL_BACKEND == "asyncio" and not use_asyncio:
+        logger.warning("Capture replay runs the serial readers in threads.")
+
+    if use_asyncio:
+        # All ports and intruder detection on one event loop
+        threads = [threading.Thread(target=run_async_io, args=(stop_event,), daemon=True)]
+    else:
+        # BLE listening threads
+        threads = [threading.Thread(target=read_ble_port, args=(BLE_PORT1, "1", stop_event), daemon=True),
+                   threading.Thread(target=read_ble_port, args=(BLE_PORT2, "2", stop_event), daemon=True)]
+
+        # Radar reading thread
+        use_process = RADAR_USE_PROCESS and not (capture_reader or capture_writer)
+        if RADAR_USE_PROCESS and not use_process:
+            logger.warning("Capture record/replay runs the radar reader in a thread.")
+        radar_reader = read_radar_process if use_process else read_radar_data
+        threads.append(threading.Thread(target=radar_reader, args=(stop_event,), daemon=True))
+
+        # Intruder detection
+        threads.append(threading.Thread(target=run_fusion, args=(stop_event,), daemon=True))
+    for thread in threads:
+        thread.start()
+
+    # Plotting only renders the engine state
+    if HEADLESS:
+        wait_headless(stop_event)
+    else:
+        create_plot(stop_event)
 
     # When plotting window is closed, signal threads to stop
     stop_event.set()
-    ble_thread1.join(timeout=2)
-    ble_thread2.join(timeout=2)
-    radar_thread.join(timeout=2)
-    print("Exiting main.")
+    for thread in threads:
+        thread.join(timeout=2)
+    if capture_writer:
+        capture_writer.close()
+    if event_store:
+        event_store.close()
+    logger.info("Exiting main.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,240 @@
+import logging
+import threading
+from collections import namedtuple
+
+from implementation.aura import TagAuras
+from implementation.tracker import MultiTargetTracker, tracks_to_objects
+from implementation.trail import Trails
+from implementation.triangulation import BearingTable, Triangulator
+from implementation.zones import Zone, ZoneIndex, rectangle
+
+logger = logging.getLogger(__name__)
+
+# Events emitted by FusionEngine.step(). time is when the event was emitted, source_time when the radar frame or
+# BLE message that caused it was read, so time - source_time is the end-to-end detection latency.
+# TagPosition carries the (2, 2) position covariance and the RMS bearing residual of the fix as quality measures.
+TagPosition = namedtuple('TagPosition', 'time source_time tag_id x y covariance residual')
+# Intruder events carry the zone id and x, y of the zone's center.
+# TrackUpdate follows every radar frame with tracks: a DetectedObjectSet of the tracks, whether each is inside a tag
+# aura and the zone id of each (None outside every zone).
+TrackUpdate = namedtuple('TrackUpdate', 'time source_time objects tagged zones')
+IntruderFlagged = namedtuple('IntruderFlagged', 'time source_time count x y zone')
+IntruderCleared = namedtuple('IntruderCleared', 'time source_time zone')
+
+# State handed to visualizers
+FusionSnapshot = namedtuple('FusionSnapshot',
+                            'points colors objects trails tag_positions intruder_flagged intruder_count '
+                            'flagged_zones')
+
+
+def as_zone_index(zones):
+    """
+    :param zones: ZoneIndex, list of Zones, or a single (xmin, xmax, ymin, ymax) parking place.
+    """
+    if isinstance(zones, ZoneIndex):
+        return zones
+    if len(zones) == 4 and not isinstance(zones[0], Zone):
+        return ZoneIndex([Zone("parking", rectangle(zones))])
+    return ZoneIndex(zones)
+
+
+class FusionEngine:
+    def __init__(self, anchors, zones, aura_semi_axes, anchor_orientations=None, bearing_std=5.0,
+                 trail_duration=3, trail_capacity=256, time_threshold=1, persistence_duration=2.0,
+                 intruder_threshold=20, tracker=None):
+        """
+        BLE triangulation, radar object tracking and classification, and intruder detection without any GUI.
+
+        Feed it with submit_bearing() and submit_radar_frame() as data arrives and call step() to process it.
+        Subscribers receive TagPosition, TrackUpdate, IntruderFlagged and IntruderCleared events; visualizers can poll
+        snapshot() at their own rate.
+
+        :param anchors: Dict of BLE station id -> (x, y) position, any number of stations.
+        :param zones: Monitored parking zones: a ZoneIndex, a list of Zones or one (xmin, xmax, ymin, ymax)
+                      parking place. Each zone has its own intruder state.
+        :param aura_semi_axes: (x, y) semi-axes of the aura around each tag.
+        :param anchor_orientations: Optional dict of station id -> orientation in degrees added to its bearings.
+        :param bearing_std: Bearing noise standard deviation in degrees, weights the least-squares fixes.
+        :param trail_duration: Seconds of tag positions kept per tag; a tag without a fix for this long is dropped.
+        :param trail_capacity: Maximum positions kept per tag.
+        :param time_threshold: Maximum age difference of the bearings used for a fix.
+        :param persistence_duration: Seconds a radar track survives without detections.
+        :param intruder_threshold: Detections of one untagged track inside a zone that flag an intruder there.
+        :param tracker: MultiTargetTracker for the radar points, None uses the defaults.
+        """
+        self.anchors = dict(anchors)
+        self.zones = as_zone_index(zones)
+        self.trail_duration = trail_duration
+        self.time_threshold = time_threshold
+        self.persistence_duration = persistence_duration
+        self.intruder_threshold = intruder_threshold
+
+        orientations = None
+        if anchor_orientations is not None:
+            orientations = [anchor_orientations.get(station, 0.0) for station in self.anchors]
+        self.triangulator = Triangulator(list(self.anchors.values()), orientations, bearing_std)
+        self.bearings = BearingTable(self.triangulator, list(self.anchors), time_threshold)
+        self.tag_positions = Trails(trail_duration, trail_capacity)
+        self.tag_auras = TagAuras(aura_semi_axes)
+        if tracker is None:
+            tracker = MultiTargetTracker(max_coast=persistence_duration)
+        self.tracker = tracker
+        self.tracks = []
+        self.track_colors = {}
+        self.zone_hits = {}  # zone index -> {track id: detections inside the zone}
+        self.flagged_zones = set()
+        self.last_detection_latency = None
+
+        self._pending = []
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        :param callback: Called with every event, from the thread that calls step().
+        """
+        self._subscribers.append(callback)
+
+    def submit_bearing(self, tag_id, station, azimuth, timestamp):
+        """
+        :param tag_id: BLE tag instance id.
+        :param station: Station id, a key of anchors.
+        :param azimuth: Bearing as a mathematical angle in degrees (counter-clockwise from East).
+        :param timestamp: time.time() at which the message was read.
+        """
+        self._pending.append(("BLE", (tag_id, station, azimuth, timestamp)))
+
+    def submit_radar_frame(self, points, timestamp, doppler=None):
+        """
+        :param points: (N, 2) array-like of radar points in plot coordinates.
+        :param timestamp: time.time() at which the frame was read.
+        :param doppler: Optional (N,) radial velocities in plot units per second.
+        """
+        self._pending.append(("Radar", (points, timestamp, doppler)))
+
+    def step(self, now):
+        """
+        Process everything submitted since the last call, in arrival order, and drop stale radar tracks.
+        :param now: Current time.time().
+        :return: List of emitted events.
+        """
+        events = []
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for data_type, data_value in pending:
+                if data_type == "BLE":
+                    tag_id, station, azimuth, timestamp = data_value
+                    self.bearings.update(tag_id, station, azimuth, timestamp)
+                else:
+                    # auras must reflect every bearing that arrived before this frame
+                    self._triangulate_pending(now, events)
+                    self._process_radar_frame(now, *data_value, events)
+            self._triangulate_pending(now, events)
+            self._expire_tracks(now)
+            self._expire_tags(now)
+        for event in events:
+            for callback in self._subscribers:
+                callback(event)
+        return events
+
+    @property
+    def intruder_flagged(self):
+        return bool(self.flagged_zones)
+
+    def snapshot(self):
+        """
+        :return: FusionSnapshot of the current track positions, colors, objects, trails and intruder state.
+        """
+        with self._lock:
+            objects = tracks_to_objects(self.tracks)
+            points = objects.positions
+            colors = [self.track_colors.get(track.id, "red") for track in self.tracks]
+            # copies, the trail buffers keep changing on the fusion thread
+            trails = {tag_id: trail.xy.copy() for tag_id, trail in self.tag_positions.items() if len(trail)}
+            tag_positions = {tag_id: tuple(trail[-1].tolist()) for tag_id, trail in trails.items()}
+            intruder_count = max((max(hits.values()) for hits in self.zone_hits.values()), default=0)
+            flagged_zones = tuple(self.zones.zone_ids[zone] for zone in sorted(self.flagged_zones))
+            return FusionSnapshot(points, colors, objects, trails, tag_positions,
+                                  self.intruder_flagged, intruder_count, flagged_zones)
+
+    def _triangulate_pending(self, now, events):
+        # all tags with new bearings in one batch
+        for tag_id, position, covariance, residual, timestamp in self.bearings.solve_pending():
+            self._update_trail(tag_id, position, timestamp)
+            events.append(TagPosition(now, timestamp, tag_id, position[0], position[1], covariance, residual))
+
+    def _update_trail(self, tag_id, position, timestamp):
+        self.tag_positions.append(tag_id, timestamp, position)
+        self.tag_auras.set(tag_id, position)
+
+    def _process_radar_frame(self, now, points, timestamp, doppler, events):
+        self.tracks = self.tracker.update(points, doppler, timestamp)
+
+        # Classify all tracks against all tag auras at once
+        inside_aura = self.tag_auras.classify([track.position for track in self.tracks])
+        self.track_colors = {track.id: "green" if tagged else "red"
+                             for track, tagged in zip(self.tracks, inside_aura.tolist())}
+
+        track_zones = self._detect_intruder(now, timestamp, events)
+        if self.tracks:
+            zone_ids = self.zones.zone_ids
+            events.append(TrackUpdate(now, timestamp, tracks_to_objects(self.tracks), inside_aura,
+                                      [zone_ids[zone] if zone >= 0 else None for zone in track_zones.tolist()]))
+        self.last_detection_latency = now - timestamp
+
+    def _expire_tracks(self, now):
+        self.tracker.expire(now)
+        alive = {track.id for track in self.tracker.tracks}
+        self.tracks = [track for track in self.tracks if track.id in alive]
+        for zone in list(self.zone_hits):
+            hits = self.zone_hits[zone]
+            for track_id in [track_id for track_id in hits if track_id not in alive]:
+                del hits[track_id]
+            if not hits:
+                del self.zone_hits[zone]
+
+    def _expire_tags(self, now):
+        # a tag without a fix for trail_duration loses its trail and its aura, so it no longer marks tracks as tagged
+        self.tag_positions.expire(now)
+        for tag_id, trail in self.tag_positions.items():
+            if not len(trail) and tag_id in self.tag_auras:
+                self.tag_auras.remove(tag_id)
+
+    def _detect_intruder(self, now, timestamp, events):
+        """
+        :return: (N,) zone index of each track, -1 outside every zone.
+        """
+        # all tracks against all zones in one pass over the zone grid
+        track_zones = self.zones.assign([track.position for track in self.tracks])
+        counted = set()
+        for track, zone in zip(self.tracks, track_zones.tolist()):
+            if zone < 0:
+                continue
+            if self.track_colors[track.id] == "red":
+                # count frames in which the untagged object was actually detected, not coasted
+                if track.misses == 0:
+                    hits = self.zone_hits.setdefault(zone, {})
+                    hits[track.id] = hits.get(track.id, 0) + 1
+                    counted.add(zone)
+            else:
+                # Reset the zone; only detections after the tagged vehicle was seen count
+                zone_id = self.zones.zone_ids[zone]
+                if zone in self.flagged_zones:
+                    logger.info("Tagged vehicle detected inside zone %s. Intruder flag cleared.", zone_id)
+                    events.append(IntruderCleared(now, timestamp, zone_id))
+                    self.flagged_zones.discard(zone)
+                self.zone_hits.pop(zone, None)
+                counted.discard(zone)
+
+        for zone in counted:
+            if zone in self.flagged_zones:
+                continue
+            intruder_count = max(self.zone_hits[zone].values())
+            if intruder_count > self.intruder_threshold:
+                zone_id = self.zones.zone_ids[zone]
+                logger.warning("Intruder detected! Untagged object seen %d times inside zone %s.",
+                               intruder_count, zone_id)
+                x, y = self.zones.centers[zone].tolist()
+                events.append(IntruderFlagged(now, timestamp, intruder_count, x, y, zone_id))
+                self.flagged_zones.add(zone)
+        return track_zones
@@ -0,0 +1,121 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BlitRenderer:
+    def __init__(self, fig, update, interval=0.1, max_load=0.5, report_interval=5.0, name="plot"):
+        """
+        Redraw only the artists that change, on top of a cached background.
+
+        The static part of the figure (axes, anchors, radar, parking place, legend) is rendered by a full draw and
+        cached; every tick restores that background and draws the artists registered with add(). Full draws only
+        happen on the first tick, after a resize and after invalidate(), e.g. when a new tag adds legend entries.
+
+        :param fig: Figure to render.
+        :param update: Called without arguments at every tick to update the data of the artists.
+        :param interval: Seconds between ticks at the fastest.
+        :param max_load: Largest fraction of the time spent rendering; slow frames stretch the interval.
+        :param report_interval: Seconds between render time reports.
+        :param name: Label used in the log line.
+        """
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.update = update
+        self.interval = interval
+        self.max_load = max_load
+        self.report_interval = report_interval
+        self.name = name
+        self.artists = []
+        self._background = None
+        self._dirty = True
+        self._timer = None
+        self._draw_cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+        self._reset(time.perf_counter())
+
+    def add(self, artist):
+        """
+        Register an artist that changes between ticks. It is left out of the cached background.
+        :return: The artist.
+        """
+        artist.set_animated(True)
+        self.artists.append(artist)
+        return artist
+
+    def remove(self, artist):
+        self.artists.remove(artist)
+        artist.remove()
+
+    def invalidate(self):
+        """
+        Rebuild the background at the next tick, after a change to the static artists.
+        """
+        self._dirty = True
+
+    def start(self):
+        self._timer = self.canvas.new_timer(interval=int(1e3 * self.interval))
+        self._timer.add_callback(self.render)
+        self._timer.start()
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        self.canvas.mpl_disconnect(self._draw_cid)
+        self.report()
+
+    def render(self):
+        """
+        One tick: update the artists, then blit them over the background (or draw the whole figure if needed).
+        """
+        start = time.perf_counter()
+        self.update()
+        if self._dirty or self._background is None or not self.canvas.supports_blit:
+            self._dirty = False
+            self.canvas.draw()
+            self.full_draws += 1
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_artists()
+            self.canvas.blit(self.fig.bbox)
+        now = time.perf_counter()
+        self._record(now - start, now)
+
+        if self._timer is not None:
+            # keep the GUI thread from starving the readers when frames get expensive
+            interval = max(self.interval, (now - start) / self.max_load)
+            self._timer.interval = int(1e3 * interval)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def _reset(self, now):
+        self.frames = 0
+        self.full_draws = 0
+        self.render_sum = 0.0
+        self.render_max = 0.0
+        self.window_start = now
+
+    def _record(self, render_time, now):
+        self.frames += 1
+        self.render_sum += render_time
+        if render_time > self.render_max:
+            self.render_max = render_time
+        if now - self.window_start >= self.report_interval:
+            self.report(now)
+
+    def report(self, now=None):
+        if now is None:
+            now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed > 0 and self.frames:
+            logger.info("%s: %.1f frames/s, render mean %.2f ms max %.2f ms, %d full redraws",
+                        self.name, self.frames / elapsed, 1e3 * self.render_sum / self.frames,
+                        1e3 * self.render_max, self.full_draws)
+        self._reset(now)
@@ -0,0 +1,178 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+# Offsets of a cell and its 8 neighbours
+_NEIGHBOUR_CELLS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class PointGridIndex:
+    def __init__(self, cell_size):
+        """
+        Uniform-grid hash index of 2D points for "is there a point within r?" queries.
+
+        Points are bucketed by (floor(x / cell_size), floor(y / cell_size)). For r <= cell_size every
+        neighbour lies in the query point's cell or one of its 8 neighbouring cells, so a query costs
+        O(points in 9 cells) no matter how many points are stored.
+
+        :param cell_size: Grid cell size, also the largest supported query radius.
+        """
+        self.cell_size = float(cell_size)
+        self._cells = defaultdict(list)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def add(self, x, y):
+        self._cells[self._cell(x, y)].append((x, y))
+        self._count += 1
+
+    def any_within(self, x, y, radius=None):
+        """
+        :param radius: Query radius (strictly less than), defaults to cell_size. Must not exceed cell_size.
+        :return: True if a stored point lies closer than radius to (x, y).
+        """
+        if radius is None:
+            radius = self.cell_size
+        elif radius > self.cell_size:
+            raise ValueError(f"radius {radius} exceeds the grid cell size {self.cell_size}")
+        return self._any_within(self._cell(x, y), x, y, radius * radius)
+
+    def _any_within(self, cell, x, y, radius_sq):
+        cx, cy = cell
+        cells = self._cells
+        for nx in (cx - 1, cx, cx + 1):
+            for ny in (cy - 1, cy, cy + 1):
+                bucket = cells.get((nx, ny))
+                if not bucket:
+                    continue
+                for ux, uy in bucket:
+                    dx = x - ux
+                    dy = y - uy
+                    if dx * dx + dy * dy < radius_sq:
+                        return True
+        return False
+
+    def add_unique(self, x, y, radius=None):
+        """
+        Add (x, y) unless a stored point lies within radius.
+        :return: True if the point was added.
+        """
+        if self.any_within(x, y, radius):
+            return False
+        self.add(x, y)
+        return True
+
+    def add_unique_batch(self, points, radius=None):
+        """
+        Add every point of a frame that has no stored point (including points added earlier in the same
+        batch) within radius.
+
+        :param points: Sequence of (x, y) pairs or an (N, 2) array.
+        :param radius: Query radius, defaults to cell_size.
+        :return: List of the (x, y) points that were added, in input order.
+        """
+        if radius is None:
+            radius = self.cell_size
+        elif radius > self.cell_size:
+            raise ValueError(f"radius {radius} exceeds the grid cell size {self.cell_size}")
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            return []
+
+        cell_ids = np.floor(points / self.cell_size).astype(np.int64).tolist()
+        radius_sq = radius * radius
+        cells = self._cells
+        added = []
+        for (x, y), (cx, cy) in zip(points.tolist(), cell_ids):
+            if self._any_within((cx, cy), x, y, radius_sq):
+                continue
+            cells[(cx, cy)].append((x, y))
+            added.append((x, y))
+        self._count += len(added)
+        return added
+
+    def clear(self):
+        self._cells.clear()
+        self._count = 0
+
+
+def grid_pairs(points, others, radius):
+    """
+    All pairs of a point and another point at most radius apart, found through a uniform grid of radius-sized
+    cells.
+
+    Both sets are bucketed by (floor(x / radius), floor(y / radius)). Every neighbour of a point lies in its cell
+    or one of the 8 neighbouring cells, so the pairs tested follow the local density of the points rather than
+    len(points) * len(others).
+
+    :param points: (N, 2) array-like of point coordinates.
+    :param others: (M, 2) array-like of point coordinates, may be points itself (each point then pairs with
+                   itself too).
+    :param radius: Pair distance limit, inclusive.
+    :return: (i, j) index arrays of the pairs points[i], others[j].
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    others = np.asarray(others, dtype=np.float64).reshape(-1, 2)
+    if not len(points) or not len(others) or not radius > 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    origin = np.minimum(points.min(axis=0), others.min(axis=0))
+    point_cells = np.floor((points - origin) / radius).astype(np.int64)
+    other_cells = np.floor((others - origin) / radius).astype(np.int64)
+    # one key per cell, with room for the y neighbours so that keys of adjacent columns never overlap
+    rows = int(max(point_cells[:, 1].max(), other_cells[:, 1].max())) + 3
+    other_keys = other_cells[:, 0] * rows + other_cells[:, 1] + 1
+    order = np.argsort(other_keys, kind='stable')
+    sorted_keys = other_keys[order]
+    point_keys = point_cells[:, 0] * rows + point_cells[:, 1] + 1
+
+    point_index = np.arange(len(points))
+    pair_points = []
+    pair_others = []
+    for dx, dy in _NEIGHBOUR_CELLS:
+        keys = point_keys + dx * rows + dy
+        first = np.searchsorted(sorted_keys, keys, side='left')
+        count = np.searchsorted(sorted_keys, keys, side='right') - first
+        total = int(count.sum())
+        if not total:
+            continue
+        # one pair per point of the neighbouring cell
+        offsets = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        pair_points.append(np.repeat(point_index, count))
+        pair_others.append(order[np.repeat(first, count) + offsets])
+    if not pair_points:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    i = np.concatenate(pair_points)
+    j = np.concatenate(pair_others)
+    d = points[i] - others[j]
+    close = np.einsum('pk,pk->p', d, d) <= radius * radius
+    return i[close], j[close]
+
+
+def connected_components(n, i, j):
+    """
+    :param n: Number of nodes.
+    :param i, j: Index arrays of the edges.
+    :return: (n,) array with the smallest node index of each node's component.
+    """
+    parent = np.arange(n)
+    while True:
+        # hook the larger root of every edge onto the smaller one, then compress the paths to the roots
+        pi = parent[i]
+        pj = parent[j]
+        differ = pi != pj
+        if not differ.any():
+            return parent
+        np.minimum.at(parent, np.maximum(pi, pj)[differ], np.minimum(pi, pj)[differ])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
@@ -0,0 +1,295 @@
+import math
+
+import numpy as np
+
+from implementation.spatial_index import connected_components, grid_pairs
+from radar.detected_object import DetectedObject, DetectedObjectSet
+
+
+def cluster_points(points, eps, min_samples=1):
+    """
+    DBSCAN clustering of one frame's points.
+
+    Neighbours are found through a grid of eps-sized cells and clusters are the connected components of the
+    core points, so the cost follows the local point density instead of growing with N * N.
+
+    :param points: (N, 2) array of point coordinates.
+    :param eps: Neighbourhood radius.
+    :param min_samples: Points (including itself) within eps that make a point a core point.
+    :return: Array of N cluster labels, -1 for noise. Clusters are numbered in the order of their first core
+             point; a border point joins the lowest numbered cluster within eps.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    labels = np.full(n, -1, dtype=np.intp)
+    if n == 0:
+        return labels
+    i, j = grid_pairs(points, points, eps)
+    core = np.bincount(i, minlength=n) >= min_samples
+    if not core.any():
+        return labels
+
+    linked = core[i] & core[j]
+    roots = connected_components(n, i[linked], j[linked])
+    core_roots, core_labels = np.unique(roots[core], return_inverse=True)
+    labels[core] = core_labels
+
+    # border points: not core, but within eps of a core point
+    border = ~core[i] & core[j]
+    if border.any():
+        border_labels = np.full(n, len(core_roots), dtype=np.intp)
+        np.minimum.at(border_labels, i[border], labels[j[border]])
+        has_core = ~core & (border_labels < len(core_roots))
+        labels[has_core] = border_labels[has_core]
+    return labels
+
+
+def tracks_to_objects(tracks):
+    """
+    :return: DetectedObjectSet with one row per track.
+    """
+    if not tracks:
+        return DetectedObjectSet.empty()
+    states = np.array([track.state for track in tracks])
+    return DetectedObjectSet([track.id for track in tracks], states[:, :2], states[:, 2:])
+
+
+def cluster_centroids(points, doppler, labels):
+    """
+    :return: (C, 2) cluster centroids, (C,) mean Doppler (NaN if doppler is None) and (C,) point counts.
+    """
+    num_clusters = int(labels.max()) + 1 if len(labels) else 0
+    keep = labels >= 0
+    counts = np.bincount(labels[keep], minlength=num_clusters).astype(np.float64)
+    centroids = np.empty((num_clusters, 2))
+    centroids[:, 0] = np.bincount(labels[keep], points[keep, 0], minlength=num_clusters) / counts
+    centroids[:, 1] = np.bincount(labels[keep], points[keep, 1], minlength=num_clusters) / counts
+    if doppler is None:
+        radial = np.full(num_clusters, np.nan)
+    else:
+        radial = np.bincount(labels[keep], doppler[keep], minlength=num_clusters) / counts
+    return centroids, radial, counts
+
+
+class Track:
+    __slots__ = ('id', 'state', 'covariance', 'hits', 'misses', 'last_update', 'confirmed')
+
+    def __init__(self, track_id, state, covariance, timestamp):
+        self.id = track_id
+        self.state = state  # x, y, vx, vy
+        self.covariance = covariance
+        self.hits = 1
+        self.misses = 0
+        self.last_update = timestamp
+        self.confirmed = False
+
+    @property
+    def position(self):
+        return (float(self.state[0]), float(self.state[1]))
+
+    @property
+    def velocity(self):
+        return (float(self.state[2]), float(self.state[3]))
+
+    def to_detected_object(self):
+        return DetectedObject(self.id, self.position, self.velocity)
+
+
+class MultiTargetTracker:
+    def __init__(self, sensor_position=(0.0, 0.0), eps=1.0, min_samples=1, measurement_std=0.5,
+                 doppler_std=0.5, acceleration_std=5.0, gate=9.21, confirm_hits=3, max_coast=2.0):
+        """
+        Cluster each radar frame and follow the clusters with constant-velocity Kalman filters.
+
+        Clusters are associated with predicted tracks by global nearest neighbour on the Mahalanobis distance,
+        inside a chi-square gate. Each update uses the cluster centroid and, when available, its mean Doppler
+        as a radial-velocity measurement along the sensor-to-track line of sight.
+
+        :param sensor_position: Radar position in the coordinates of the points, for the Doppler line of sight.
+        :param eps: Clustering radius.
+        :param min_samples: Points within eps for a DBSCAN core point; 1 keeps single detections as clusters.
+        :param measurement_std: Position noise of a cluster centroid.
+        :param doppler_std: Radial velocity noise.
+        :param acceleration_std: Process noise, white acceleration.
+        :param gate: Squared Mahalanobis distance limit for association (9.21 = 99% for 2 dof).
+        :param confirm_hits: Updates before a track is confirmed and reported.
+        :param max_coast: Seconds a track survives without updates.
+        """
+        self.sensor_position = np.asarray(sensor_position, dtype=np.float64)
+        self.eps = eps
+        self.min_samples = min_samples
+        self.measurement_var = measurement_std * measurement_std
+        self.doppler_var = doppler_std * doppler_std
+        self.acceleration_var = acceleration_std * acceleration_std
+        self.gate = gate
+        self.confirm_hits = confirm_hits
+        self.max_coast = max_coast
+        self.tracks = []
+        self._next_id = 1
+        self._last_time = None
+
+    def update(self, points, doppler, timestamp):
+        """
+        Run one frame through clustering, prediction, association and the Kalman updates.
+
+        :param points: (N, 2) array-like of point coordinates.
+        :param doppler: (N,) radial velocities in the units of the points per second, or None.
+        :param timestamp: Frame time in seconds.
+        :return: List of confirmed Tracks, including ones coasting through missed detections.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if doppler is not None:
+            doppler = np.asarray(doppler, dtype=np.float64).reshape(-1)
+        labels = cluster_points(points, self.eps, self.min_samples)
+        centroids, radial, _ = cluster_centroids(points, doppler, labels)
+
+        dt = 0.0 if self._last_time is None else max(timestamp - self._last_time, 0.0)
+        self._last_time = timestamp
+        # all tracks are predicted, associated and updated as stacked arrays
+        states = np.array([track.state for track in self.tracks]).reshape(-1, 4)
+        covariances = np.array([track.covariance for track in self.tracks]).reshape(-1, 4, 4)
+        states, covariances = self._predict(states, covariances, dt)
+
+        assigned = self._associate(states, covariances, centroids)
+        updated = np.flatnonzero(assigned >= 0)
+        clusters = assigned[updated]
+        states[updated], covariances[updated] = self._update(states[updated], covariances[updated],
+                                                             centroids[clusters], radial[clusters])
+        used = np.zeros(len(centroids), dtype=bool)
+        used[clusters] = True
+
+        for track, state, covariance, cluster in zip(self.tracks, states, covariances, assigned.tolist()):
+            track.state = state
+            track.covariance = covariance
+            if cluster < 0:
+                track.misses += 1
+                continue
+            track.hits += 1
+            track.misses = 0
+            track.last_update = timestamp
+            if track.hits >= self.confirm_hits:
+                track.confirmed = True
+
+        for cluster in np.flatnonzero(~used).tolist():
+            self._start_track(centroids[cluster], radial[cluster], timestamp)
+
+        self.expire(timestamp)
+        return [track for track in self.tracks if track.confirmed]
+
+    def expire(self, now):
+        """
+        Drop tracks not updated for max_coast seconds, and tentative tracks that missed a frame.
+        """
+        self.tracks = [track for track in self.tracks
+                       if now - track.last_update <= self.max_coast and (track.confirmed or track.misses == 0)]
+
+    def objects(self):
+        """
+        :return: DetectedObjectSet of the confirmed tracks.
+        """
+        return tracks_to_objects([track for track in self.tracks if track.confirmed])
+
+    def _predict(self, states, covariances, dt):
+        if dt <= 0.0:
+            return states, covariances
+        f = np.eye(4)
+        f[0, 2] = f[1, 3] = dt
+        # white-acceleration process noise
+        dt2 = dt * dt
+        q = self.acceleration_var * np.array([
+            [dt2 * dt2 / 4, 0, dt2 * dt / 2, 0],
+            [0, dt2 * dt2 / 4, 0, dt2 * dt / 2],
+            [dt2 * dt / 2, 0, dt2, 0],
+            [0, dt2 * dt / 2, 0, dt2],
+        ])
+        return states @ f.T, f @ covariances @ f.T + q
+
+    def _associate(self, states, covariances, centroids):
+        """
+        :return: Cluster index per track, -1 where no cluster is inside the gate.
+        """
+        assigned = np.full(len(states), -1, dtype=np.intp)
+        if not len(states) or not len(centroids):
+            return assigned
+        positions = states[:, :2]
+        innovation = covariances[:, :2, :2] + self.measurement_var * np.eye(2)
+        inverse = np.linalg.inv(innovation)
+
+        # The gate ellipse of a track fits in a circle of sqrt(gate * largest eigenvalue of its innovation
+        # covariance). Only the clusters in the grid cells around that circle are scored; tracks are grouped by
+        # power-of-two gate radius so that one uncertain, coasting track does not widen the cells of all others.
+        a, b, c = innovation[:, 0, 0], innovation[:, 0, 1], innovation[:, 1, 1]
+        largest = (a + c) / 2 + np.sqrt(((a - c) / 2) ** 2 + b * b)
+        cell_sizes = 2.0 ** np.ceil(np.log2(np.sqrt(self.gate * largest)))
+        pair_tracks = []
+        pair_clusters = []
+        for cell_size in np.unique(cell_sizes).tolist():
+            group = np.flatnonzero(cell_sizes == cell_size)
+            t, c = grid_pairs(positions[group], centroids, cell_size)
+            pair_tracks.append(group[t])
+            pair_clusters.append(c)
+        t = np.concatenate(pair_tracks)
+        c = np.concatenate(pair_clusters)
+        d = centroids[c] - positions[t]
+        cost = np.einsum('pi,pij,pj->p', d, inverse[t], d)
+        gated = cost <= self.gate
+        t, c, cost = t[gated], c[gated], cost[gated]
+
+        # global nearest neighbour: take the cheapest gated pairs first
+        taken = np.zeros(len(centroids), dtype=bool)
+        for pair in np.lexsort((c, t, cost)).tolist():
+            track, cluster = t[pair], c[pair]
+            if assigned[track] >= 0 or taken[cluster]:
+                continue
+            assigned[track] = cluster
+            taken[cluster] = True
+        return assigned
+
+    def _update(self, x, p, centroids, radial):
+        """
+        Kalman updates of the stacked states and covariances of the tracks with their associated clusters.
+        :return: Updated states and covariances.
+        """
+        if not len(x):
+            return x, p
+        # position
+        s = p[:, :2, :2] + self.measurement_var * np.eye(2)
+        k = p[:, :, :2] @ np.linalg.inv(s)
+        x = x + np.einsum('kij,kj->ki', k, centroids - x[:, :2])
+        p = p - k @ p[:, :2, :]
+
+        # Doppler, linearised around the updated position: v_r = u . (vx, vy)
+        offset = x[:, :2] - self.sensor_position
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        valid = ~np.isnan(radial) & (distance >= 1e-9)
+        if valid.any():
+            # tracks without a Doppler measurement get h = 0, which leaves them unchanged
+            h = np.zeros_like(x)
+            h[valid, 2:] = offset[valid] / distance[valid, None]
+            s = np.einsum('ki,kij,kj->k', h, p, h) + self.doppler_var
+            k = np.einsum('kij,kj->ki', p, h) / s[:, None]
+            innovation = np.where(valid, radial - np.einsum('ki,ki->k', h, x), 0.0)
+            x = x + k * innovation[:, None]
+            p = p - k[:, :, None] * np.einsum('kj,kji->ki', h, p)[:, None, :]
+        return x, p
+
+    def _start_track(self, centroid, radial, timestamp):
+        state = np.zeros(4)
+        state[:2] = centroid
+        covariance = np.diag([self.measurement_var, self.measurement_var, 100.0, 100.0])
+        if not math.isnan(radial):
+            u = self._line_of_sight(centroid)
+            if u is not None:
+                state[2:] = radial * u
+        track = Track(self._next_id, state, covariance, timestamp)
+        self._next_id += 1
+        if self.confirm_hits <= 1:
+            track.confirmed = True
+        self.tracks.append(track)
+
+    def _line_of_sight(self, position):
+        offset = position - self.sensor_position
+        distance = math.hypot(offset[0], offset[1])
+        if distance < 1e-9:
+            return None
+        return offset / distance
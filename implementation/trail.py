@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class TrailBuffer:
+    def __init__(self, duration, capacity=256):
+        """
+        Time-bounded ring buffer of (timestamp, x, y) samples on preallocated arrays.
+
+        Every sample is written twice, at i and i + capacity, so the live samples are always one contiguous
+        slice and can be handed out as views without copying. Appending and expiring from the front are O(1)
+        amortised; at capacity the oldest sample is overwritten, so memory per tag is fixed.
+
+        :param duration: Samples older than this (relative to the newest one) are dropped.
+        :param capacity: Maximum number of samples kept.
+        """
+        self.duration = duration
+        self.capacity = capacity
+        self._t = np.empty(2 * capacity, dtype=np.float64)
+        self._xy = np.empty((2 * capacity, 2), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, x, y):
+        """
+        Add a sample and drop the ones that are now older than duration.
+        """
+        self.expire(timestamp)
+        if self._count == self.capacity:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+        index = (self._head + self._count) % self.capacity
+        self._t[index] = self._t[index + self.capacity] = timestamp
+        self._xy[index] = self._xy[index + self.capacity] = (x, y)
+        self._count += 1
+
+    def expire(self, now):
+        """
+        Drop samples older than duration relative to now.
+        """
+        cutoff = now - self.duration
+        t = self._t
+        while self._count and t[self._head] < cutoff:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    # The views below are only valid until the next append(); copy them to keep them.
+
+    @property
+    def timestamps(self):
+        return self._t[self._head:self._head + self._count]
+
+    @property
+    def xy(self):
+        """
+        (N, 2) view of the positions, oldest first.
+        """
+        return self._xy[self._head:self._head + self._count]
+
+    @property
+    def x(self):
+        return self.xy[:, 0]
+
+    @property
+    def y(self):
+        return self.xy[:, 1]
+
+    def latest(self):
+        """
+        :return: Newest (x, y) or None if the trail is empty.
+        """
+        if not self._count:
+            return None
+        x, y = self._xy[self._head + self._count - 1].tolist()
+        return (x, y)
+
+
+class Trails:
+    def __init__(self, duration, capacity=256):
+        """
+        One TrailBuffer per tag.
+        :param duration: Trail duration in seconds.
+        :param capacity: Maximum samples kept per tag.
+        """
+        self.duration = duration
+        self.capacity = capacity
+        self._trails = {}
+
+    def append(self, tag_id, timestamp, position):
+        trail = self._trails.get(tag_id)
+        if trail is None:
+            trail = self._trails[tag_id] = TrailBuffer(self.duration, self.capacity)
+        trail.append(timestamp, position[0], position[1])
+
+    def expire(self, now):
+        for trail in self._trails.values():
+            trail.expire(now)
+
+    def __getitem__(self, tag_id):
+        return self._trails[tag_id]
+
+    def __contains__(self, tag_id):
+        return tag_id in self._trails
+
+    def __iter__(self):
+        return iter(self._trails)
+
+    def __len__(self):
+        return len(self._trails)
+
+    def items(self):
+        return self._trails.items()
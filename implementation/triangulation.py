@@ -0,0 +1,224 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Result of Triangulator.solve(), one row per tag:
+#   positions   (T, 2) least-squares intersection of the bearing lines
+#   covariance  (T, 2, 2) position covariance in m^2, from the bearing noise and the anchor-tag distances
+#   residual    (T,) RMS perpendicular distance of the fix from the bearing lines used, in m
+#   num_bearings (T,) number of bearings used
+#   valid       (T,) False where fewer than two bearings were available or all bearing lines are parallel
+TriangulationResult = namedtuple('TriangulationResult', 'positions covariance residual num_bearings valid')
+
+# With two anchors, batches up to this many tags are solved per tag in closed form; the NumPy batch only pays off
+# for larger ones (see benchmarks/bench_triangulation.py)
+TWO_ANCHOR_SCALAR_TAGS = 32
+
+
+class Triangulator:
+    def __init__(self, anchor_positions, anchor_orientations=None, bearing_std=5.0, min_det=1e-12):
+        """
+        Bearing-only (AoA) triangulation with any number of anchors.
+
+        Each bearing defines a line through its anchor. The fix is the point with the smallest weighted sum of
+        squared perpendicular distances to those lines, from the 2x2 normal equations
+        sum(w n n^T) x = sum(w n n^T p) with n the unit normal of a line and p its anchor. The normal equations
+        of all tags are stacked and solved together, so the cost per call grows with the number of tags only
+        through NumPy array sizes.
+
+        :param anchor_positions: (K, 2) array-like of anchor positions.
+        :param anchor_orientations: Optional (K,) anchor orientations in degrees, added to every bearing of that
+            anchor. None means all bearings are already mathematical angles in the common frame.
+        :param bearing_std: Bearing noise standard deviation in degrees, used for weights and covariance.
+        :param min_det: Fixes whose unit-weight normal matrix has a smaller determinant are invalid
+            (sin^2 of the angle between two bearing lines, the default matches 1e-6 on the 2x2 determinant).
+        """
+        self.anchor_positions = np.asarray(anchor_positions, dtype=np.float64).reshape(-1, 2)
+        num_anchors = len(self.anchor_positions)
+        if anchor_orientations is None:
+            anchor_orientations = np.zeros(num_anchors)
+        self.anchor_orientations = np.asarray(anchor_orientations, dtype=np.float64).reshape(num_anchors)
+        self.bearing_std = math.radians(bearing_std)
+        self.min_det = min_det
+
+    @property
+    def num_anchors(self):
+        return len(self.anchor_positions)
+
+    def solve(self, bearings):
+        """
+        Triangulate a batch of tags.
+        :param bearings: (T, K) bearings in degrees (mathematical angle, counter-clockwise from East) per tag and
+            anchor, NaN where an anchor has no usable bearing for that tag.
+        :return: TriangulationResult.
+        """
+        bearings = np.asarray(bearings, dtype=np.float64).reshape(-1, self.num_anchors)
+        if self.num_anchors == 2 and len(bearings) <= TWO_ANCHOR_SCALAR_TAGS:
+            return self._solve_two_anchors(bearings)
+        used = ~np.isnan(bearings)
+        theta = np.radians(np.where(used, bearings, 0.0) + self.anchor_orientations)
+        # unit normal of each bearing line is (-sin, cos); offsets are n . p of the line's anchor
+        sin = np.sin(theta)
+        cos = np.cos(theta)
+        offsets = cos * self.anchor_positions[:, 1] - sin * self.anchor_positions[:, 0]
+
+        weights = used.astype(np.float64)
+        positions, det, _ = self._solve_normal_equations(sin, cos, offsets, weights)
+        num_bearings = used.sum(axis=1)
+        valid = (num_bearings >= 2) & (det >= self.min_det)
+
+        # Bearing noise turns into a perpendicular error growing with the anchor distance: reweight once
+        dx = positions[:, 0, None] - self.anchor_positions[:, 0]
+        dy = positions[:, 1, None] - self.anchor_positions[:, 1]
+        sigma_sq = np.maximum(dx * dx + dy * dy, 1.0) * (self.bearing_std * self.bearing_std)
+        weights = used / sigma_sq
+        positions, _, normal_matrix = self._solve_normal_equations(sin, cos, offsets, weights)
+        positions[~valid] = np.nan
+
+        covariance = np.full((len(bearings), 2, 2), np.nan)
+        if valid.any():
+            covariance[valid] = np.linalg.inv(normal_matrix[valid])
+
+        # Perpendicular distance of the fix from every used bearing line
+        distance = cos * positions[:, 1, None] - sin * positions[:, 0, None] - offsets
+        residual = np.sqrt(np.sum(np.where(used, distance * distance, 0.0), axis=1) / np.maximum(num_bearings, 1))
+        return TriangulationResult(positions, covariance, residual, num_bearings, valid)
+
+    def _solve_two_anchors(self, bearings):
+        """
+        solve() for two anchors, one tag at a time: the fix is the intersection of the two bearing lines, whatever
+        the weights, and only the covariance needs them.
+        """
+        (x1, y1), (x2, y2) = self.anchor_positions.tolist()
+        orientation1, orientation2 = self.anchor_orientations.tolist()
+        variance = self.bearing_std * self.bearing_std
+        num_tags = len(bearings)
+        positions = np.full((num_tags, 2), np.nan)
+        covariance = np.full((num_tags, 2, 2), np.nan)
+        residual = np.full(num_tags, np.nan)
+        num_bearings = 2 - np.isnan(bearings).sum(axis=1)
+        valid = np.zeros(num_tags, dtype=bool)
+        residual[num_bearings == 0] = 0.0
+        for i, (bearing1, bearing2) in enumerate(bearings.tolist()):
+            if bearing1 != bearing1 or bearing2 != bearing2:
+                continue
+            theta1 = math.radians(bearing1 + orientation1)
+            theta2 = math.radians(bearing2 + orientation2)
+            sin1, cos1 = math.sin(theta1), math.cos(theta1)
+            sin2, cos2 = math.sin(theta2), math.cos(theta2)
+            # lines -sin x + cos y = offset, see solve()
+            offset1 = cos1 * y1 - sin1 * x1
+            offset2 = cos2 * y2 - sin2 * x2
+            det = cos1 * sin2 - sin1 * cos2
+            if det * det < self.min_det:
+                continue
+            x = (offset1 * cos2 - offset2 * cos1) / det
+            y = (offset1 * sin2 - offset2 * sin1) / det
+
+            w1 = 1.0 / (max((x - x1) ** 2 + (y - y1) ** 2, 1.0) * variance)
+            w2 = 1.0 / (max((x - x2) ** 2 + (y - y2) ** 2, 1.0) * variance)
+            a00 = w1 * sin1 * sin1 + w2 * sin2 * sin2
+            a11 = w1 * cos1 * cos1 + w2 * cos2 * cos2
+            a01 = -(w1 * sin1 * cos1 + w2 * sin2 * cos2)
+            normal_det = a00 * a11 - a01 * a01
+            positions[i] = (x, y)
+            covariance[i] = ((a11 / normal_det, -a01 / normal_det), (-a01 / normal_det, a00 / normal_det))
+            distance1 = cos1 * y - sin1 * x - offset1
+            distance2 = cos2 * y - sin2 * x - offset2
+            residual[i] = math.sqrt((distance1 * distance1 + distance2 * distance2) / 2)
+            valid[i] = True
+        return TriangulationResult(positions, covariance, residual, num_bearings, valid)
+
+    @staticmethod
+    def _solve_normal_equations(sin, cos, offsets, weights):
+        # A = sum_k w n n^T, b = sum_k w n (n . p) with n = (-sin, cos), all (T, K) -> (T,)
+        a00 = np.sum(weights * sin * sin, axis=1)
+        a11 = np.sum(weights * cos * cos, axis=1)
+        a01 = -np.sum(weights * sin * cos, axis=1)
+        b0 = -np.sum(weights * sin * offsets, axis=1)
+        b1 = np.sum(weights * cos * offsets, axis=1)
+        det = a00 * a11 - a01 * a01
+        safe = np.where(det != 0.0, det, 1.0)
+        positions = np.column_stack(((a11 * b0 - a01 * b1) / safe, (a00 * b1 - a01 * b0) / safe))
+        normal_matrix = np.stack((np.column_stack((a00, a01)), np.column_stack((a01, a11))), axis=1)
+        return positions, det, normal_matrix
+
+
+class BearingTable:
+    def __init__(self, triangulator, anchor_ids, time_threshold=1.0):
+        """
+        Latest bearing per tag and anchor, and the set of tags that got a new bearing since the last solve.
+
+        :param triangulator: Triangulator for the anchors.
+        :param anchor_ids: Anchor (station) ids in the triangulator's anchor order.
+        :param time_threshold: Bearings older than this relative to the tag's newest bearing are not used.
+        """
+        self.triangulator = triangulator
+        self.anchor_index = {anchor_id: index for index, anchor_id in enumerate(anchor_ids)}
+        self.time_threshold = time_threshold
+        self._tag_index = {}
+        self._tag_ids = []
+        num_anchors = triangulator.num_anchors
+        self._bearings = np.full((0, num_anchors), np.nan)
+        self._timestamps = np.full((0, num_anchors), -np.inf)
+        self._pending = set()
+
+    def update(self, tag_id, anchor_id, bearing, timestamp):
+        """
+        :param tag_id: Tag id.
+        :param anchor_id: Anchor (station) id the bearing was reported by.
+        :param bearing: Bearing in degrees, see Triangulator.solve().
+        :param timestamp: Time the bearing was received.
+        """
+        row = self._tag_index.get(tag_id)
+        if row is None:
+            row = len(self._tag_ids)
+            self._tag_index[tag_id] = row
+            self._tag_ids.append(tag_id)
+            num_anchors = self.triangulator.num_anchors
+            if row == len(self._bearings):
+                # grow by doubling so adding tags stays amortised O(1)
+                grow = max(8, len(self._bearings))
+                self._bearings = np.vstack((self._bearings, np.full((grow, num_anchors), np.nan)))
+                self._timestamps = np.vstack((self._timestamps, np.full((grow, num_anchors), -np.inf)))
+        column = self.anchor_index[anchor_id]
+        self._bearings[row, column] = bearing
+        self._timestamps[row, column] = timestamp
+        self._pending.add(row)
+
+    def bearing(self, tag_id, anchor_id):
+        """
+        :return: (bearing, timestamp) last reported for the tag by the anchor, or None.
+        """
+        row = self._tag_index.get(tag_id)
+        if row is None:
+            return None
+        column = self.anchor_index[anchor_id]
+        if np.isnan(self._bearings[row, column]):
+            return None
+        return float(self._bearings[row, column]), float(self._timestamps[row, column])
+
+    def solve_pending(self):
+        """
+        Triangulate every tag that received a bearing since the last call, in one batch.
+        :return: List of (tag_id, position, covariance, residual, timestamp) for the valid fixes, timestamp being
+            the newest bearing used.
+        """
+        if not self._pending:
+            return []
+        rows = np.fromiter(sorted(self._pending), dtype=np.intp, count=len(self._pending))
+        self._pending.clear()
+
+        timestamps = self._timestamps[rows]
+        newest = timestamps.max(axis=1)
+        fresh = newest[:, None] - timestamps <= self.time_threshold
+        bearings = np.where(fresh, self._bearings[rows], np.nan)
+        result = self.triangulator.solve(bearings)
+
+        fixes = []
+        for i in np.flatnonzero(result.valid).tolist():
+            x, y = result.positions[i].tolist()
+            fixes.append((self._tag_ids[rows[i]], (x, y), result.covariance[i], float(result.residual[i]),
+                          float(newest[i])))
+        return fixes
@@ -0,0 +1,162 @@
+"""
+Parking zones (bays) as polygons, with a grid index that assigns many points to zones at once.
+
+Zone files are JSON, either a list of zones or {"zones": [...]}, each zone with an "id" and either a "polygon"
+([[x, y], ...], any simple polygon) or a "rect" ([xmin, xmax, ymin, ymax]):
+
+    {"zones": [{"id": "A1", "rect": [2, 4, -20, -10]},
+               {"id": "A2", "polygon": [[4, -20], [6, -20], [6.5, -10], [4.5, -10]]}]}
+"""
+import json
+from collections import namedtuple
+
+import numpy as np
+
+Zone = namedtuple('Zone', 'zone_id polygon')  # polygon: (K, 2) array of vertices
+
+# Grid cells allowed before the cell size is increased
+MAX_CELLS = 1 << 22
+# Distance from an edge within which a point counts as on the boundary, in the units of the zones
+EDGE_TOLERANCE = 1e-9
+
+
+def rectangle(region):
+    """
+    :param region: (xmin, xmax, ymin, ymax).
+    :return: (4, 2) polygon of the rectangle.
+    """
+    xmin, xmax, ymin, ymax = region
+    return np.array([(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)], dtype=np.float64)
+
+
+def load_zones(file_path):
+    """
+    :return: List of Zones read from a JSON zone file (see the module docstring).
+    """
+    with open(file_path, 'r') as file:
+        data = json.load(file)
+    if isinstance(data, dict):
+        data = data['zones']
+    zones = []
+    for entry in data:
+        if 'polygon' in entry:
+            polygon = np.asarray(entry['polygon'], dtype=np.float64).reshape(-1, 2)
+        else:
+            polygon = rectangle(entry['rect'])
+        if len(polygon) < 3:
+            raise ValueError(f"zone {entry['id']} needs at least 3 vertices")
+        zones.append(Zone(str(entry['id']), polygon))
+    return zones
+
+
+class ZoneIndex:
+    def __init__(self, zones, cell_size=None):
+        """
+        Uniform grid over the zones' bounding boxes. Each cell lists the zones whose bounding box overlaps it, so a
+        point is only tested against the few zones of its cell, and all points of a frame are tested together.
+
+        :param zones: List of Zones.
+        :param cell_size: Grid cell size, None uses half the median zone width (the shorter side of its bounding
+                          box), so most cells overlap one or two zones.
+        """
+        if not zones:
+            raise ValueError("no zones")
+        self.zones = list(zones)
+        self.zone_ids = [zone.zone_id for zone in self.zones]
+        polygons = [np.asarray(zone.polygon, dtype=np.float64) for zone in self.zones]
+        self.centers = np.array([polygon.mean(axis=0) for polygon in polygons])
+
+        # vertices padded to a common count by repeating the last one; the padding edges have zero length and
+        # never cross a ray
+        num_vertices = max(len(polygon) for polygon in polygons)
+        vertices = np.empty((len(polygons), num_vertices + 1, 2))
+        for i, polygon in enumerate(polygons):
+            vertices[i, :len(polygon)] = polygon
+            vertices[i, len(polygon):] = polygon[0]  # closes the polygon, then pads
+        self._start = vertices[:, :-1]
+        self._end = vertices[:, 1:]
+
+        lower = np.array([polygon.min(axis=0) for polygon in polygons])
+        upper = np.array([polygon.max(axis=0) for polygon in polygons])
+        if cell_size is None:
+            cell_size = float(np.median((upper - lower).min(axis=1))) / 2 or 1.0
+        self.origin = lower.min(axis=0)
+        extent = upper.max(axis=0) - self.origin
+        while np.prod(np.floor(extent / cell_size) + 1) > MAX_CELLS:
+            cell_size *= 2
+        self.cell_size = cell_size
+        self.shape = (np.floor(extent / cell_size) + 1).astype(np.intp)  # cells along x, y
+
+        cells = []
+        owners = []
+        low_cells = np.floor((lower - self.origin) / cell_size).astype(np.intp)
+        high_cells = np.floor((upper - self.origin) / cell_size).astype(np.intp)
+        for zone, ((x0, y0), (x1, y1)) in enumerate(zip(low_cells.tolist(), high_cells.tolist())):
+            xs, ys = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+            cells.append((ys * self.shape[0] + xs).ravel())
+            owners.append(np.full(xs.size, zone, dtype=np.intp))
+        cells = np.concatenate(cells)
+        owners = np.concatenate(owners)
+        order = np.argsort(cells, kind='stable')
+        # CSR layout: zones of cell c are cell_zones[cell_start[c]:cell_start[c + 1]]
+        self.cell_zones = owners[order]
+        self.cell_start = np.zeros(self.shape[0] * self.shape[1] + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cells, minlength=len(self.cell_start) - 1), out=self.cell_start[1:])
+
+    def __len__(self):
+        return len(self.zones)
+
+    def assign(self, points):
+        """
+        :param points: (N, 2) array-like of points.
+        :return: (N,) zone index per point, -1 outside every zone. Points on a boundary are inside; where zones
+                 overlap (or share an edge) the first one wins.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.intp)
+        if not len(points):
+            return result
+
+        cell_xy = np.floor((points - self.origin) / self.cell_size)
+        on_grid = np.all((cell_xy >= 0) & (cell_xy < self.shape), axis=1)
+        candidates = np.flatnonzero(on_grid)
+        cell = cell_xy[candidates, 1].astype(np.intp) * self.shape[0] + cell_xy[candidates, 0].astype(np.intp)
+        first = self.cell_start[cell]
+        count = self.cell_start[cell + 1] - first
+
+        # one (point, zone) pair per zone listed in the point's cell
+        pair_point = np.repeat(candidates, count)
+        offsets = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        pair_zone = self.cell_zones[np.repeat(first, count) + offsets]
+
+        inside = self._contains(points[pair_point], pair_zone)
+        pair_point = pair_point[inside]
+        pair_zone = pair_zone[inside]
+        # pairs are ordered by zone within each point, so the first pair of a point is its lowest zone
+        hit_points, first_pair = np.unique(pair_point, return_index=True)
+        result[hit_points] = pair_zone[first_pair]
+        return result
+
+    def _contains(self, points, zones):
+        """
+        Crossing-number test of each point against its zone. Points on an edge count as inside, like the
+        xmin <= x <= xmax and ymin <= y <= ymax test of a rectangular parking place.
+        :return: Boolean mask.
+        """
+        x = points[:, 0:1]
+        y = points[:, 1:2]
+        x0, y0 = self._start[zones, :, 0], self._start[zones, :, 1]
+        x1, y1 = self._end[zones, :, 0], self._end[zones, :, 1]
+        straddles = (y0 > y) != (y1 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        crossings = np.count_nonzero(straddles & (x < x_cross), axis=1)
+
+        # the crossing number leaves out the right and top edges; points within EDGE_TOLERANCE of any edge are in
+        dx = x1 - x0
+        dy = y1 - y0
+        cross = dx * (y - y0) - dy * (x - x0)
+        on_edge = ((np.abs(cross) <= EDGE_TOLERANCE * np.hypot(dx, dy)) &
+                   (np.minimum(x0, x1) <= x) & (x <= np.maximum(x0, x1)) &
+                   (np.minimum(y0, y1) <= y) & (y <= np.maximum(y0, y1)))
+        return (crossings & 1).astype(bool) | on_edge.any(axis=1)
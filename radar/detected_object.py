@@ -1,6 +1,13 @@
 # detected_object.py
 
+import numpy as np
+
+VELOCITY_THRESHOLD = 0.5  # Speed above which an object is moving; adjust based on your radar's sensitivity
+
+
 class DetectedObject:
+    __slots__ = ('id', 'position', 'velocity')
+
     def __init__(self, obj_id, position, velocity):
         """
         Initialize a detected object with ID, position, and velocity.
@@ -20,9 +27,108 @@ class DetectedObject:
 
         :return: Boolean indicating movement status.
         """
-        velocity_magnitude = (self.velocity[0] ** 2 + self.velocity[1] ** 2) ** 0.5
-        VELOCITY_THRESHOLD = 0.5  # Adjust based on your radar's sensitivity
-        return velocity_magnitude >= VELOCITY_THRESHOLD
+        vx, vy = self.velocity
+        return vx * vx + vy * vy >= VELOCITY_THRESHOLD * VELOCITY_THRESHOLD
 
     def __repr__(self):
         return f"DetectedObject(id={self.id}, position={self.position}, velocity={self.velocity})"
+
+
+class DetectedObjectSet:
+    __slots__ = ('ids', 'positions', 'velocities')
+
+    def __init__(self, ids, positions, velocities):
+        """
+        Columnar store of detected objects: one NumPy array per field instead of one Python object per detection.
+
+        :param ids: (N,) object identifiers.
+        :param positions: (N, 2) x, y positions.
+        :param velocities: (N, 2) vx, vy velocities.
+        """
+        self.ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 2)
+        if not len(self.ids) == len(self.positions) == len(self.velocities):
+            raise ValueError("ids, positions and velocities must have the same length")
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0), np.empty((0, 2)), np.empty((0, 2)))
+
+    @classmethod
+    def from_frame(cls, frame, first_id=0):
+        """
+        Build the set straight from the arrays of a parsed Frame, one object per detected point.
+
+        The radar only measures radial velocity, so each point's Doppler velocity is laid along its line of sight.
+
+        :param frame: Frame from parser_mmw_demo (x, y and v arrays, in sensor coordinates).
+        :param first_id: Identifier of the first point, the rest are numbered consecutively.
+        """
+        n = len(frame.x)
+        positions = np.empty((n, 2))
+        positions[:, 0] = frame.x
+        positions[:, 1] = frame.y
+        velocities = np.zeros((n, 2))
+        if len(frame.v) == n:
+            distance = np.hypot(positions[:, 0], positions[:, 1])
+            seen = distance > 0
+            velocities[seen] = positions[seen] * (np.asarray(frame.v)[seen] / distance[seen])[:, None]
+        return cls(np.arange(first_id, first_id + n), positions, velocities)
+
+    @classmethod
+    def from_objects(cls, objects):
+        """
+        :param objects: Iterable of DetectedObject.
+        """
+        objects = list(objects)
+        if not objects:
+            return cls.empty()
+        return cls([obj.id for obj in objects], [obj.position for obj in objects],
+                   [obj.velocity for obj in objects])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """
+        An integer index returns a DetectedObject; a slice, index array or boolean mask returns a DetectedObjectSet.
+        """
+        if isinstance(index, (int, np.integer)):
+            x, y = self.positions[index].tolist()
+            vx, vy = self.velocities[index].tolist()
+            return DetectedObject(int(self.ids[index]), (x, y), (vx, vy))
+        return DetectedObjectSet(self.ids[index], self.positions[index], self.velocities[index])
+
+    def speeds(self):
+        return np.hypot(self.velocities[:, 0], self.velocities[:, 1])
+
+    def is_moving(self, threshold=VELOCITY_THRESHOLD):
+        """
+        :return: Boolean mask of the objects whose speed is at least threshold.
+        """
+        v = self.velocities
+        return np.einsum('ij,ij->i', v, v) >= threshold * threshold
+
+    def in_region(self, region):
+        """
+        :param region: (xmin, xmax, ymin, ymax), bounds included.
+        :return: Boolean mask of the objects inside region.
+        """
+        xmin, xmax, ymin, ymax = region
+        x = self.positions[:, 0]
+        y = self.positions[:, 1]
+        return (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+
+    def moving(self, threshold=VELOCITY_THRESHOLD):
+        return self[self.is_moving(threshold)]
+
+    def within(self, region):
+        return self[self.in_region(region)]
+
+    def __repr__(self):
+        return f"DetectedObjectSet({len(self)} objects)"
@@ -32,44 +32,237 @@
 
 # import the required Python packages
 import struct
-import math
-import binascii
-import codecs
+import logging
+import numpy as np
+
+# per-frame diagnostics are logged at DEBUG level and are not even formatted unless it is enabled
+logger = logging.getLogger(__name__)
 
 # definations for parser pass/fail
 TC_PASS = 0
 TC_FAIL = 1
 
-def getUint32(data):
+PI = 3.14159265
+
+# magic word at the start of every mmw demo output packet
+MAGIC_WORD = b'\x02\x01\x04\x03\x06\x05\x08\x07'
+HEADER_NUM_BYTES = 40
+
+# header layout: magic word (u64) followed by version, totalPacketLen, platform, frameNumber,
+# timeCpuCycles, numDetectedObj, numTLVs and subFrameNumber (u32 each)
+HEADER_STRUCT = struct.Struct('<Q8I')
+
+# every TLV starts with its type and length (u32 each)
+TLV_HEADER_STRUCT = struct.Struct('<2I')
+
+# TLV type 1 layout: x, y, z, v as little-endian IEEE 754 single-precision floats
+DETECTED_POINT_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('v', '<f4')])
+
+# TLV type 7 layout: snr, noise as little-endian 16-bit unsigned integers
+SIDE_INFO_DTYPE = np.dtype([('snr', '<u2'), ('noise', '<u2')])
+
+# TLV type 6 layout: timing and CPU load statistics (u32 each)
+STATS_DTYPE = np.dtype([('interFrameProcessingTime', '<u4'), ('transmitOutputTime', '<u4'),
+                        ('interFrameProcessingMargin', '<u4'), ('interChirpProcessingMargin', '<u4'),
+                        ('activeFrameCPULoad', '<u4'), ('interFrameCPULoad', '<u4')])
+
+# mmw demo output TLV types
+MMWDEMO_OUTPUT_MSG_DETECTED_POINTS = 1
+MMWDEMO_OUTPUT_MSG_RANGE_PROFILE = 2
+MMWDEMO_OUTPUT_MSG_NOISE_PROFILE = 3
+MMWDEMO_OUTPUT_MSG_AZIMUT_STATIC_HEAT_MAP = 4
+MMWDEMO_OUTPUT_MSG_RANGE_DOPPLER_HEAT_MAP = 5
+MMWDEMO_OUTPUT_MSG_STATS = 6
+MMWDEMO_OUTPUT_MSG_DETECTED_POINTS_SIDE_INFO = 7
+MMWDEMO_OUTPUT_MSG_AZIMUT_ELEVATION_STATIC_HEAT_MAP = 8
+MMWDEMO_OUTPUT_MSG_TEMPERATURE_STATS = 9
+
+EMPTY_FLOAT_ARRAY = np.empty(0, dtype=np.float64)
+EMPTY_UINT16_ARRAY = np.empty(0, dtype=np.uint16)
+EMPTY_FLOAT_ARRAY.flags.writeable = False
+EMPTY_UINT16_ARRAY.flags.writeable = False
+
+
+class FrameHeader:
+    """!
+       Decoded mmw demo output packet header.
+    """
+    __slots__ = ('magic', 'version', 'totalPacketNumBytes', 'platform', 'frameNumber',
+                 'timeCpuCycles', 'numDetObj', 'numTlv', 'subFrameNumber')
+
+    def __init__(self, magic, version, totalPacketNumBytes, platform, frameNumber,
+                 timeCpuCycles, numDetObj, numTlv, subFrameNumber):
+        self.magic = magic
+        self.version = version
+        self.totalPacketNumBytes = totalPacketNumBytes
+        self.platform = platform
+        self.frameNumber = frameNumber
+        self.timeCpuCycles = timeCpuCycles
+        self.numDetObj = numDetObj
+        self.numTlv = numTlv
+        self.subFrameNumber = subFrameNumber
+
+    @classmethod
+    def unpack_from(cls, data, headerStartIndex=0):
+        """!
+           This function decodes the 40-byte header starting at headerStartIndex with one precompiled struct call.
+
+            @param data             : 1-demension byte array holds the mmw demo output packet
+            @param headerStartIndex : the mmw demo output packet header start location
+            @return                 : FrameHeader
+        """
+        return cls(*HEADER_STRUCT.unpack_from(data, headerStartIndex))
+
+    def __repr__(self):
+        return (f"FrameHeader(frameNumber={self.frameNumber}, totalPacketNumBytes={self.totalPacketNumBytes}, "
+                f"numDetObj={self.numDetObj}, numTlv={self.numTlv}, subFrameNumber={self.subFrameNumber})")
+
+
+class Frame:
+    """!
+       Result of parsing one mmw demo output packet. Per-object values are NumPy arrays of length numDetObj
+       (empty when the packet did not carry them). Every TLV of the packet is kept in tlvs by type and decoded on first access.
+    """
+    __slots__ = ('result', 'headerStartIndex', 'header', 'x', 'y', 'z', 'v',
+                 'range', 'azimuth', 'elevAngle', 'snr', 'noise', 'tlvs', 'epoch')
+
+    def __init__(self, result, headerStartIndex, header,
+                 x=EMPTY_FLOAT_ARRAY, y=EMPTY_FLOAT_ARRAY, z=EMPTY_FLOAT_ARRAY, v=EMPTY_FLOAT_ARRAY,
+                 range=EMPTY_FLOAT_ARRAY, azimuth=EMPTY_FLOAT_ARRAY, elevAngle=EMPTY_FLOAT_ARRAY,
+                 snr=EMPTY_UINT16_ARRAY, noise=EMPTY_UINT16_ARRAY):
+        self.result = result
+        self.headerStartIndex = headerStartIndex
+        self.header = header
+        self.x = x
+        self.y = y
+        self.z = z
+        self.v = v
+        self.range = range
+        self.azimuth = azimuth
+        self.elevAngle = elevAngle
+        self.snr = snr
+        self.noise = noise
+        self.tlvs = {}
+        # configuration epoch of the radar when the packet was read, set by RadarInterface
+        self.epoch = 0
+
+    def tlv(self, tlvType):
+        """!
+           This function returns the decoded value of a TLV, decoding it on first use.
+
+            @param tlvType : TLV type, one of the MMWDEMO_OUTPUT_MSG_* constants
+            @return        : decoded value, None if the packet did not carry this TLV
+        """
+        tlv = self.tlvs.get(tlvType)
+        return tlv.value if tlv is not None else None
+
+    @property
+    def frameNumber(self):
+        return self.header.frameNumber if self.header is not None else -1
+
+    @property
+    def numDetObj(self):
+        return self.header.numDetObj if self.header is not None else -1
+
+    def __repr__(self):
+        return f"Frame(result={self.result}, header={self.header!r})"
+
+
+class Tlv:
     """!
-       This function coverts 4 bytes to a 32-bit unsigned integer.
+       One TLV of an mmw demo output packet. The payload is a zero-copy memoryview slice of the packet;
+       the registered decoder only runs the first time value is read.
+    """
+    __slots__ = ('type', 'payload', 'header', '_value')
 
-        @param data : 1-demension byte array
-        @return     : 32-bit unsigned integer
+    _NOT_DECODED = object()
+
+    def __init__(self, tlvType, payload, header):
+        self.type = tlvType
+        self.payload = payload
+        self.header = header
+        self._value = Tlv._NOT_DECODED
+
+    @property
+    def value(self):
+        if self._value is Tlv._NOT_DECODED:
+            decoder = TLV_DECODERS.get(self.type)
+            self._value = decoder(self.payload, self.header) if decoder is not None else self.payload
+        return self._value
+
+    def __repr__(self):
+        return f"Tlv(type={self.type}, len={len(self.payload)})"
+
+
+def decodeDetectedPoints(payload, header):
+    """!
+       TLV type 1 decoder.
+
+        @return : x, y, z, v, range, azimuth and elevAngle arrays, see parse_detected_points()
     """
-    return (data[0] +
-            data[1]*256 +
-            data[2]*65536 +
-            data[3]*16777216)
+    return parse_detected_points(payload, 0, min(header.numDetObj, len(payload) // DETECTED_POINT_DTYPE.itemsize))
 
-def getUint16(data):
+def decodeSideInfo(payload, header):
     """!
-       This function coverts 2 bytes to a 16-bit unsigned integer.
+       TLV type 7 decoder.
 
-        @param data : 1-demension byte array
-        @return     : 16-bit unsigned integer
+        @return : snr and noise arrays
     """
-    return (data[0] +
-            data[1]*256)
+    sideInfo = np.frombuffer(payload, dtype=SIDE_INFO_DTYPE, count=min(header.numDetObj, len(payload) // SIDE_INFO_DTYPE.itemsize))
+    return (sideInfo['snr'].copy(), sideInfo['noise'].copy())
 
-def getHex(data):
+def decodeProfile(payload, header):
     """!
-       This function coverts 4 bytes to a 32-bit unsigned integer in hex.
+       TLV type 2 and 3 decoder. Each range bin is the sum of log2 magnitudes of the received antennas in Q9 format.
 
-        @param data : 1-demension byte array
-        @return     : 32-bit unsigned integer in hex
+        @return : 1-demension uint16 array with one value per range bin, a view into the packet
+    """
+    return np.frombuffer(payload, dtype='<u2', count=len(payload) // 2)
+
+def decodeStats(payload, header):
+    """!
+       TLV type 6 decoder.
+
+        @return : structured record with the STATS_DTYPE fields, None if the payload is truncated
+    """
+    if len(payload) < STATS_DTYPE.itemsize:
+        return None
+    return np.frombuffer(payload, dtype=STATS_DTYPE, count=1)[0]
+
+def decodeTemperatureStats(payload, header):
+    """!
+       TLV type 9 decoder. tempReportValid and time are followed by one int16 reading per temperature sensor.
+
+        @return : structured record with tempReportValid, time and temp fields, None if the payload is truncated
     """
-    return (binascii.hexlify(data[::-1]))
+    if len(payload) < 8:
+        return None
+    numSensors = (len(payload) - 8) // 2
+    dtype = np.dtype([('tempReportValid', '<i4'), ('time', '<u4'), ('temp', '<i2', (numSensors,))])
+    return np.frombuffer(payload, dtype=dtype, count=1)[0]
+
+# TLV type -> decoder(payload, header). Types without a decoder are exposed as the raw memoryview payload.
+TLV_DECODERS = {
+    MMWDEMO_OUTPUT_MSG_DETECTED_POINTS: decodeDetectedPoints,
+    MMWDEMO_OUTPUT_MSG_RANGE_PROFILE: decodeProfile,
+    MMWDEMO_OUTPUT_MSG_NOISE_PROFILE: decodeProfile,
+    MMWDEMO_OUTPUT_MSG_STATS: decodeStats,
+    MMWDEMO_OUTPUT_MSG_DETECTED_POINTS_SIDE_INFO: decodeSideInfo,
+    MMWDEMO_OUTPUT_MSG_TEMPERATURE_STATS: decodeTemperatureStats,
+}
+
+def register_tlv_decoder(tlvType, decoder):
+    """!
+       This function registers (or replaces) the decoder of a TLV type.
+
+        @param tlvType : TLV type
+        @param decoder : callable(payload, header) returning the decoded value, None to expose the raw payload
+    """
+    if decoder is None:
+        TLV_DECODERS.pop(tlvType, None)
+    else:
+        TLV_DECODERS[tlvType] = decoder
+
 
 def checkMagicPattern(data):
     """!
@@ -84,6 +277,25 @@ def checkMagicPattern(data):
         found = 1
     return (found)
 
+def findMagicPattern(data, start=0, end=None):
+    """!
+       This function searches the magic pattern with a single bytes.find() instead of checking every index.
+
+        @param data  : 1-demension byte array (bytes, bytearray or memoryview)
+        @param start : first index to search from
+        @param end   : index to stop the search at, defaults to the end of data
+        @return      : index of the first magic pattern in data[start:end], -1 if not found
+    """
+    if end is None:
+        end = len(data)
+    if isinstance(data, memoryview):
+        # memoryview has no find(); packets handed out by the reassembler start with the magic word
+        if end - start >= len(MAGIC_WORD) and data[start:start+len(MAGIC_WORD)] == MAGIC_WORD:
+            return start
+        index = bytes(data[start:end]).find(MAGIC_WORD)
+        return index if index == -1 else index + start
+    return data.find(MAGIC_WORD, start, end)
+
 def parser_helper(data, readNumBytes):
     """!
        This function is called by parser_one_mmw_demo_output_packet() function or application to read the input buffer, find the magic number, header location, the length of frame, the number of detected object and the number of TLV contained in this mmw demo output packet.
@@ -92,209 +304,164 @@ def parser_helper(data, readNumBytes):
         @param readNumBytes           : the number of bytes contained in this input byte array
 
         @return headerStartIndex      : the mmw demo output packet header start location
-        @return totalPacketNumBytes   : the mmw demo output packet lenght
-        @return numDetObj             : the number of detected objects contained in this mmw demo output packet
-        @return numTlv                : the number of TLV contained in this mmw demo output packet
-        @return subFrameNumber        : the sbuframe index (0,1,2 or 3) of the frame contained in this mmw demo output packet
+        @return header                : FrameHeader with the packet length, frame number, number of detected objects, number of TLV and subframe index,
+                                        None if no complete header was found
     """
 
-    headerStartIndex = -1
+    headerStartIndex = findMagicPattern(data, 0, readNumBytes)
+    header = None
 
-    for index in range(readNumBytes):
-        if checkMagicPattern(data[index:index+8:1]) == 1:
-            headerStartIndex = index
+    while headerStartIndex != -1 and headerStartIndex + HEADER_NUM_BYTES <= readNumBytes:
+        header = FrameHeader.unpack_from(data, headerStartIndex)
+        if header.totalPacketNumBytes >= HEADER_NUM_BYTES:
             break
+        # resync: a magic word followed by an impossible packet length is payload or corruption, keep searching
+        header = None
+        if isinstance(data, memoryview):
+            # copy the view once, not what is left of it at every resync
+            data = bytes(data[:readNumBytes])
+        headerStartIndex = findMagicPattern(data, headerStartIndex + 1, readNumBytes)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("headerStartIndex    = %d", headerStartIndex)
+        if header is not None:
+            logger.debug("totalPacketNumBytes = %d", header.totalPacketNumBytes)
+            logger.debug("platform            = %x", header.platform)
+            logger.debug("frameNumber         = %d", header.frameNumber)
+            logger.debug("timeCpuCycles       = %d", header.timeCpuCycles)
+            logger.debug("numDetObj           = %d", header.numDetObj)
+            logger.debug("numTlv              = %d", header.numTlv)
+            logger.debug("subFrameNumber      = %d", header.subFrameNumber)
+
+    return (headerStartIndex, header)
+
+
+def parse_detected_points(data, pointsStart, numDetObj):
+    """!
+       This function decodes the detected points of TLV type 1 in one pass and computes range, azimuth and elevation angle for all objects at once.
+
+        @param data                   : 1-demension byte array holds the mmw demo output packet
+        @param pointsStart            : start location of the first object (i.e. right after the TLV type/length words)
+        @param numDetObj              : the number of detected objects
+
+        @return detectedX_array       : x of each detected object
+        @return detectedY_array       : y of each detected object
+        @return detectedZ_array       : z of each detected object
+        @return detectedV_array       : v of each detected object
+        @return detectedRange_array   : range of each detected object
+        @return detectedAzimuth_array : azimuth of each detected object in degrees
+        @return detectedElevAngle_array : elevAngle of each detected object in degrees
+    """
+    points = np.frombuffer(data, dtype=DETECTED_POINT_DTYPE, count=numDetObj, offset=pointsStart)
+
+    # work in double precision, same as the values returned by struct.unpack
+    x = points['x'].astype(np.float64)
+    y = points['y'].astype(np.float64)
+    z = points['z'].astype(np.float64)
+    v = points['v'].astype(np.float64)
+
+    xy = np.sqrt(x * x + y * y)
+    detectedRange_array = np.sqrt(x * x + y * y + z * z)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # azimuth is +/-90 degrees on the y == 0 axis
+        detectedAzimuth_array = np.where(y == 0,
+                                         np.where(x >= 0, 90.0, -90.0),
+                                         np.arctan(x / y) * 180 / PI)
+        # elevation angle is +/-90 degrees when the object is straight above/below the sensor
+        detectedElevAngle_array = np.where(xy == 0,
+                                           np.where(z >= 0, 90.0, -90.0),
+                                           np.arctan(z / xy) * 180 / PI)
 
-    if headerStartIndex == -1:  # does not find the magic number i.e output packet header
-        totalPacketNumBytes = -1
-        numDetObj           = -1
-        numTlv              = -1
-        subFrameNumber      = -1
-        platform            = -1
-        frameNumber         = -1
-        timeCpuCycles       = -1
-    else:  # find the magic number i.e output packet header
-        totalPacketNumBytes = getUint32(data[headerStartIndex+12:headerStartIndex+16:1])
-        platform            = getHex(data[headerStartIndex+16:headerStartIndex+20:1])
-        frameNumber         = getUint32(data[headerStartIndex+20:headerStartIndex+24:1])
-        timeCpuCycles       = getUint32(data[headerStartIndex+24:headerStartIndex+28:1])
-        numDetObj           = getUint32(data[headerStartIndex+28:headerStartIndex+32:1])
-        numTlv              = getUint32(data[headerStartIndex+32:headerStartIndex+36:1])
-        subFrameNumber      = getUint32(data[headerStartIndex+36:headerStartIndex+40:1])
-
-    print("headerStartIndex    = %d" % (headerStartIndex))
-    print("totalPacketNumBytes = %d" % (totalPacketNumBytes))
-    print("platform            = %s" % (platform))
-    print("frameNumber         = %d" % (frameNumber))
-    print("timeCpuCycles       = %d" % (timeCpuCycles))
-    print("numDetObj           = %d" % (numDetObj))
-    print("numTlv              = %d" % (numTlv))
-    print("subFrameNumber      = %d" % (subFrameNumber))
-
-    return (headerStartIndex, totalPacketNumBytes, frameNumber, numDetObj, numTlv, subFrameNumber)
-
-
-def parser_one_mmw_demo_output_packet(data, readNumBytes):
+    return (x, y, z, v, detectedRange_array, detectedAzimuth_array, detectedElevAngle_array)
+
+
+def parser_one_mmw_demo_output_packet(data, readNumBytes, enabledTlvs=None):
     """!
        This function is called by application. Firstly it calls parser_helper() function to find the start location of the mmw demo output packet, then extract the contents from the output packet.
        Each invocation of this function handles only one frame at a time and user needs to manage looping around to parse data for multiple frames.
 
+       All numTlv TLVs are walked. Detected points (type 1) and side info (type 7) are decoded into the frame arrays,
+       every other TLV is only sliced and decoded when the consumer reads it through Frame.tlv().
+
         @param data                   : 1-demension byte array holds the the data read from mmw demo output. It ignorant of the fact that data is coming from UART directly or file read.
         @param readNumBytes           : the number of bytes contained in this input byte array
+        @param enabledTlvs            : optional collection of TLV types to keep, all other TLVs are skipped. None keeps all of them
 
-        @return result                : parser result. 0 pass otherwise fail
-        @return headerStartIndex      : the mmw demo output packet header start location
-        @return totalPacketNumBytes   : the mmw demo output packet length
-        @return numDetObj             : the number of detected objects contained in this mmw demo output packet
-        @return numTlv                : the number of TLV contained in this mmw demo output packet
-        @return subFrameNumber        : the sbuframe index (0,1,2 or 3) of the frame contained in this mmw demo output packet
-        @return detectedX_array       : 1-demension array holds each detected target's x of the mmw demo output packet
-        @return detectedY_array       : 1-demension array holds each detected target's y of the mmw demo output packet
-        @return detectedZ_array       : 1-demension array holds each detected target's z of the mmw demo output packet
-        @return detectedV_array       : 1-demension array holds each detected target's v of the mmw demo output packet
-        @return detectedRange_array   : 1-demension array holds each detected target's range profile of the mmw demo output packet
-        @return detectedAzimuth_array : 1-demension array holds each detected target's azimuth of the mmw demo output packet
-        @return detectedElevAngle_array : 1-demension array holds each detected target's elevAngle of the mmw demo output packet
-        @return detectedSNR_array     : 1-demension array holds each detected target's snr of the mmw demo output packet
-        @return detectedNoise_array   : 1-demension array holds each detected target's noise of the mmw demo output packet
+        @return frame                 : Frame holding the parser result (0 pass otherwise fail), the header start location, the FrameHeader,
+                                        the x, y, z, v, range, azimuth, elevAngle, snr and noise arrays of the detected objects and the TLVs
     """
 
-    headerNumBytes = 40
-
-    PI = 3.14159265
-
-    detectedX_array = []
-    detectedY_array = []
-    detectedZ_array = []
-    detectedV_array = []
-    detectedRange_array = []
-    detectedAzimuth_array = []
-    detectedElevAngle_array = []
-    detectedSNR_array = []
-    detectedNoise_array = []
-
-    result = TC_PASS
+    headerNumBytes = HEADER_NUM_BYTES
 
     # call parser_helper() function to find the output packet header start location and packet size
-    (headerStartIndex, totalPacketNumBytes, frameNumber, numDetObj, numTlv, subFrameNumber) = parser_helper(data, readNumBytes)
+    (headerStartIndex, header) = parser_helper(data, readNumBytes)
 
     if headerStartIndex == -1:
-        result = TC_FAIL
-        print("************ Frame Fail, cannot find the magic words *****************")
-    else:
-        nextHeaderStartIndex = headerStartIndex + totalPacketNumBytes
-
-        if headerStartIndex + totalPacketNumBytes > readNumBytes:
-            result = TC_FAIL
-            print("********** Frame Fail, readNumBytes may not long enough ***********")
-        elif nextHeaderStartIndex + 8 < readNumBytes and checkMagicPattern(data[nextHeaderStartIndex:nextHeaderStartIndex+8:1]) == 0:
-            result = TC_FAIL
-            print("********** Frame Fail, incomplete packet **********")
-        elif numDetObj <= 0:
-            result = TC_FAIL
-            print("************ Frame Fail, numDetObj = %d *****************" % (numDetObj))
-        elif subFrameNumber > 3:
-            result = TC_FAIL
-            print("************ Frame Fail, subFrameNumber = %d *****************" % (subFrameNumber))
-        else:
-            # process the 1st TLV
-            tlvStart = headerStartIndex + headerNumBytes
-
-            tlvType = getUint32(data[tlvStart+0:tlvStart+4:1])
-            tlvLen = getUint32(data[tlvStart+4:tlvStart+8:1])
-            offset = 8
-
-            print("The 1st TLV")
-            print("    type %d" % (tlvType))
-            print("    len %d bytes" % (tlvLen))
-
-            # the 1st TLV must be type 1
-            if tlvType == 1 and tlvLen < totalPacketNumBytes:#MMWDEMO_UART_MSG_DETECTED_POINTS
-
-                # TLV type 1 contains x, y, z, v values of all detect objects.
-                # each x, y, z, v are 32-bit float in IEEE 754 single-precision binary floating-point format, so every 16 bytes represent x, y, z, v values of one detect objects.
-
-                # for each detect objects, extract/convert float x, y, z, v values and calculate range profile and azimuth
-                for obj in range(numDetObj):
-                    # convert byte0 to byte3 to float x value
-                    x = struct.unpack('<f', codecs.decode(binascii.hexlify(data[tlvStart + offset:tlvStart + offset+4:1]),'hex'))[0]
-
-                    # convert byte4 to byte7 to float y value
-                    y = struct.unpack('<f', codecs.decode(binascii.hexlify(data[tlvStart + offset+4:tlvStart + offset+8:1]),'hex'))[0]
-
-                    # convert byte8 to byte11 to float z value
-                    z = struct.unpack('<f', codecs.decode(binascii.hexlify(data[tlvStart + offset+8:tlvStart + offset+12:1]),'hex'))[0]
-
-                    # convert byte12 to byte15 to float v value
-                    v = struct.unpack('<f', codecs.decode(binascii.hexlify(data[tlvStart + offset+12:tlvStart + offset+16:1]),'hex'))[0]
-
-                    # calculate range profile from x, y, z
-                    compDetectedRange = math.sqrt((x * x)+(y * y)+(z * z))
-
-                    # calculate azimuth from x, y
-                    if y == 0:
-                        if x >= 0:
-                            detectedAzimuth = 90
-                        else:
-                            detectedAzimuth = -90
-                    else:
-                        detectedAzimuth = math.atan(x/y) * 180 / PI
-
-                    # calculate elevation angle from x, y, z
-                    if x == 0 and y == 0:
-                        if z >= 0:
-                            detectedElevAngle = 90
-                        else:
-                            detectedElevAngle = -90
-                    else:
-                        detectedElevAngle = math.atan(z/math.sqrt((x * x)+(y * y))) * 180 / PI
-
-                    detectedX_array.append(x)
-                    detectedY_array.append(y)
-                    detectedZ_array.append(z)
-                    detectedV_array.append(v)
-                    detectedRange_array.append(compDetectedRange)
-                    detectedAzimuth_array.append(detectedAzimuth)
-                    detectedElevAngle_array.append(detectedElevAngle)
-
-                    offset = offset + 16
-                # end of for obj in range(numDetObj) for 1st TLV
-
-            # Process the 2nd TLV
-            tlvStart = tlvStart + 8 + tlvLen
-            tlvType  = getUint32(data[tlvStart+0:tlvStart+4:1])
-            tlvLen   = getUint32(data[tlvStart+4:tlvStart+8:1])
-            offset   = 8
-
-            print("The 2nd TLV")
-            print("    type %d" % (tlvType))
-            print("    len %d bytes" % (tlvLen))
-
-            if tlvType == 7:
-
-                # TLV type 7 contains snr and noise of all detect objects.
-                # each snr and noise are 16-bit integer represented by 2 bytes, so every 4 bytes represent snr and noise of one detect objects.
-
-                # for each detect objects, extract snr and noise
-                for obj in range(numDetObj):
-                    # byte0 and byte1 represent snr. convert 2 bytes to 16-bit integer
-                    snr   = getUint16(data[tlvStart + offset + 0:tlvStart + offset + 2:1])
-                    # byte2 and byte3 represent noise. convert 2 bytes to 16-bit integer
-                    noise = getUint16(data[tlvStart + offset + 2:tlvStart + offset + 4:1])
-
-                    detectedSNR_array.append(snr)
-                    detectedNoise_array.append(noise)
-
-                    offset = offset + 4
-            else:
-                for obj in range(numDetObj):
-                    detectedSNR_array.append(0)
-                    detectedNoise_array.append(0)
-            # end of if tlvType == 7
-
-            print("                  x(m)         y(m)         z(m)        v(m/s)    range(m)  azimuth(deg)  elevAngle(deg)  snr(0.1dB)    noise(0.1dB)")
-            for obj in range(numDetObj):
-                print("    obj%3d: %12f %12f %12f %12f %12f %12f %12d %12d %12d" % (obj, detectedX_array[obj], detectedY_array[obj], detectedZ_array[obj], detectedV_array[obj], detectedRange_array[obj], detectedAzimuth_array[obj], detectedElevAngle_array[obj], detectedSNR_array[obj], detectedNoise_array[obj]))
-
-    return (result, headerStartIndex, totalPacketNumBytes, frameNumber, numDetObj, numTlv, subFrameNumber, detectedX_array, detectedY_array, detectedZ_array, detectedV_array, detectedRange_array, detectedAzimuth_array, detectedElevAngle_array, detectedSNR_array, detectedNoise_array)
+        logger.debug("************ Frame Fail, cannot find the magic words *****************")
+        return Frame(TC_FAIL, headerStartIndex, header)
+
+    if header is None or headerStartIndex + header.totalPacketNumBytes > readNumBytes:
+        logger.debug("********** Frame Fail, readNumBytes may not long enough ***********")
+        return Frame(TC_FAIL, headerStartIndex, header)
+
+    totalPacketNumBytes = header.totalPacketNumBytes
+    numDetObj = header.numDetObj
+    nextHeaderStartIndex = headerStartIndex + totalPacketNumBytes
+
+    if nextHeaderStartIndex + 8 < readNumBytes and checkMagicPattern(data[nextHeaderStartIndex:nextHeaderStartIndex+8:1]) == 0:
+        logger.debug("********** Frame Fail, incomplete packet **********")
+        return Frame(TC_FAIL, headerStartIndex, header)
+    if header.subFrameNumber > 3:
+        logger.debug("************ Frame Fail, subFrameNumber = %d *****************", header.subFrameNumber)
+        return Frame(TC_FAIL, headerStartIndex, header)
+
+    frame = Frame(TC_PASS, headerStartIndex, header)
+    packet = memoryview(data)
+
+    # walk all TLVs
+    tlvStart = headerStartIndex + headerNumBytes
+    for tlvIndex in range(header.numTlv):
+        if tlvStart + 8 > nextHeaderStartIndex:
+            logger.debug("********** Frame Fail, TLV %d header beyond packet end **********", tlvIndex)
+            frame.result = TC_FAIL
+            break
+        (tlvType, tlvLen) = TLV_HEADER_STRUCT.unpack_from(data, tlvStart)
+        payloadStart = tlvStart + 8
+        tlvStart = payloadStart + tlvLen
+        if tlvStart > nextHeaderStartIndex:
+            logger.debug("********** Frame Fail, TLV %d type %d len %d beyond packet end **********", tlvIndex, tlvType, tlvLen)
+            frame.result = TC_FAIL
+            break
 
+        logger.debug("TLV %d: type %d, len %d bytes", tlvIndex, tlvType, tlvLen)
+
+        if enabledTlvs is not None and tlvType not in enabledTlvs:
+            continue
+        frame.tlvs[tlvType] = Tlv(tlvType, packet[payloadStart:tlvStart], header)
+
+    # TLV type 1 contains x, y, z, v values of all detect objects.
+    # each x, y, z, v are 32-bit float in IEEE 754 single-precision binary floating-point format, so every 16 bytes represent x, y, z, v values of one detect objects.
+    points = frame.tlv(MMWDEMO_OUTPUT_MSG_DETECTED_POINTS)
+    if points is not None:
+        (frame.x, frame.y, frame.z, frame.v, frame.range, frame.azimuth, frame.elevAngle) = points
+
+    # TLV type 7 contains snr and noise of all detect objects.
+    # each snr and noise are 16-bit integer represented by 2 bytes, so every 4 bytes represent snr and noise of one detect objects.
+    sideInfo = frame.tlv(MMWDEMO_OUTPUT_MSG_DETECTED_POINTS_SIDE_INFO)
+    if sideInfo is not None:
+        (frame.snr, frame.noise) = sideInfo
+    elif points is not None:
+        frame.snr = np.zeros(len(frame.x), dtype=np.uint16)
+        frame.noise = np.zeros(len(frame.x), dtype=np.uint16)
+
+    if numDetObj <= 0:
+        logger.debug("************ Frame Fail, numDetObj = %d *****************", numDetObj)
+        frame.result = TC_FAIL
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("                  x(m)         y(m)         z(m)        v(m/s)    range(m)  azimuth(deg)  elevAngle(deg)  snr(0.1dB)    noise(0.1dB)")
+        for obj in range(len(frame.x)):
+            logger.debug("    obj%3d: %12f %12f %12f %12f %12f %12f %12d %12d %12d", obj, frame.x[obj], frame.y[obj], frame.z[obj], frame.v[obj], frame.range[obj], frame.azimuth[obj], frame.elevAngle[obj], frame.snr[obj], frame.noise[obj])
+
+    return frame
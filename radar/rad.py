@@ -1,13 +1,17 @@
 import serial
 import serial.tools.list_ports
 import re
+import logging
 import os
 import json
 import threading
 import time
 from collections import defaultdict, deque
-from radar_interface import RadarInterface
-from radar_ui import RadarUI
+from radar.radar_interface import RadarInterface, read_timeout
+from radar.radar_ui import RadarUI
+from radar.radar_config import ProfileSwitcher, RadarConfigError, RadarConfigurator, load_cfg
+from radar.radar_profile import describe, load_profile, profile_from_commands
+from implementation.capture import CaptureWriter, CaptureReader, open_port, SOURCE_RADAR
 
 RADAR_CONFIG = "./tdm/profile_2d_3AzimTx.cfg"
 
@@ -19,23 +23,24 @@ dat_timeout = 1
 
 configDataPort = f"configDataPort {BAUD_RATE_DAT} 0"
 
+CAPTURE_RECORD_PATH = None  # record the data port to this capture file
+CAPTURE_REPLAY_PATH = None  # replay this capture file instead of configuring and opening the radar
+CAPTURE_REPLAY_REALTIME = True
+
+# Profiles switched to while running, without restarting the reader: [(seconds after start, cfg path), ...]
+PROFILE_SCHEDULE = []
+
 
 def parse_cfg_file(file_path):
     """
     Parses a radar configuration (.cfg) file and returns an array of commands.
-    Comment lines (starting with '%') are ignored.
+    Comment lines (starting with '%') are ignored. Parsed files are cached until they change.
 
     :param file_path: Path to the .cfg file.
     :return: List of configuration commands (strings).
     """
-    commands = []
     try:
-        with open(file_path, 'r') as file:
-            for line in file:
-                stripped_line = line.strip()
-                if stripped_line and not stripped_line.startswith('%'):
-                    commands.append(stripped_line)
-        return commands
+        return list(load_cfg(file_path))
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return []
@@ -44,37 +49,49 @@ def parse_cfg_file(file_path):
         return []
 
 
-def configure(port):
-    with serial.Serial(port, BAUD_RATE_CON, timeout=con_timeout) as ser:
-        ser.reset_input_buffer()  # Flush input buffer
-        try:
-            config_commands = parse_cfg_file(RADAR_CONFIG)
-            if len(config_commands) == 0:
-                return
+def profile_commands(cfg_path):
+    """
+    :return: Commands of a configuration file with the data port setting added, empty if it cannot be read.
+    """
+    config_commands = parse_cfg_file(cfg_path)
+    if config_commands:
+        config_commands.insert(-2, configDataPort)
+    return config_commands
 
-            config_commands.insert(-2, configDataPort)
 
-            for cmd in config_commands:
-                ser.write((cmd + "\n").encode())
+def configure(configurator, cfg_path=RADAR_CONFIG):
+    """
+    Upload a configuration file, moving on to each command as soon as the device acknowledges the previous one.
 
-                if cmd == "sensorStop" or cmd == "sensorStart":
-                    time.sleep(0.1)
+    :param configurator: RadarConfigurator on the open configuration port.
+    :return: time.perf_counter() at which the upload started, None if nothing was sent.
+    """
+    config_commands = profile_commands(cfg_path)
+    if len(config_commands) == 0:
+        return None
 
-                response = ser.readlines()
-                response = [line.decode().strip() for line in response]
+    start = time.perf_counter()
+    configurator.configure(config_commands)
+    print("Configuration commands sent successfully.")
+    return start
 
-                if len(response) >= 2 and response[-2] == "Done":
-                    print(".", end="", flush=True)
-                else:
-                    raise Exception(f"Failed to execute {cmd}\nresponse: {response}")
 
-            print("\nConfiguration commands sent successfully.")
-        except serial.SerialException as e:
-            print(f"Error opening serial port: {e}")
-        finally:
-            if ser.is_open:
-                ser.close()
-            print("Serial port closed.")
+def run_profile_schedule(switcher, stop_event):
+    """
+    Switch profiles at the times given in PROFILE_SCHEDULE.
+    """
+    start = time.monotonic()
+    for at, cfg_path in sorted(PROFILE_SCHEDULE):
+        if stop_event.wait(max(0.0, start + at - time.monotonic())):
+            return
+        config_commands = profile_commands(cfg_path)
+        if not config_commands:
+            continue
+        try:
+            switcher.switch(config_commands, cfg_path, profile_from_commands(tuple(config_commands)))
+        except RadarConfigError as e:
+            logging.error("Switching to %s failed: %s", cfg_path, e)
+            return
 
 
 def select_two_ports():
@@ -125,26 +142,73 @@ def load_or_select_ports():
         exit(1)  # Exit if the fixed ports are not accessible
 
 
+def acquire(radar, radarUI, stop_event, configure_start=None):
+    """
+    Read and parse frames until stop_event is set and hand them to the UI without waiting for it.
+
+    :param configure_start: time.perf_counter() at which the configuration upload started, to report the
+                            time to the first frame.
+    """
+    while not stop_event.is_set():
+        for frame in radar.iter_frames():
+            if configure_start is not None:
+                logging.info("Time to first frame: %.0f ms from the start of the configuration upload",
+                             1e3 * (time.perf_counter() - configure_start))
+                configure_start = None
+            radarUI.submit(frame)
+
+
 def main():
-    selected_ports = load_or_select_ports()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    capture_reader = CaptureReader(CAPTURE_REPLAY_PATH) if CAPTURE_REPLAY_PATH else None
+    capture_writer = CaptureWriter(CAPTURE_RECORD_PATH) if CAPTURE_RECORD_PATH and not capture_reader else None
+    if capture_reader:
+        selected_ports = [None, None]
+    else:
+        selected_ports = load_or_select_ports()
     if selected_ports and len(selected_ports) == 2:
         port1, port2 = selected_ports
-        print(f"Using CONSOLE port: {port1} and DATA port: {port2}")
-        configure(port1)
+        configure_start = None
+        config_serial = None
+        if capture_reader:
+            print(f"Replaying {CAPTURE_REPLAY_PATH}")
+        else:
+            print(f"Using CONSOLE port: {port1} and DATA port: {port2}")
+            # the configuration port stays open for profile switches
+            config_serial = serial.Serial(port1, BAUD_RATE_CON, timeout=con_timeout)
+            configure_start = configure(RadarConfigurator(config_serial))
+
+        profile = load_profile(RADAR_CONFIG)
+        logging.info("Radar profile %s: %s", RADAR_CONFIG, describe(profile))
 
         print("Reading data")
-        radar = RadarInterface(port=port2, baudrate=BAUD_RATE_DAT)
-        radarUI = RadarUI(2, 2)
+        data_port = open_port(port2, BAUD_RATE_DAT, SOURCE_RADAR, timeout=read_timeout(profile),
+                              recorder=capture_writer, replay=capture_reader, realtime=CAPTURE_REPLAY_REALTIME)
+        radar = RadarInterface(port=port2, baudrate=BAUD_RATE_DAT, serial_port=data_port, profile=profile)
+        # nothing new to show faster than the radar produces frames
+        radarUI = RadarUI(2, 2, max_fps=min(20, profile.frame_rate))
+
+        # Acquisition runs at full speed on its own thread, the plot only shows the newest frame
+        stop_event = threading.Event()
+        threads = [threading.Thread(target=acquire, args=(radar, radarUI, stop_event, configure_start), daemon=True)]
+        if config_serial is not None and PROFILE_SCHEDULE:
+            switcher = ProfileSwitcher(RadarConfigurator(config_serial), radar)
+            threads.append(threading.Thread(target=run_profile_schedule, args=(switcher, stop_event), daemon=True))
+        for thread in threads:
+            thread.start()
         try:
-            while True:
-                raw_data = radar.read_data()
-                if raw_data:
-                    parsed_results = radar.parse_frame(raw_data)
-                    radarUI.update(parsed_results)
+            radarUI.show()
         except KeyboardInterrupt:
             print("Exiting...")
         finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join(timeout=2 * dat_timeout)
             radar.close()
+            if config_serial is not None:
+                config_serial.close()
+            if capture_writer:
+                capture_writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+"""
+Configuration upload for the mmw demo command line interface.
+
+Every command is acknowledged by the device with its echo, a "Done" or "Error ..." line and the "mmwDemo:/>" prompt.
+The driver returns as soon as the acknowledgement arrives instead of waiting for a read timeout, so uploading a
+profile costs what the device needs to apply it.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Longest wait for the acknowledgement of a command, in seconds
+DEFAULT_COMMAND_TIMEOUT = 0.5
+COMMAND_TIMEOUTS = {
+    "sensorStop": 2.0,
+    "sensorStart": 3.0,
+    "flushCfg": 1.0,
+    "calibData": 2.0,
+    "measureRangeBiasAndRxChanPhase": 2.0,
+}
+# Commands not sent again when their acknowledgement times out: the device may have applied them already, and
+# a second sensorStart on a running sensor fails
+NOT_RETRIED_AFTER_TIMEOUT = ("sensorStart",)
+# Granularity of the serial reads; a line is returned as soon as it is complete
+POLL_INTERVAL = 0.05
+PROMPT = b"mmwDemo:/>"
+
+_cfg_cache = {}
+
+# One profile switch: epoch number, profile label and seconds from sensorStop to the acknowledged sensorStart
+ConfigEpoch = namedtuple('ConfigEpoch', 'epoch profile duration')
+
+
+class RadarConfigError(Exception):
+    pass
+
+
+def load_cfg(file_path):
+    """
+    Read a .cfg file into its list of commands, skipping blank and comment ('%') lines.
+
+    Parsed files are cached and only read again when their modification time or size changes, so switching
+    back and forth between profiles does not touch the disk.
+
+    :param file_path: Path to the .cfg file.
+    :return: Tuple of configuration commands (strings).
+    """
+    stat = os.stat(file_path)
+    key = os.path.abspath(file_path)
+    cached = _cfg_cache.get(key)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(file_path, 'r') as file:
+        commands = tuple(line.strip() for line in file if line.strip() and not line.strip().startswith('%'))
+    _cfg_cache[key] = ((stat.st_mtime_ns, stat.st_size), commands)
+    return commands
+
+
+class RadarConfigurator:
+    def __init__(self, serial_port, command_timeouts=None, default_timeout=DEFAULT_COMMAND_TIMEOUT, retries=2):
+        """
+        Send commands over the radar's configuration port and wait for each acknowledgement.
+
+        :param serial_port: Open serial-like object of the configuration (CLI) port.
+        :param command_timeouts: Per command name timeouts in seconds, merged over COMMAND_TIMEOUTS.
+        :param default_timeout: Timeout of the commands not listed.
+        :param retries: Times a command is sent again after an error or a timeout.
+        """
+        self.serial_port = serial_port
+        self.command_timeouts = dict(COMMAND_TIMEOUTS)
+        if command_timeouts:
+            self.command_timeouts.update(command_timeouts)
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.serial_port.timeout = POLL_INTERVAL
+
+    def timeout(self, command):
+        return self.command_timeouts.get(command.split(None, 1)[0], self.default_timeout)
+
+    def send(self, command):
+        """
+        Send one command, retrying on failure. Commands in NOT_RETRIED_AFTER_TIMEOUT are only retried after an
+        error reply.
+        :return: Response lines up to and including "Done".
+        :raises RadarConfigError: If the device still reports an error or does not answer after the retries.
+        """
+        for attempt in range(self.retries + 1):
+            ok, response = self._send_once(command)
+            if ok:
+                return response
+            timed_out = not response or not response[-1].startswith("Error")
+            logger.warning("Command %r failed (attempt %d of %d): %s",
+                           command, attempt + 1, self.retries + 1, response or "no response")
+            # a late reply to this attempt must not be taken as the acknowledgement of the next command
+            self._drain(self.timeout(command))
+            if timed_out and command.split(None, 1)[0] in NOT_RETRIED_AFTER_TIMEOUT:
+                break
+        raise RadarConfigError(f"Failed to execute {command}\nresponse: {response}")
+
+    def configure(self, commands):
+        """
+        Send every command in order.
+        :return: Seconds spent on each command, as a list of (command, seconds).
+        """
+        self.serial_port.reset_input_buffer()
+        timings = []
+        start = time.perf_counter()
+        for command in commands:
+            command_start = time.perf_counter()
+            self.send(command)
+            timings.append((command, time.perf_counter() - command_start))
+        logger.info("Sent %d configuration commands in %.0f ms", len(timings), 1e3 * (time.perf_counter() - start))
+        return timings
+
+    def _send_once(self, command):
+        self.serial_port.write((command + "\n").encode())
+        deadline = time.perf_counter() + self.timeout(command)
+        response = []
+        partial = b''
+        while time.perf_counter() < deadline:
+            partial += self.serial_port.readline()
+            if not partial.endswith(b'\n'):
+                continue
+            line = partial.decode(errors='ignore').strip()
+            partial = b''
+            # the prompt of the previous command arrives without a line ending, in front of the echo
+            if line.startswith("mmwDemo:/>"):
+                line = line[len("mmwDemo:/>"):].strip()
+            if not line:
+                continue
+            response.append(line)
+            if line == "Done":
+                return True, response
+            if line.startswith("Error"):
+                return False, response
+        if partial:
+            response.append(partial.decode(errors='ignore').strip())
+        return False, response
+
+    def _drain(self, timeout):
+        """
+        Discard the rest of the reply to a failed command, up to the device's prompt or until timeout passes.
+        """
+        deadline = time.perf_counter() + timeout
+        tail = b''
+        while time.perf_counter() < deadline:
+            tail += self.serial_port.read(self.serial_port.in_waiting or 1)
+            if PROMPT in tail:
+                break
+            tail = tail[-len(PROMPT):]
+        self.serial_port.reset_input_buffer()
+
+
+class ProfileSwitcher:
+    def __init__(self, configurator, radar, flush_timeout=2.0):
+        """
+        Switch a running radar to another profile while the data-port reader and its reassembler keep running.
+
+        The radar is stopped, the reader drops the partial frames of the old configuration and starts a new
+        configuration epoch, then the new profile is uploaded and the radar started again.
+
+        :param configurator: RadarConfigurator on the open configuration port.
+        :param radar: RadarInterface whose frames are being read on another thread.
+        :param flush_timeout: Longest wait for the reader to flush before the new profile is uploaded anyway.
+        """
+        self.configurator = configurator
+        self.radar = radar
+        self.flush_timeout = flush_timeout
+        self.history = []
+        self._lock = threading.Lock()
+
+    def switch(self, commands, profile=None, radar_profile=None):
+        """
+        :param commands: Commands of the new profile, as in a .cfg file (sensorStop ... sensorStart).
+        :param profile: Label for the log and the history, e.g. the .cfg path.
+        :param radar_profile: RadarProfile of the new configuration, handed to the reader with the new epoch.
+        :return: ConfigEpoch of the new configuration.
+        :raises RadarConfigError: If a command fails; the radar is then left stopped.
+        """
+        commands = [command for command in commands if command not in ("sensorStop", "sensorStart")]
+        with self._lock:
+            start = time.perf_counter()
+            self.configurator.send("sensorStop")
+            epoch, flushed = self.radar.begin_epoch(radar_profile)
+            if not flushed.wait(self.flush_timeout):
+                logger.warning("Radar reader did not flush within %.1f s, uploading %s anyway", self.flush_timeout,
+                               profile)
+            for command in commands:
+                self.configurator.send(command)
+            self.configurator.send("sensorStart")
+            config_epoch = ConfigEpoch(epoch, profile, time.perf_counter() - start)
+            self.history.append(config_epoch)
+        logger.info("Switched to %s (epoch %d) in %.0f ms", profile, epoch, 1e3 * config_epoch.duration)
+        return config_epoch
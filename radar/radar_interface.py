@@ -1,20 +1,157 @@
+import logging
+import struct
+import threading
+import time
 import serial
-from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet
+from radar.parser_mmw_demo import parser_one_mmw_demo_output_packet, MAGIC_WORD, HEADER_NUM_BYTES
+
+logger = logging.getLogger(__name__)
+
+TOTAL_LEN_OFFSET = 12
+MAX_PACKET_NUM_BYTES = 1 << 20
+DEFAULT_READ_SIZE = 4096
+
+
+def read_timeout(profile):
+    """
+    :return: Serial read timeout for a RadarProfile: half a frame period, 1 s without a profile.
+    """
+    return profile.frame_period / 2 if profile is not None else 1
+
+
+class FrameReassembler:
+    def __init__(self, capacity=65536, max_packet_size=MAX_PACKET_NUM_BYTES):
+        """
+        Reassemble mmw demo output packets from an arbitrarily chunked byte stream.
+
+        Incoming bytes are copied once into a preallocated buffer. Complete packets are handed out as
+        memoryview slices of that buffer. When the buffer fills up, the unconsumed tail moves to a new buffer
+        and the old one is never written again, so handed-out packets stay valid.
+
+        :param capacity: Initial buffer size in bytes. The buffer grows if a packet does not fit.
+        :param max_packet_size: Largest totalPacketNumBytes accepted before the header is treated as corrupt.
+        """
+        self.max_packet_size = max_packet_size
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._head = 0
+        self._tail = 0
+        self.frames_found = 0
+        self.bytes_discarded = 0
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def feed(self, data):
+        """
+        Append newly read bytes to the buffer.
+        :param data: Bytes-like object from the serial port or a capture file.
+        """
+        num_bytes = len(data)
+        if self._tail + num_bytes > len(self._buffer):
+            self._compact(num_bytes)
+        self._view[self._tail:self._tail + num_bytes] = data
+        self._tail += num_bytes
+
+    def frames(self):
+        """
+        Yield every complete packet currently in the buffer.
+        :return: Generator of memoryview slices, each holding exactly one packet starting with the magic word.
+        """
+        buffer = self._buffer
+        while True:
+            start = buffer.find(MAGIC_WORD, self._head, self._tail)
+            if start == -1:
+                # keep a possible partial magic word at the end of the buffer
+                keep_from = max(self._head, self._tail - (len(MAGIC_WORD) - 1))
+                self.bytes_discarded += keep_from - self._head
+                self._head = keep_from
+                return
+            self.bytes_discarded += start - self._head
+            self._head = start
+
+            if self._tail - start < HEADER_NUM_BYTES:
+                return
+            (total_len,) = struct.unpack_from('<I', buffer, start + TOTAL_LEN_OFFSET)
+            if total_len < HEADER_NUM_BYTES or total_len > self.max_packet_size:
+                # corrupt header, resync on the next magic word
+                self._head = start + 1
+                self.bytes_discarded += 1
+                continue
+            if self._tail - start < total_len:
+                return
+
+            self._head = start + total_len
+            self.frames_found += 1
+            yield self._view[start:start + total_len]
+
+    def clear(self):
+        """
+        Drop all buffered bytes.
+        """
+        self.bytes_discarded += self._tail - self._head
+        self._head = self._tail
+
+    def _compact(self, incoming):
+        # move the pending bytes into a fresh buffer instead of shifting them in place, so packets already
+        # handed out keep referencing intact data (the old buffer lives on as long as they do)
+        pending = self._tail - self._head
+        new_size = len(self._buffer)
+        while pending + incoming > new_size:
+            new_size *= 2
+        new_buffer = bytearray(new_size)
+        new_buffer[:pending] = self._view[self._head:self._tail]
+        self._buffer = new_buffer
+        self._view = memoryview(new_buffer)
+        self._head = 0
+        self._tail = pending
+
 
 class RadarInterface:
-    def __init__(self, port, baudrate):
+    def __init__(self, port, baudrate, enabled_tlvs=None, serial_port=None, profile=None):
         """
         Initialize the Radar Interface with a specified serial port and baud rate.
         :param port: Serial port to which the radar is connected (e.g., 'COM3' or '/dev/ttyUSB0').
         :param baudrate: Communication baud rate (e.g., 115200).
+        :param enabled_tlvs: Optional collection of TLV types to keep (MMWDEMO_OUTPUT_MSG_*), None keeps all.
+        :param serial_port: Optional already opened serial-like object (e.g. a capture replay) used instead of opening port.
+        :param profile: Optional RadarProfile of the running configuration. Reads are sized to one frame period,
+                        a port opened here polls twice per frame, and frames outside its limits are dropped.
         """
-        self.serial_port = serial.Serial(port, baudrate, timeout=1)
+        if serial_port is None:
+            serial_port = serial.Serial(port, baudrate, timeout=read_timeout(profile))
+        self.serial_port = serial_port
         if self.serial_port.is_open:
-            print(f"Connected to radar on {port} at {baudrate} baud.")
+            logger.info("Connected to radar on %s at %d baud.", port, baudrate)
         else:
             raise Exception(f"Failed to open serial port {port}.")
+        self.enabled_tlvs = enabled_tlvs
+        self.baudrate = baudrate
+        self.reassembler = FrameReassembler()
+        self.profile = None
+        self.read_size = DEFAULT_READ_SIZE
+        self.frames_invalid = 0
+        self.set_profile(profile)
+        # bumped on every reconfiguration, every parsed Frame carries the epoch it was read in
+        self.epoch = 0
+        # last epoch handed out by begin_epoch(), ahead of epoch until the reader has flushed
+        self._pending_epoch = 0
+        self._flush_request = None
+        self._epoch_lock = threading.Lock()
+        self._epoch_started = None
+
+    def set_profile(self, profile):
+        """
+        Use the limits and timing of another configuration, e.g. after a profile switch.
+        :param profile: RadarProfile, or None for the defaults without validation.
+        """
+        self.profile = profile
+        if profile is not None:
+            self.read_size = max(DEFAULT_READ_SIZE, profile.bytes_per_frame(self.baudrate))
+        else:
+            self.read_size = DEFAULT_READ_SIZE
 
-    def read_data(self, buffer_size=4096):
+    def read_data(self, buffer_size=DEFAULT_READ_SIZE):
         """
         Read data from the radar's serial port.
         :param buffer_size: Maximum number of bytes to read in one call.
@@ -26,21 +163,93 @@ class RadarInterface:
         """
         Parse a single frame of radar data.
         :param data: Byte array of raw data from the radar.
-        :return: Parsed results including detected objects and their attributes.
+        :return: Parsed Frame including the header and the detected objects' attributes.
         """
         read_num_bytes = len(data)
         if read_num_bytes > 0:
             try:
-                result = parser_one_mmw_demo_output_packet(data, read_num_bytes)
+                result = parser_one_mmw_demo_output_packet(data, read_num_bytes, self.enabled_tlvs)
                 return result
             except Exception as e:
-                print(f"Error parsing frame: {e}")
+                logger.warning("Error parsing frame: %s", e)
         return None
 
+    def iter_frames(self, buffer_size=None):
+        """
+        Read once from the serial port and yield every frame completed by that read.
+        Packets split across reads are kept in the reassembler until the rest arrives.
+        :param buffer_size: Maximum number of bytes to read in one call, None for read_size.
+        :return: Generator of parsed Frames, one per complete packet.
+        """
+        if self._flush_request is not None:
+            self._flush()
+        data = self.read_data(buffer_size or self.read_size)
+        if self._flush_request is not None:
+            # read while the radar was being stopped, belongs to the old configuration
+            self._flush()
+            data = None
+        if data:
+            self.reassembler.feed(data)
+        for packet in self.reassembler.frames():
+            result = self.parse_frame(packet)
+            if result is not None:
+                if self.profile is not None and not self.profile.validate_frame(result):
+                    self.frames_invalid += 1
+                    logger.debug("Dropped frame %d with points outside the configured limits.", result.frameNumber)
+                    continue
+                result.epoch = self.epoch
+                if self._epoch_started is not None:
+                    logger.info("Configuration epoch %d: first frame %.0f ms after the radar was stopped.",
+                                self.epoch, 1e3 * (time.perf_counter() - self._epoch_started))
+                    self._epoch_started = None
+                yield result
+
+    def begin_epoch(self, profile=None):
+        """
+        Start a new configuration epoch once the radar has been stopped for reconfiguration.
+
+        May be called from any thread. The thread reading frames drops the bytes and partial packets of the old
+        configuration before its next parse, and every frame parsed after that carries the new epoch. A pending
+        read is cancelled where the serial port supports it, so the flush does not wait for the read timeout.
+        A call before the reader has flushed the previous request supersedes it: the reader flushes once, straight
+        to the newest epoch, and sets the events of both requests.
+
+        :param profile: RadarProfile of the new configuration, None keeps the current one.
+        :return: (new epoch, threading.Event set once the reader has flushed).
+        """
+        flushed = threading.Event()
+        with self._epoch_lock:
+            self._pending_epoch += 1
+            epoch = self._pending_epoch
+            waiters = [flushed]
+            previous = self._flush_request
+            if previous is not None:
+                waiters.extend(previous[2])
+                if profile is None:
+                    profile = previous[3]
+            self._flush_request = (epoch, time.perf_counter(), waiters, profile)
+        cancel_read = getattr(self.serial_port, 'cancel_read', None)
+        if cancel_read is not None:
+            cancel_read()
+        return epoch, flushed
+
+    def _flush(self):
+        with self._epoch_lock:
+            epoch, requested_at, waiters, profile = self._flush_request
+            self._flush_request = None
+        self.serial_port.reset_input_buffer()
+        self.reassembler.clear()
+        if profile is not None:
+            self.set_profile(profile)
+        self.epoch = epoch
+        self._epoch_started = requested_at
+        for flushed in waiters:
+            flushed.set()
+
     def close(self):
         """
         Close the serial connection.
         """
         if self.serial_port.is_open:
             self.serial_port.close()
-            print("Serial port closed.")
\ No newline at end of file
+            logger.info("Serial port closed.")
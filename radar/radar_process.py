@@ -0,0 +1,239 @@
+import logging
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from radar.parser_mmw_demo import TC_PASS
+from radar.radar_interface import RadarInterface
+
+logger = logging.getLogger(__name__)
+
+CONTROL_DTYPE = np.dtype([('write_seq', '<u8')])
+SLOT_DTYPE = np.dtype([('seq', '<u8'), ('frame_number', '<u4'), ('num_points', '<u4'), ('timestamp', '<f8')])
+POINT_FIELDS = 4  # x, y, z, v
+
+
+def _untrack(shm):
+    # attaching registers the segment with the resource tracker, which would unlink it when this process exits
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except (ImportError, AttributeError, KeyError):
+        pass
+
+
+class ReaderStats:
+    def __init__(self, name, report_interval=5.0):
+        """
+        Collect per-frame latency and CPU use of a radar reader loop and log them periodically.
+
+        :param name: Label used in the log line.
+        :param report_interval: Seconds between reports.
+        """
+        self.name = name
+        self.report_interval = report_interval
+        self._reset(time.perf_counter())
+
+    def _reset(self, now):
+        self.frames = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.window_start = now
+        self.cpu_start = time.process_time()
+
+    def record(self, latency):
+        """
+        Record one frame.
+        :param latency: Seconds between the serial read returning and the frame being published.
+        """
+        self.frames += 1
+        self.latency_sum += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+        now = time.perf_counter()
+        if now - self.window_start >= self.report_interval:
+            self.report(now)
+
+    def report(self, now=None):
+        if now is None:
+            now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed > 0 and self.frames:
+            cpu = (time.process_time() - self.cpu_start) / elapsed
+            logger.info("%s: %.1f frames/s, latency mean %.2f ms max %.2f ms, CPU %.0f%%",
+                        self.name, self.frames / elapsed, 1e3 * self.latency_sum / self.frames,
+                        1e3 * self.latency_max, 100 * cpu)
+        self._reset(now)
+
+
+class SharedFrameRing:
+    def __init__(self, num_slots=8, max_points=1024, name=None):
+        """
+        Ring of decoded radar frames in shared memory. One process writes, any number of processes read.
+
+        Each slot carries a sequence number that is odd while the writer is filling it, so readers can detect
+        and retry torn reads without locks.
+
+        :param num_slots: Number of frames kept in the ring.
+        :param max_points: Maximum number of points stored per frame, extra points are dropped.
+        :param name: Name of an existing ring to attach to. None creates a new one.
+        """
+        self.num_slots = num_slots
+        self.max_points = max_points
+        size = (CONTROL_DTYPE.itemsize + num_slots * SLOT_DTYPE.itemsize +
+                num_slots * max_points * POINT_FIELDS * 4)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            _untrack(self.shm)
+
+        buf = self.shm.buf
+        offset = 0
+        self._control = np.ndarray((1,), dtype=CONTROL_DTYPE, buffer=buf, offset=offset)
+        offset += CONTROL_DTYPE.itemsize
+        self._slots = np.ndarray((num_slots,), dtype=SLOT_DTYPE, buffer=buf, offset=offset)
+        offset += num_slots * SLOT_DTYPE.itemsize
+        self._points = np.ndarray((num_slots, max_points, POINT_FIELDS), dtype=np.float32, buffer=buf, offset=offset)
+        if self._owner:
+            self._control[0] = 0
+            self._slots[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_seq(self):
+        """
+        Number of frames written so far.
+        """
+        return int(self._control['write_seq'][0])
+
+    def write(self, frame, timestamp):
+        """
+        Publish a parsed frame into the next slot.
+        :param frame: Parsed radar Frame.
+        :param timestamp: time.time() at which the frame was read.
+        """
+        seq = self.write_seq
+        index = seq % self.num_slots
+        slot = self._slots[index:index + 1]
+        num_points = min(len(frame.x), self.max_points)
+
+        slot['seq'] = 2 * seq + 1
+        points = self._points[index]
+        points[:num_points, 0] = frame.x[:num_points]
+        points[:num_points, 1] = frame.y[:num_points]
+        points[:num_points, 2] = frame.z[:num_points]
+        points[:num_points, 3] = frame.v[:num_points]
+        slot['frame_number'] = frame.frameNumber
+        slot['num_points'] = num_points
+        slot['timestamp'] = timestamp
+        slot['seq'] = 2 * seq + 2
+        self._control['write_seq'] = seq + 1
+
+    def read_latest(self, after_seq=0):
+        """
+        Copy the newest frame out of the ring.
+        :param after_seq: Only return a frame if write_seq has moved past this value.
+        :return: (write_seq, frame_number, timestamp, points) with points an (N, 4) x/y/z/v array, or None.
+        """
+        while True:
+            seq = self.write_seq
+            if seq == 0 or seq <= after_seq:
+                return None
+            index = (seq - 1) % self.num_slots
+            slot_seq = self._slots['seq']
+            before = int(slot_seq[index])
+            if before & 1:
+                continue
+            num_points = int(self._slots['num_points'][index])
+            frame_number = int(self._slots['frame_number'][index])
+            timestamp = float(self._slots['timestamp'][index])
+            points = self._points[index, :num_points].copy()
+            if int(slot_seq[index]) == before:
+                return (seq, frame_number, timestamp, points)
+
+    def close(self):
+        self._control = self._slots = self._points = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def acquisition_main(port, baudrate, ring_name, num_slots, max_points, stop_event, log_level=logging.INFO,
+                     profile=None):
+    """
+    Entry point of the acquisition process: read and parse radar frames and publish them into the ring.
+    """
+    logging.basicConfig(level=log_level, format="%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s")
+    ring = SharedFrameRing(num_slots, max_points, name=ring_name)
+    radar = RadarInterface(port=port, baudrate=baudrate, profile=profile)
+    stats = ReaderStats("radar reader (process)")
+    try:
+        while not stop_event.is_set():
+            read_done = None
+            for frame in radar.iter_frames():
+                if read_done is None:
+                    read_done = time.perf_counter()
+                if frame.result != TC_PASS:
+                    continue
+                ring.write(frame, time.time())
+                stats.record(time.perf_counter() - read_done)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        radar.close()
+        ring.close()
+
+
+class RadarProcess:
+    def __init__(self, port, baudrate, num_slots=8, max_points=1024, log_level=logging.INFO, profile=None):
+        """
+        Run RadarInterface reading and parsing in a separate process, so plotting in this process cannot stall
+        the serial reads. Frames are exchanged through a SharedFrameRing without pickling.
+
+        :param port: Radar data port.
+        :param baudrate: Radar data baud rate.
+        :param num_slots: Frames kept in the shared ring.
+        :param max_points: Maximum points per frame.
+        :param log_level: Logging level of the acquisition process.
+        :param profile: Optional RadarProfile of the running configuration, see RadarInterface.
+        """
+        ctx = multiprocessing.get_context("spawn")
+        self.ring = SharedFrameRing(num_slots, max_points)
+        self.stop_event = ctx.Event()
+        self.process = ctx.Process(
+            target=acquisition_main,
+            args=(port, baudrate, self.ring.name, num_slots, max_points, self.stop_event, log_level, profile),
+            name="radar-acquisition",
+            daemon=True,
+        )
+        self._last_seq = 0
+
+    def start(self):
+        self.process.start()
+
+    def latest_frame(self):
+        """
+        :return: (frame_number, timestamp, points) of the newest frame not returned before, or None.
+        """
+        latest = self.ring.read_latest(self._last_seq)
+        if latest is None:
+            return None
+        seq, frame_number, timestamp, points = latest
+        self._last_seq = seq
+        return (frame_number, timestamp, points)
+
+    def close(self, timeout=2):
+        self.stop_event.set()
+        if self.process.is_alive():
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.ring.close()
@@ -0,0 +1,211 @@
+"""
+What a radar configuration (.cfg) file means: resolutions, limits and timing derived from its profileCfg, chirpCfg,
+frameCfg/advFrameCfg/subFrameCfg, channelCfg, adcbufCfg and aoaFovCfg commands.
+"""
+import functools
+from collections import namedtuple
+
+import numpy as np
+
+from radar.radar_config import load_cfg
+
+SPEED_OF_LIGHT = 299792458.0
+
+# One chirp profile as used by one subframe (a frame without advanced framing has a single subframe)
+SubframeProfile = namedtuple('SubframeProfile', [
+    'profile_id',
+    'start_frequency',      # Hz
+    'bandwidth',            # Hz swept while the ADC samples
+    'num_adc_samples',
+    'chirps_per_loop',      # chirps of one loop, one per Tx in TDM
+    'chirps_per_frame',     # chirps of this subframe, all loops
+    'chirp_time',           # seconds, idle + ramp end
+    'range_resolution',     # m
+    'max_range',            # m
+    'velocity_resolution',  # m/s
+    'max_velocity',         # m/s, unambiguous
+    'period',               # seconds
+])
+
+
+class RadarProfile(namedtuple('RadarProfile', [
+        'num_rx', 'num_tx', 'virtual_antennas', 'azimuth_fov', 'elevation_fov', 'frame_period', 'subframes'])):
+    """
+    Immutable summary of a configuration. azimuth_fov and elevation_fov are (min, max) in degrees, frame_period
+    is in seconds. The range and velocity properties cover all subframes: the finest resolution and the
+    largest limit.
+    """
+    __slots__ = ()
+
+    @property
+    def range_resolution(self):
+        return min(subframe.range_resolution for subframe in self.subframes)
+
+    @property
+    def max_range(self):
+        return max(subframe.max_range for subframe in self.subframes)
+
+    @property
+    def velocity_resolution(self):
+        return min(subframe.velocity_resolution for subframe in self.subframes)
+
+    @property
+    def max_velocity(self):
+        return max(subframe.max_velocity for subframe in self.subframes)
+
+    @property
+    def frame_rate(self):
+        return 1.0 / self.frame_period
+
+    def bytes_per_frame(self, baudrate):
+        """
+        :return: Bytes the data port can carry in one frame period, a read size that takes one read per frame.
+        """
+        return int(baudrate / 10 * self.frame_period)
+
+    def valid_points(self, x, y, z=None, v=None, margin=1.1):
+        """
+        :return: Boolean mask of the points inside the configured range and, if v is given, velocity limits.
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        distance_sq = x * x + y * y
+        if z is not None and len(z) == len(x):
+            z = np.asarray(z)
+            distance_sq = distance_sq + z * z
+        limit = self.max_range * margin
+        mask = distance_sq <= limit * limit
+        if v is not None and len(v) == len(x):
+            mask &= np.abs(np.asarray(v)) <= self.max_velocity * margin
+        return mask
+
+    def validate_frame(self, frame, margin=1.1):
+        """
+        Check that all points of a parsed Frame are inside the configured maximum range. Garbage that happens to
+        carry a valid header fails this check. Velocities are not checked, extendedMaxVelocity can legitimately
+        report points beyond max_velocity.
+        """
+        return bool(self.valid_points(frame.x, frame.y, frame.z, margin=margin).all())
+
+
+def _numbers(args):
+    return [float(arg) for arg in args]
+
+
+def _chirp_profile(profile_args, chirps_per_loop, num_loops, period, real_sampling):
+    profile_id = int(profile_args[0])
+    start_ghz, idle_us, adc_start_us, ramp_end_us = profile_args[1:5]
+    slope_mhz_us = profile_args[7]
+    num_samples = int(profile_args[9])
+    sample_rate = profile_args[10] * 1e3  # ksps
+
+    slope = slope_mhz_us * 1e12  # Hz/s
+    bandwidth = slope * num_samples / sample_rate
+    # real sampling only keeps half of the IF band
+    if_bandwidth = sample_rate / 2 if real_sampling else sample_rate
+    chirp_time = (idle_us + ramp_end_us) * 1e-6
+    # wavelength at the center of the sampled sweep
+    center_frequency = start_ghz * 1e9 + slope * adc_start_us * 1e-6 + bandwidth / 2
+    wavelength = SPEED_OF_LIGHT / center_frequency
+    chirps_per_loop = max(chirps_per_loop, 1)
+    chirps = chirps_per_loop * num_loops
+    return SubframeProfile(
+        profile_id=profile_id,
+        start_frequency=start_ghz * 1e9,
+        bandwidth=bandwidth,
+        num_adc_samples=num_samples,
+        chirps_per_loop=chirps_per_loop,
+        chirps_per_frame=chirps,
+        chirp_time=chirp_time,
+        range_resolution=SPEED_OF_LIGHT / (2 * bandwidth),
+        max_range=if_bandwidth * SPEED_OF_LIGHT / (2 * slope),
+        velocity_resolution=wavelength / (2 * chirps * chirp_time),
+        # a loop has to pass before the same Tx chirps again
+        max_velocity=wavelength / (4 * chirps_per_loop * chirp_time),
+        period=period,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def profile_from_commands(commands):
+    """
+    :param commands: Tuple of configuration commands, as returned by load_cfg().
+    :return: RadarProfile.
+    :raises ValueError: If the commands lack a profileCfg, a channelCfg or a frame configuration.
+    """
+    args = {}
+    for command in commands:
+        name, *values = command.split()
+        args.setdefault(name, []).append(values)
+
+    if 'profileCfg' not in args or 'channelCfg' not in args:
+        raise ValueError("configuration has no profileCfg or channelCfg")
+    profiles = {int(values[0]): _numbers(values) for values in args['profileCfg']}
+    chirp_profiles = {}
+    for values in args.get('chirpCfg', []):
+        start, end, profile_id = int(values[0]), int(values[1]), int(values[2])
+        for index in range(start, end + 1):
+            chirp_profiles[index] = profile_id
+
+    rx_mask, tx_mask = int(args['channelCfg'][0][0]), int(args['channelCfg'][0][1])
+    num_rx, num_tx = bin(rx_mask).count('1'), bin(tx_mask).count('1')
+
+    # adcbufCfg <subFrameIdx> <adcOutputFmt: 0 complex, 1 real> ...
+    real_sampling = any(values[1] == '1' for values in args.get('adcbufCfg', []))
+
+    azimuth_fov, elevation_fov = (-90.0, 90.0), (-90.0, 90.0)
+    if 'aoaFovCfg' in args:
+        fov = _numbers(args['aoaFovCfg'][0][1:5])
+        azimuth_fov, elevation_fov = (fov[0], fov[1]), (fov[2], fov[3])
+
+    def profile_for(chirp_index, subframe_index):
+        # chirps without a chirpCfg (advanced chirp configuration) use the subframe's profile or the first one
+        profile_id = chirp_profiles.get(chirp_index, subframe_index if subframe_index in profiles else None)
+        if profile_id is None:
+            profile_id = min(profiles)
+        return profiles[profile_id]
+
+    subframes = []
+    if 'subFrameCfg' in args:
+        # subFrameCfg <subFrameNum> <forceProfileIdx> <chirpStartIdx> <numOfChirps> <numLoops> <burstPeriodicity>
+        #             <chirpStartIdxOffset> <numOfBurst> <numOfBurstLoops> <subFramePeriodicity ms>
+        for values in sorted(args['subFrameCfg'], key=lambda values: int(values[0])):
+            index, chirp_start, num_chirps, num_loops = (int(values[0]), int(values[2]), int(values[3]),
+                                                         int(values[4]))
+            bursts = int(values[7]) * int(values[8])
+            subframes.append(_chirp_profile(profile_for(chirp_start, index), num_chirps, num_loops * bursts,
+                                            float(values[9]) * 1e-3, real_sampling))
+    elif 'frameCfg' in args:
+        # frameCfg <chirpStartIdx> <chirpEndIdx> <numLoops> <numFrames> [<numAdcSamples>] <framePeriodicity ms> ...
+        values = args['frameCfg'][0]
+        chirp_start, chirp_end, num_loops = int(values[0]), int(values[1]), int(values[2])
+        period = float(values[5] if len(values) >= 8 else values[4]) * 1e-3
+        subframes.append(_chirp_profile(profile_for(chirp_start, 0), chirp_end - chirp_start + 1, num_loops,
+                                        period, real_sampling))
+    else:
+        raise ValueError("configuration has no frameCfg or subFrameCfg")
+
+    return RadarProfile(
+        num_rx=num_rx,
+        num_tx=num_tx,
+        virtual_antennas=num_rx * num_tx,
+        azimuth_fov=azimuth_fov,
+        elevation_fov=elevation_fov,
+        frame_period=sum(subframe.period for subframe in subframes),
+        subframes=tuple(subframes),
+    )
+
+
+def load_profile(file_path):
+    """
+    RadarProfile of a .cfg file. Both the file and the derived profile are cached.
+    """
+    return profile_from_commands(load_cfg(file_path))
+
+
+def describe(profile):
+    return (f"{profile.num_tx} Tx x {profile.num_rx} Rx ({profile.virtual_antennas} virtual), "
+            f"range res {100 * profile.range_resolution:.1f} cm, max range {profile.max_range:.1f} m, "
+            f"velocity res {profile.velocity_resolution:.3f} m/s, max velocity {profile.max_velocity:.2f} m/s, "
+            f"frame period {1e3 * profile.frame_period:.0f} ms, azimuth {profile.azimuth_fov[0]:g}..."
+            f"{profile.azimuth_fov[1]:g} deg")
@@ -1,17 +1,34 @@
+import logging
+import queue
+
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('TkAgg')  # Force the TkAgg backend for compatibility with Wayland
 
+from implementation.renderer import BlitRenderer
+
+logger = logging.getLogger(__name__)
+
+
 class RadarUI:
-    def __init__(self, x_scale=10, y_scale=10):
+    def __init__(self, x_scale=10, y_scale=10, max_fps=20, queue_size=8):
         """
         Initialize the Radar UI with custom scaling.
 
+        Acquisition hands frames over with submit() from its own thread and never waits for the plot. The GUI
+        thread picks them up at most max_fps times per second, shows the newest one and skips the rest.
+
         :param x_scale: Maximum distance for the X-axis in meters.
         :param y_scale: Maximum distance for the Y-axis in meters.
+        :param max_fps: Display rate cap.
+        :param queue_size: Frames buffered between acquisition and display; when full the oldest is dropped.
         """
         self.x_scale = x_scale
         self.y_scale = y_scale
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.frames_shown = 0
+        self.frames_skipped = 0
 
         # Set up the plot
         self.fig, self.ax = plt.subplots(figsize=(8, 6))
@@ -29,42 +46,73 @@ class RadarUI:
         self.ax.set_xlabel("X (meters)")
         self.ax.set_ylabel("Y (meters)")
 
-        # Initialize plot objects
-        self.scatter = self.ax.scatter([], [], c='red', label="Detected Objects")
-        self.frame_text = self.ax.text(0.05, 0.95, '', transform=self.ax.transAxes, fontsize=12, verticalalignment='top')
+        # Initialize plot objects; only these are redrawn, over the cached axes
+        self.renderer = BlitRenderer(self.fig, self.poll, interval=1.0 / max_fps, name="radar UI")
+        self.scatter = self.renderer.add(self.ax.scatter([], [], c='red', label="Detected Objects"))
+        self.frame_text = self.renderer.add(
+            self.ax.text(0.05, 0.95, '', transform=self.ax.transAxes, fontsize=12, verticalalignment='top'))
         self.ax.legend()
 
-    def update(self, parsed_data):
+    def submit(self, frame):
         """
-        Update the plot with new radar data.
-        
-        :param parsed_data: Tuple containing parsed radar data.
+        Queue a parsed frame for display. Safe to call from the acquisition thread, never blocks.
+
+        :param frame: Parsed radar Frame, None is ignored.
         """
-        (
-            _,
-            _,
-            _,
-            frame_number,
-            num_det_obj,
-            _,
-            _,
-            detected_x_array,
-            detected_y_array,
-            *_
-        ) = parsed_data
+        if frame is None:
+            return
+        while True:
+            try:
+                self.frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.frames_skipped += 1
+                except queue.Empty:
+                    pass
 
+    def poll(self):
+        """
+        Show the newest queued frame and drop the older ones. Runs on the GUI thread.
+        """
+        frame = None
+        while True:
+            try:
+                newer = self.frames.get_nowait()
+            except queue.Empty:
+                break
+            if frame is not None:
+                self.frames_skipped += 1
+            frame = newer
+        self.update(frame)
+
+    def update(self, frame):
+        """
+        Update the plot objects with new radar data. The canvas is redrawn by the renderer.
+
+        :param frame: Parsed radar Frame, or None to keep the current one.
+        """
+        if frame is None:
+            return
         # Update scatter plot
-        self.scatter.set_offsets(list(zip(detected_x_array, detected_y_array)))
+        offsets = np.empty((len(frame.x), 2))
+        offsets[:, 0] = frame.x
+        offsets[:, 1] = frame.y
+        self.scatter.set_offsets(offsets)
 
         # Update frame information
-        self.frame_text.set_text(f"Frame: {frame_number} | Objects: {num_det_obj}")
-
-        # Refresh the plot
-        plt.pause(0.01)
+        self.frame_text.set_text(f"Frame: {frame.frameNumber} | Objects: {frame.numDetObj} | Config: {frame.epoch}")
+        self.frames_shown += 1
 
     def show(self):
         """
-        Display the radar UI in interactive mode.
+        Display the radar UI and refresh it from the frame queue until the window is closed. Blocks, so call it
+        from the main thread and run acquisition in another one.
         """
-        plt.ion()
-        plt.show()
+        self.renderer.start()
+        try:
+            plt.show()
+        finally:
+            self.renderer.stop()
+            logger.info("Radar UI: %d frames shown, %d stale frames skipped", self.frames_shown, self.frames_skipped)